@@ -18,6 +18,8 @@ Copyright 2013 OpERA
 
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 
 class AbstractAlgorithm(object):
     """
@@ -40,6 +42,23 @@ class AbstractAlgorithm(object):
         """
         pass
 
+    def decision_batch(self, matrix):
+        """
+        Make a decision for each row of matrix.
+        Called from a signal processing block with the whole work buffer.
+        Derived classes should reimplement this method with vectorized operations. This
+        default implementation calls decision() for each row.
+        @param matrix 2-D array. Each row is one input of decision().
+        @return Tuple (decisions, values). Both are numpy arrays with one item per row.
+        """
+        decisions = np.zeros(len(matrix), dtype=np.int32)
+        values = np.zeros(len(matrix), dtype=np.float64)
+
+        for idx in range(len(matrix)):
+            decisions[idx], values[idx] = self.decision(matrix[idx])
+
+        return decisions, values
+
 
 class ThresholdAlgorithm(AbstractAlgorithm):
     """
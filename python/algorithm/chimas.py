@@ -37,6 +37,9 @@ def reorder(channel_list, qn_result):
 
 from abc import abstractmethod
 
+import threading
+import Queue
+
 import numpy as np
 
 ## Represent a QLearner
@@ -281,20 +284,36 @@ class Chimas(object):
     """
     Chimas class
     Implements the Chimas algorithm proposed by Bondan for the LCN 2014 conference.
+
+    run() senses all channels and then evaluates them.
+    start()/stop() run the pipelined mode: one sensing thread per radio streams the result of each channel to a
+    queue while an evaluation thread updates the QValues. ranking() returns the current ranking at any time.
     """
 
     ##::TODO:: verificar os parametros, pq os parametros da funcao nao sao condizentes com a da documentacao
     def __init__(self, radio, learning_algorithm):
         """
         CTOR
-        @param chimas_arch
+        @param radio RadioDevice or list of RadioDevice. In pipelined mode channels are spread across the devices.
         @param learning_algorithm Learning algorithm (Qnoise)
-        @param channel_list List of Channels objects to sense.
         """
 
-        self._radio = radio
+        self._radios = list(radio) if isinstance(radio, (list, tuple)) else [radio]
+        self._radio = self._radios[0]
         self._evaluater = learning_algorithm
 
+        # Pipelined mode
+        self._queue = Queue.Queue()
+        self._running = threading.Event()
+        self._threads = []
+
+        self._lock = threading.Lock()
+        self._qvalues = {}
+        self._evaluated = 0
+
+        # First error of the sensing and evaluation threads, raised by ranking() or stop()
+        self._error = None
+
 
     def run(self, channels, iterations=1):
         """
@@ -316,6 +335,153 @@ class Chimas(object):
         return ln_result
 
 
+    def start(self, channels, sensing_time=1):
+        """
+        Start the pipelined mode.
+        Channels are split among the radios (channel i is sensed by radio i % number of radios). Each radio senses
+        its channels continuously.
+        @param channels List of Channel objects.
+        @param sensing_time Sensing duration on each channel.
+        """
+        if self._running.is_set():
+            raise AttributeError("Chimas pipelined mode already started")
+
+        self._running.set()
+        self._error = None
+
+        n_radios = len(self._radios)
+        for idx, radio in enumerate(self._radios):
+            share = channels[idx::n_radios]
+
+            if share:
+                self._threads.append(threading.Thread(target=self._sense_loop, args=(radio, share, sensing_time)))
+
+        self._threads.append(threading.Thread(target=self._evaluate_loop))
+
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+
+    def stop(self):
+        """
+        Stop the pipelined mode.
+        Waits the current sensing of each radio and the evaluation of all results already sensed.
+        Raises the first error of the sensing or evaluation threads not raised by ranking() yet.
+        """
+        self._running.clear()
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+        self._raise_error()
+
+
+    @property
+    def evaluated(self):
+        """
+        @return Number of sensing results evaluated in pipelined mode.
+        """
+        with self._lock:
+            return self._evaluated
+
+
+    def ranking(self):
+        """
+        Current ranking of the pipelined mode.
+        Raises the first error of the sensing or evaluation threads (once). A radio stops sensing after an error of
+        sense_channel. The other threads keep running.
+        @return [channel list, qvalue list], ordered by QValue (best first). Same format of QNoise.evaluate.
+        """
+        self._raise_error()
+
+        with self._lock:
+            items = sorted(self._qvalues.items(), key=lambda item: item[1], reverse=True)
+
+        return [[ch for ch, q in items], [q for ch, q in items]]
+
+
+    def _set_error(self, error):
+        """
+        Keep the first error of the pipeline threads.
+        @param error Exception.
+        """
+        print 'Chimas: pipeline error:', error
+
+        with self._lock:
+            if self._error is None:
+                self._error = error
+
+
+    def _raise_error(self):
+        """
+        Raise the error kept by _set_error, if any.
+        """
+        with self._lock:
+            error, self._error = self._error, None
+
+        if error is not None:
+            raise error
+
+
+    def _sense_loop(self, radio, channels, sensing_time):
+        """
+        Sensing thread. Sense channels until stop() is called or radio fails.
+        @param radio RadioDevice.
+        @param channels List of Channel objects sensed by radio.
+        @param sensing_time Sensing duration on each channel.
+        """
+        while self._running.is_set():
+            for channel in channels:
+                if not self._running.is_set():
+                    break
+
+                try:
+                    res = radio.sense_channel(channel, sensing_time)
+                except Exception as e:  #pylint: disable=W0703
+                    # ::TRICKY:: retrying a failed device would spin (and print) until stop()
+                    self._set_error(e)
+                    return
+
+                self._queue.put((channel.get_channel(), res))
+
+
+    def _evaluate_loop(self):
+        """
+        Evaluation thread. Evaluates all results available in the queue at once.
+        """
+        while self._running.is_set() or not self._queue.empty():
+            try:
+                items = [self._queue.get(timeout=0.1)]
+            except Queue.Empty:
+                continue
+
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except Queue.Empty:
+                    break
+
+            # ::TRICKY:: a channel must appear at most once in each evaluation
+            batches = [[]]
+            for item in items:
+                if item[0] in [ch for ch, _ in batches[-1]]:
+                    batches.append([])
+                batches[-1].append(item)
+
+            for batch in batches:
+                try:
+                    channels, qvalues = self._evaluater.evaluate(batch)
+                except Exception as e:  #pylint: disable=W0703
+                    self._set_error(e)
+                    continue
+
+                with self._lock:
+                    self._qvalues.update(zip(channels, qvalues))
+                    self._evaluated += len(batch)
+
+
 if __name__ == '__main__':
     import sys
     import os
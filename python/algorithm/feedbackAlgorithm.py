@@ -21,19 +21,117 @@ from abc import ABCMeta, abstractmethod
 
 from utils import Logger  #pylint:disable=F0401
 
+try:
+    from time import perf_counter
+except ImportError:
+    # python 2: best available wall clock timer
+    from timeit import default_timer as perf_counter
+
+
+class DecisionCost(object):
+    """
+    Running statistics of the cost (seconds) of the decision() calls of an algorithm.
+    The object is saved in the Logger as global 'variable' of object 'name', so the statistics are read (get_data) or
+    dumped (as count, total, mean, max and max_batch) when needed. Decisions do not touch the Logger.
+    """
+
+    def __init__(self, name, variable):
+        """
+        CTOR
+        @param name Object name used in the Logger (owner of the algorithm).
+        @param variable Variable name used in the Logger.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+        # Slowest single decision and slowest decision_batch call
+        self.max = 0.0
+        self.max_batch = 0.0
+
+        Logger.set(name, variable, self)
+
+
+    def __str__(self):
+        """
+        @return Statistics, as saved by Logger.dump.
+        """
+        return "count=%d total=%f mean=%f max=%f max_batch=%f" % (self.count, self.total, self.mean, self.max,
+                                                                  self.max_batch)
+
+
+    @property
+    def mean(self):
+        """
+        @return Mean cost of a decision.
+        """
+        return self.total / self.count if self.count else 0.0
+
+
+    def add(self, elapsed, n_calls=1):
+        """
+        Account the cost of decisions.
+        The cost of each decision of a batch is unknown: a batch updates max_batch (with elapsed), not max.
+        @param elapsed Time spent (seconds).
+        @param n_calls Number of decisions made in elapsed.
+        """
+        self.count += n_calls
+        self.total += elapsed
+        self.last = elapsed / n_calls
+
+        if n_calls == 1:
+            self.max = max(self.max, elapsed)
+        else:
+            self.max_batch = max(self.max_batch, elapsed)
+
+
+    def decision(self, algorithm, data):
+        """
+        Call algorithm.decision(data) and account its cost.
+        @param algorithm AbstractAlgorithm.
+        @param data Input of algorithm.decision.
+        @return Return of algorithm.decision.
+        """
+        start = perf_counter()
+        res = algorithm.decision(data)
+        self.add(perf_counter() - start)
+
+        return res
+
+
+    def decision_batch(self, algorithm, matrix):
+        """
+        Call algorithm.decision_batch(matrix) and account the cost of each row.
+        @param algorithm AbstractAlgorithm.
+        @param matrix Input of algorithm.decision_batch.
+        @return Return of algorithm.decision_batch.
+        """
+        start = perf_counter()
+        res = algorithm.decision_batch(matrix)
+
+        if len(matrix):
+            self.add(perf_counter() - start, len(matrix))
+
+        return res
+
 
 #::TODO:: descricao dos metodos e seus parametros.
 class FeedbackAlgorithm(AbstractAlgorithm):
     """
     Simple feedback algorithm class.
+    The decisions are made by the caller. Their costs are measured by the caller with DecisionCost objects (as
+    FeedbackSSArch does) and passed in the CTOR.
     """
 
-    def __init__(self, learner, manager, a_feedback_strategy):
+    def __init__(self, learner, manager, a_feedback_strategy, learner_cost=None, manager_cost=None):
         """
         CTOR
         @param learner Algorithm that will be adjusted.
         @param manager
         @param a_feedback_strategy FeedbackTimeStrategy object.
+        @param learner_cost DecisionCost of the learner decisions.
+        @param manager_cost DecisionCost of the manager decisions. Its last cost is passed to the strategy on feedback
+                            frames.
         """
         AbstractAlgorithm.__init__(self)
 
@@ -47,6 +145,9 @@ class FeedbackAlgorithm(AbstractAlgorithm):
         self._iteraction = 0
         self._time = 0
 
+        self._learner_cost = learner_cost
+        self._manager_cost = manager_cost
+
         # Debug information
         Logger.register('feedback_algorithm', ['total_feedback', 'activation', 'count', 'time'])
 
@@ -72,6 +173,7 @@ class FeedbackAlgorithm(AbstractAlgorithm):
     def decision(self, data_l, data_m):
         """
         Function called from a signal processing block.
+        The 'time' logged is the measured cost (seconds) of the learner and manager decisions made so far.
         @param data_l Learner decision regarding channel occupancy.
         @param data_m Manager decision regarding channel occupancy.
         """
@@ -83,7 +185,6 @@ class FeedbackAlgorithm(AbstractAlgorithm):
 
         if self._valid_feedback:
             final_dec = data_m
-            self._time += 19.3
             self._count += 1
             Logger.set('feedback_algorithm', 'total_feedback', self._count)
             Logger.append('feedback_algorithm', 'activation', int(data_m))
@@ -91,6 +192,9 @@ class FeedbackAlgorithm(AbstractAlgorithm):
             # set feedback in our learning algorithm
             self.learner.feedback = data_m
 
+            if self._manager_cost is not None:
+                self.strategy.add_cost(self._manager_cost.last)
+
             # Increase feedback interval if both algorithms are correct
             if data_l == data_m:
                 self.strategy.increase_time()
@@ -99,13 +203,14 @@ class FeedbackAlgorithm(AbstractAlgorithm):
                 self.strategy.decrease_time()
         else:
             Logger.append('feedback_algorithm', 'activation', -1)
-            self._time += 0.2
 
         self._valid_feedback = False
         if self.strategy.feedback():
             self._manager.enable(True)
             self._valid_feedback = True
 
+        self._time = sum(cost.total for cost in (self._learner_cost, self._manager_cost) if cost is not None)
+
         Logger.append('feedback_algorithm', 'time', self._time)
         Logger.append('feedback_algorithm', 'count', self._count)
         Logger.append('bayes_decision', 'hypothesis', final_dec)
@@ -157,6 +262,33 @@ class FeedbackTimeStrategy(object):
         return t
 
 
+    def frames_to_feedback(self):
+        """
+        Number of frames until the next feedback, counting the feedback frame itself.
+        The first frames_to_feedback() - 1 frames can be skipped with skip().
+        @return Number of wait() calls until feedback() returns True.
+        """
+        return max(1, int(ceil(self.feedback_time() - self._waiting_time)))
+
+
+    def skip(self, n_frames):
+        """
+        Account n_frames without feedback at once.
+        Same as calling wait() and feedback() n_frames times, as long as n_frames < frames_to_feedback().
+        @param n_frames Number of frames.
+        """
+        self._waiting_time += n_frames
+
+
+    def add_cost(self, cost):
+        """
+        Account the cost of a manager decision.
+        Strategies that do not depend on the cost ignore it.
+        @param cost Time spent (seconds).
+        """
+        pass
+
+
     @abstractmethod
     def feedback_time(self):
         """
@@ -289,6 +421,128 @@ class KunstTimeFeedback(ExponentialTimeFeedback):
             self._exp -= 1
 
 
+class BudgetTimeFeedback(KunstTimeFeedback):
+    """
+    1:N Exponential time feedback limited by a CPU budget.
+    Same as KunstTimeFeedback, but the feedback interval is never shorter than the interval that keeps the manager
+    CPU time under budget seconds per second.
+    The manager cost is informed with add_cost(). The frame rate is measured from the wait()/skip() calls.
+    """
+
+    def __init__(self, budget, window=1.0, min_time=1, max_time=128, base=2):
+        """
+        CTOR
+        @param budget Manager CPU time allowed per second (0.1 = 10% of the time).
+        @param window Interval (seconds) between two updates of the minimum feedback interval.
+        @param min_time Min allowed time.
+        @param max_time Max allowed time.
+        @param base The exponential base.
+        """
+        ExponentialTimeFeedback.__init__(self,
+                                         min_time=min_time,
+                                         max_time=max_time,
+                                         base=base)
+
+        self._budget = float(budget)
+        self._window = window
+
+        # Largest exponent allowed by max_time
+        self._max_exp = 0
+        while pow(self._base, self._max_exp + 1) <= self._max:
+            self._max_exp += 1
+
+        # Smallest exponent allowed by the budget
+        self._min_exp = 0
+
+        # Measurements of the current window
+        self._start = perf_counter()
+        self._frames = 0
+        self._cost = 0.0
+        self._n_cost = 0
+        self._mean_cost = None
+
+        Logger.register('budget_feedback', ['min_interval', ])
+
+
+    @property
+    def min_interval(self):
+        """
+        @return Minimum feedback interval allowed by the budget.
+        """
+        return pow(self._base, self._min_exp)
+
+
+    def wait(self):
+        """
+        Inherit from parent.
+        """
+        FeedbackTimeStrategy.wait(self)
+        self._frames += 1
+        self._update()
+
+
+    def skip(self, n_frames):
+        """
+        Inherit from parent.
+        """
+        FeedbackTimeStrategy.skip(self, n_frames)
+        self._frames += n_frames
+        self._update()
+
+
+    def add_cost(self, cost):
+        """
+        Inherit from parent.
+        """
+        self._cost += cost
+        self._n_cost += 1
+
+
+    def _update(self):
+        """
+        Update the minimum feedback interval once per window.
+        Interval (frames) >= mean manager cost * frame rate / budget.
+        """
+        elapsed = perf_counter() - self._start
+        if elapsed < self._window:
+            return
+
+        if self._n_cost:
+            self._mean_cost = self._cost / self._n_cost
+
+        if self._mean_cost is not None:
+            required = self._mean_cost * (self._frames / elapsed) / self._budget
+
+            self._min_exp = 0
+            while self._min_exp < self._max_exp and pow(self._base, self._min_exp) < required:
+                self._min_exp += 1
+
+            self._exp = max(self._exp, self._min_exp)
+            Logger.append('budget_feedback', 'min_interval', self.min_interval)
+
+        self._start += elapsed
+        self._frames = 0
+        self._cost = 0.0
+        self._n_cost = 0
+
+
+    def feedback_time(self):
+        """
+        Inherit from parent.
+        @return The feedback time.
+        """
+        return pow(self._base, max(self._exp, self._min_exp))
+
+
+    def decrease_time(self):
+        """
+        Inherit from parent.
+        Go back to the previous interval, but not below the budget interval.
+        """
+        if self._exp > self._min_exp:
+            self._exp -= 1
+
+
 from gnuradio import gr
 import numpy as np
 
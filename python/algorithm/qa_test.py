@@ -26,9 +26,14 @@ sys.path.insert(0, path)
 
 import unittest
 import random
+import numpy as np
 
 # Modules  tested
-from feedbackAlgorithm import FeedbackAlgorithm, ExponentialTimeFeedback, KunstTimeFeedback
+from feedbackAlgorithm import FeedbackAlgorithm, ExponentialTimeFeedback, KunstTimeFeedback, BudgetTimeFeedback
+from feedbackAlgorithm import DecisionCost
+from qnoise import QNoise
+from chimas import Chimas
+from sdc import SDController, generate_hits
 
 # Other modules needed
 from device import radioDevice
@@ -125,5 +130,200 @@ class QaAlgorithm(unittest.TestCase):
         self.assertEqual(False, obj.feedback())  # wait gets back to 0  # volta wait para 0
 
 
+    def test_feedback_003(self):
+        """
+        Test the frames until the next feedback.
+        """
+        obj = KunstTimeFeedback()
+        obj.increase_time()
+        obj.increase_time()  # 2^2 = 4
+
+        self.assertEqual(4, obj.frames_to_feedback())
+
+        # Skipping 3 frames is the same as 3 wait/feedback calls
+        obj.skip(obj.frames_to_feedback() - 1)
+        self.assertEqual(1, obj.frames_to_feedback())
+
+        obj.wait()
+        self.assertEqual(True, obj.feedback())
+        self.assertEqual(4, obj.frames_to_feedback())
+
+
+    def test_feedback_004(self):
+        """
+        Test the feedback interval limited by the CPU budget.
+        """
+        obj = BudgetTimeFeedback(budget=0.1, window=0.0)
+        self.assertEqual(1, obj.feedback_time())
+
+        # A manager decision of 1 second is never under budget: interval goes to the max time
+        obj.add_cost(1.0)
+        obj.wait()
+        self.assertEqual(128, obj.feedback_time())
+
+        # decrease_time keeps the budget interval
+        obj.decrease_time()
+        self.assertEqual(128, obj.feedback_time())
+
+    def test_feedback_005(self):
+        """
+        Test the measured cost of the decisions.
+        """
+        cost = DecisionCost('qa_feedback', 'cost')
+        cost.add(0.5)
+        cost.add(3.0, 10)
+
+        # The batch mean is not the slowest decision
+        self.assertEqual(11, cost.count)
+        self.assertAlmostEqual(0.3, cost.last)
+        self.assertEqual(0.5, cost.max)
+        self.assertEqual(3.0, cost.max_batch)
+
+        class Learner(object):
+            """
+            Learner that keeps the feedback.
+            """
+            feedback = None
+
+        class Manager(object):
+            """
+            Manager that can be enabled.
+            """
+            def enable(self, value):
+                pass
+
+        # The cost of the manager decisions is passed to the strategy on feedback frames
+        strategy = BudgetTimeFeedback(budget=0.1, window=0.0)
+        manager_cost = DecisionCost('qa_feedback', 'manager_cost')
+        obj = FeedbackAlgorithm(Learner(), Manager(), strategy, manager_cost=manager_cost)
+
+        manager_cost.add(1.0)
+        obj.decision(0, 1)
+        self.assertEqual(1, obj.learner.feedback)
+
+        # The strategy updates the interval in the next frame
+        obj.decision(0, 1)
+        self.assertEqual(128, strategy.feedback_time())
+
+    def test_qnoise_001(self):
+        """
+        Test the QNoise QValues of idle and occupied channels.
+        """
+        hist_weight = [0.2, 0.35, 0.45]
+        obj = QNoise(n_weight=0.5, n_data=(0.5, 3, hist_weight), h_weight=0.5, h_data=(0.5, 3, hist_weight))
+
+        # Channel 1: idle, low RSSI. Channel 2: occupied (noise QValue not updated)
+        matrix = [(1, [(1e-7, 0), (1e-7, 0), (1e-7, 1)]),
+                  (2, [(1e-7, 1)])]
+
+        channels, qvalues = obj.evaluate(matrix)
+
+        self.assertEqual([1, 2], channels)
+        self.assertAlmostEqual(0.5 * (0.5 * 2.0 / 3) + 0.5 * (0.5 * 1.0), qvalues[0])
+        self.assertAlmostEqual(0.0, qvalues[1])
+
+        self.assertRaises(ValueError, obj.evaluate, [(3, [(1, 0), (0, 0)])])
+
+
+    def test_chimas_001(self):
+        """
+        Test the Chimas pipelined mode with two radios.
+        """
+        import time
+        from utils import Channel
+
+        class FakeRadio(object):
+            """
+            Radio that senses odd channels as occupied.
+            """
+            def __init__(self):
+                self.sensed = set()
+
+            def sense_channel(self, channel, sensing_time):
+                time.sleep(sensing_time)
+                self.sensed.add(channel.get_channel())
+                return [(1e-7, channel.get_channel() % 2)] * 4
+
+        hist_weight = [0.2, 0.35, 0.45]
+        radios = [FakeRadio(), FakeRadio()]
+        obj = Chimas(radios, QNoise(n_weight=0.5, n_data=(0.5, 3, hist_weight), h_weight=0.5, h_data=(0.5, 3, hist_weight)))
+
+        obj.start([Channel(i, 100e6 + i * 1e6, 200e3) for i in range(4)], sensing_time=0.01)
+        time.sleep(0.2)
+        obj.stop()
+
+        # channels split among the radios
+        self.assertEqual(set([0, 2]), radios[0].sensed)
+        self.assertEqual(set([1, 3]), radios[1].sensed)
+
+        # idle channels first
+        channels, qvalues = obj.ranking()
+        self.assertEqual(set([0, 2]), set(channels[:2]))
+        self.assertTrue(obj.evaluated >= 4)
+
+        # Evaluation errors do not stop the pipeline. The first one is raised by stop (or ranking)
+        class FailingQNoise(object):
+            """
+            Learning algorithm that fails on the first evaluation.
+            """
+            def __init__(self):
+                self.calls = 0
+
+            def evaluate(self, matrix):
+                self.calls += 1
+                if self.calls == 1:
+                    raise ValueError("first evaluation")
+                return [[ch for ch, data in matrix], [1.0] * len(matrix)]
+
+        obj = Chimas([FakeRadio(), FakeRadio()], FailingQNoise())
+        obj.start([Channel(i, 100e6 + i * 1e6, 200e3) for i in range(4)], sensing_time=0.01)
+        time.sleep(0.2)
+
+        self.assertRaises(ValueError, obj.stop)
+        self.assertEqual([0, 1, 2, 3], sorted(obj.ranking()[0]))
+
+        # A radio that fails stops sensing. The other radio keeps sensing
+        class FailingRadio(FakeRadio):
+            """
+            Radio that fails on every sensing.
+            """
+            def __init__(self):
+                FakeRadio.__init__(self)
+                self.calls = 0
+
+            def sense_channel(self, channel, sensing_time):
+                self.calls += 1
+                raise IOError("device error")
+
+        radios = [FailingRadio(), FakeRadio()]
+        obj = Chimas(radios, QNoise(n_weight=0.5, n_data=(0.5, 3, hist_weight), h_weight=0.5, h_data=(0.5, 3, hist_weight)))
+        obj.start([Channel(i, 100e6 + i * 1e6, 200e3) for i in range(4)], sensing_time=0.01)
+        time.sleep(0.2)
+
+        self.assertRaises(IOError, obj.ranking)
+        obj.stop()
+        self.assertEqual(1, radios[0].calls)
+        self.assertEqual(set([1, 3]), radios[1].sensed)
+
+
+    def test_sdc_001(self):
+        """
+        Test the SDC fusion of several channels and the reward update.
+        """
+        obj = SDController(number_cpes=3, feedback_control=5, increase_rate=0.1, decrease_rate=0.5)
+
+        # channel 0: majority idle. channel 1: majority occupied.
+        decisions = obj.sensing_decision(np.array([[0, 1], [0, 1], [1, 0]]))
+
+        self.assertEqual([0, 1], list(decisions))
+        self.assertEqual([1.0, 1.0, 0.25], list(obj._reward))
+
+        # reward weighted vote: cpe 1 and cpe 2 (1 + 0.25) outweigh cpe 0 (1)
+        self.assertEqual(1, obj.sensing_decision(np.array([0, 1, 1])))
+
+        hits = generate_hits([90, 50], 100)
+        self.assertEqual([10, 50], list(hits.sum(axis=1)))
+
+
 if __name__ == '__main__':
     unittest.main()
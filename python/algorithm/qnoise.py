@@ -24,7 +24,8 @@ import numpy as np
 class QLearner:
     """
     Represent a QLearner.
-    ase class for QValue based algorithms.
+    Base class for QValue based algorithms.
+    Keeps the QValue history of all channels in a (n_channels x window) array. Row i is channel i.
     """
 
     # TODO:: parametros da funcao nao sao os mesmos dos da doc.
@@ -39,34 +40,53 @@ class QLearner:
         @param noise_weight Weight of SINR
         @param reward_callback
         """
-        self._qval = [0.0] * len(hist_weight)
-
         ##
         self._l = lookback 
         self._a = alpha
-        self._h = hist_weight
+        self._h = np.asarray(hist_weight, dtype=np.float64)
+
+        # ::TRICKY:: history starts with len(hist_weight) zeros and is never shorter than it
+        self._window = max(lookback, len(self._h))
+
+        self._qval = np.zeros((0, self._window), dtype=np.float64)
+        self._count = np.zeros(0, dtype=np.int64)
 
     @abstractmethod
-    def _reward(self, data):
+    def _reward(self, rssi, dec, valid):
         """
-        Calculate the reward based on data.
+        Calculate the reward of each channel based on data.
         Should be implemented by the derived class.
-        @param data
+        @param rssi Array (n_channels x n_samples) of RSSI values.
+        @param dec Array (n_channels x n_samples) of decisions.
+        @param valid Boolean array (n_channels x n_samples). False for padding samples.
+        @return Array with the reward of each channel.
         """
         pass
 
+    def resize(self, n_channels):
+        """
+        Add rows for new channels.
+        @param n_channels Total number of channels.
+        """
+        n_new = n_channels - len(self._qval)
+
+        if n_new > 0:
+            self._qval = np.vstack((self._qval, np.zeros((n_new, self._window))))
+            self._count = np.concatenate((self._count, np.zeros(n_new, dtype=np.int64)))
+
     def get_q_val(self):
         """
         Return the current QValue.
-        @return Last QValue.
+        @return Array with the last QValue of each channel.
         """
-        return self._qval[-1]
+        return self._qval[:, -1]
 
 
-    def add_q_val(self, value):
+    def add_q_val(self, rows, values):
         """
         Append a value to QValues kept.
-        @param value Value to append.
+        @param rows Indexes of the channels.
+        @param values Values to append. One per channel.
 
         Ex: lookback = 3;
             t=1;    Channel: [Qval t=1]
@@ -75,17 +95,25 @@ class QLearner:
             t=4;    Channel: [Qval t=2][Qval t=3][Qval t=4]
             t=5;    Channel: [Qval t=3][Qval t=4][Qval t=5]
         """
-        self._qval.append(value)
+        qval = self._qval[rows]
+        qval[:, :-1] = qval[:, 1:]
+        qval[:, -1] = values
 
-        if len(self._qval) > self._l:
-            self._qval.pop(0)
+        self._qval[rows] = qval
+        self._count[rows] += 1
 
-    def calc_q_val(self, data):
+    def calc_q_val(self, rows, rssi, dec, valid):
         """
         Calculate the QValue for the given sensing result.
-        @param data Data utilized in the QValue calculation.
+        @param rows Indexes of the channels.
+        @param rssi Array (len(rows) x n_samples) of RSSI values.
+        @param dec Array (len(rows) x n_samples) of decisions.
+        @param valid Boolean array (len(rows) x n_samples). False for padding samples.
         """
-        reward = self._reward(data)
+        if not len(rows):
+            return
+
+        reward = self._reward(rssi, dec, valid)
 
         # Multiply each element on hist_weight by each column on historic table
         #  Ex: hist_weight = [0.2, 0.35, 0.45]
@@ -95,165 +123,171 @@ class QLearner:
         #        Channel 2:    0.2 * 0.8 + 0.35 * 0.3 + 0.45 * 0.4
         #        Channel 3:    0.2 * 0.6 + 0.35 * 0.5 + 0.45 * 0.4
         #        Channel 4:    0.2 * 0.3 + 0.35 * 0.8 + 0.45 * 0.8
-        hist_total = sum([q*h for q,h in zip(self._qval, self._h)])
+        # The weights are applied to the oldest QValues kept (first len(hist_weight) items of the history).
+        size = np.minimum(len(self._h) + self._count[rows], self._window)
+        idx = (self._window - size)[:, np.newaxis] + np.arange(len(self._h))
+        hist_total = np.sum(self._qval[rows[:, np.newaxis], idx] * self._h, axis=1)
 
         # Calculate the QValue
         # qvalue = alpha * reward + (1-alpha) * historic
         qval = self._a * reward + (1 - self._a) * hist_total
 
-        self.add_q_val(qval)
+        self.add_q_val(rows, qval)
 
 
-class QChannel:
+class QNoiseLearner(QLearner):
     """
-    Considers both RSSI and Historic occupancy to calculate the channel QValue.
+    Implements the Noise QValue.
     """
 
-    class QNoiseLearner(QLearner):
+    # Mean RSSI upper limits and SINR contribution
+    SINR_LIMITS = np.array([10e-7, 10e-6, 3 * 10e-6, 6 * 10e-6, 10e-4])
+    SINR_VALUES = np.array([1, 0.75, 0.50, 0.25, 0.10, 0.0])
+
+    def __init__(self, alpha, lookback, hist_weight):
         """
-        Internal class that implements thq Noise QValue.
+        CTOR
+        @param alpha Weight of the most recent reward. Integer.
+        @param lookback How many qvalues we should kept in history. Integer.
+        @hist_weight Weights of last N QValues. List of Integer.
         """
+        QLearner.__init__(self, alpha=alpha, lookback=lookback, hist_weight=hist_weight)
+
 
-        def __init__(self, alpha, lookback, hist_weight):
-            """
-            CTOR
-            @param alpha Weight of the most recent reward. Integer.
-            @param lookback How many qvalues we should kept in history. Integer.
-            @hist_weight Weights of last N QValues. List of Integer.
-            """
-            QLearner.__init__(self, alpha=alpha, lookback=lookback, hist_weight=hist_weight)
-
-
-        def _reward(self, data):
-            """
-            Inherited from parrent
-            Calculate the reward based on a simple table that maps a RSSI value to a reward.
-            @param data
-            @return
-            """
-            # Sanity check
-            if all(rssi == 1 or rssi == 0 for rssi, dec in data):
-                raise ValueError("RSSI is all 0s and 1s. It this right?")
-
-            def sinr_contribution(rssi):
-                contribution = [(10e-7, 1), (10e-6, 0.75), (3 * 10e-6, 0.50), (6 * 10e-6, 0.25), (10e-4, 0.10)]
-                for check, value in contribution:
-                    if rssi < check:
-                        return value
-                return 0.0
-
-            rssi = 0.0
-            count = 0
-
-
-            for _rssi, _dec in data:
-                if _dec == 0:
-                    rssi += _rssi
-                    count += 1
-
-            if count:
-                return sinr_contribution(rssi / count)
-            else:
-                return 0.0
-
-
-    class QHistoricLearner(QLearner):
+    def _reward(self, rssi, dec, valid):
         """
-        Internal class that implements the Historic Occupancy QValue.
+        Inherited from parrent
+        Calculate the reward based on a simple table that maps the mean RSSI of idle samples to a reward.
+        @param rssi
+        @param dec
+        @param valid
+        @return
         """
+        # Sanity check
+        if np.any(np.all(((rssi == 1) | (rssi == 0)) | ~valid, axis=1)):
+            raise ValueError("RSSI is all 0s and 1s. It this right?")
 
-        def __init__(self, alpha, lookback, hist_weight):
-            """
-            CTOR
-            @param alpha Weight of the most recent reward. Integer.
-            @param lookback How many qvalues we should kept in history. Integer.
-            @hist_weight Weights of last N QValues. List of Integer.
-            """
-            QLearner.__init__(self, alpha=alpha, lookback=lookback, hist_weight=hist_weight)
+        idle = (dec == 0) & valid
+        count = np.sum(idle, axis=1)
 
+        mean = np.sum(rssi * idle, axis=1) / np.maximum(count, 1)
+        reward = self.SINR_VALUES[np.searchsorted(self.SINR_LIMITS, mean, side='right')]
 
-        def _reward(self, data):
-            """
-            Inherited from parent.
-            Calculated the reward by dividing the number of 'idles decisions' by the total of decisions.
-            @param data
-            """
+        return np.where(count > 0, reward, 0.0)
 
-            # Sanity check
-            if not all(d == 1 or d == 0 for s, d in data ):
-                raise ValueError("Decisions must be all 0s and 1s")
 
-            idle = np.sum([1-d for s, d in data])
-            return float(idle) / len(data)
+class QHistoricLearner(QLearner):
+    """
+    Implements the Historic Occupancy QValue.
+    """
 
-    def __init__(self, h_weight, h_data, n_weight, n_data):
+    def __init__(self, alpha, lookback, hist_weight):
         """
         CTOR
-        @param h_weight Weight of Historic QLearner instance.
-        @param h_data Historic QLearner instance data. Tuple: (alpha, lookback, hist_weight).
-        @param n_weight Weight of Noise QLearner instance.
-        @param n_data Noise QLearner instance data. Tuple: (alpha, lookback, hist_weight).
-        """
-
-        self._historic = QChannel.QHistoricLearner(alpha=h_data[0],
-                                                   lookback=h_data[1],
-                                                   hist_weight=h_data[2]
-                                                   )
-
-        self._noise = QChannel.QNoiseLearner(alpha=n_data[0],
-                                             lookback=n_data[1],
-                                             hist_weight=n_data[2]
-                                             )
-
-        self._hw = h_weight
-        self._nw = n_weight
-
-    def get_q_val(self):
-        """
-        @return
+        @param alpha Weight of the most recent reward. Integer.
+        @param lookback How many qvalues we should kept in history. Integer.
+        @hist_weight Weights of last N QValues. List of Integer.
         """
-        print' historic: ', self._historic.get_q_val()
-        print' noise:    ', self._noise.get_q_val()
-        return self._hw * self._historic.get_q_val() + self._nw * self._noise.get_q_val()
+        QLearner.__init__(self, alpha=alpha, lookback=lookback, hist_weight=hist_weight)
 
 
-    def calc_q_val(self, final_decision, usensing):
+    def _reward(self, rssi, dec, valid):
         """
-        @param final_decision Final decision regarding channel occupancy.
-        @param usensing Array of tuples (dec, rssi).
+        Inherited from parent.
+        Calculated the reward by dividing the number of 'idles decisions' by the total of decisions.
+        @param rssi
+        @param dec
+        @param valid
         """
 
-        # calculate RSSI only if channel if idle
-        if final_decision == 0:
-            self._noise.calc_q_val(usensing)
+        # Sanity check
+        if np.any(((dec != 1) & (dec != 0)) & valid):
+            raise ValueError("Decisions must be all 0s and 1s")
 
-        self._historic.calc_q_val(usensing)
+        idle = np.sum((dec == 0) & valid, axis=1)
+        return idle.astype(np.float64) / np.maximum(np.sum(valid, axis=1), 1)
 
 
 class QNoise:
     """
     QNoise algorithm.
     Keeps the qvalue for all channels created.
+    Considers both RSSI and Historic occupancy to calculate the channel QValue.
     """
 
     def __init__(self, n_weight, n_data, h_weight, h_data):
         """
         CTOR
-        @param n_weight
-        @param n_data
-        @param h_weight
-        @param h_data
+        @param n_weight Weight of the Noise QValue.
+        @param n_data Noise QLearner data. Tuple: (alpha, lookback, hist_weight).
+        @param h_weight Weight of the Historic QValue.
+        @param h_data Historic QLearner data. Tuple: (alpha, lookback, hist_weight).
         """
+        # Channel -> row of the learners arrays
         self._channel = {}
 
-        # Weight of noise in the QChannel object
+        # Weight of noise
         self._n_weight = n_weight
         self._n_data = n_data
 
-        # Weight of historic in the QChannel object
+        # Weight of historic
         self._h_weight = h_weight
         self._h_data = h_data
 
+        self._noise = QNoiseLearner(alpha=n_data[0], lookback=n_data[1], hist_weight=n_data[2])
+        self._historic = QHistoricLearner(alpha=h_data[0], lookback=h_data[1], hist_weight=h_data[2])
+
+
+    def _rows(self, channels):
+        """
+        @param channels List of channels.
+        @return Array with the row of each channel. New channels are created.
+        """
+        for ch in channels:
+            if ch not in self._channel:
+                self._channel[ch] = len(self._channel)
+
+        self._noise.resize(len(self._channel))
+        self._historic.resize(len(self._channel))
+
+        return np.array([self._channel[ch] for ch in channels], dtype=np.int64)
+
+
+    def get_q_val(self, channels):
+        """
+        @param channels List of channels.
+        @return Array with the QValue of each channel.
+        """
+        rows = self._rows(channels)
+        return self._h_weight * self._historic.get_q_val()[rows] + self._n_weight * self._noise.get_q_val()[rows]
+
+
+    def evaluate_arrays(self, channels, rssi, dec, valid=None):
+        """
+        Calculate QValue for all channels in a single pass.
+        @param channels List of channels. Each channel at most once.
+        @param rssi Array (n_channels x n_samples) of RSSI values.
+        @param dec Array (n_channels x n_samples) of decisions (0 or 1).
+        @param valid Boolean array (n_channels x n_samples). False for padding samples. Optional.
+        @return Array with the QValue of each channel.
+        """
+        rssi = np.asarray(rssi, dtype=np.float64)
+        dec = np.asarray(dec)
+        valid = np.ones(dec.shape, dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+
+        rows = self._rows(channels)
+
+        # Decides if the channel is occupied/vacant based on udecisions
+        occupied = np.sum((dec != 0) & valid, axis=1)
+        vacant = np.sum((dec == 0) & valid, axis=1)
+        idle = occupied <= vacant
+
+        # calculate RSSI only if channel if idle
+        self._noise.calc_q_val(rows[idle], rssi[idle], dec[idle], valid[idle])
+        self._historic.calc_q_val(rows, rssi, dec, valid)
+
+        return self.get_q_val(channels)
+
 
     def evaluate(self, matrix):
         """
@@ -261,42 +295,25 @@ class QNoise:
         @param matrix Each row represents a channel. columns have the following semantics.
         [Channel][Array tuples (RSSI,decisions)].
         <---1---><---parameter udecisions------>
+        @return [channel list, qvalue list]
         """
-        channel_list = []
-        qvalue_list = []
-
-        # Decides if the channel  is occupied/vacant based on udecisions
-        def data_to_final_decision(dec_tuples):
-            occupied = 0
-            vacant = 0
-
-            occupied = np.sum(1 if dec else 0 for rssi, dec in dec_tuples)
-            vacant = np.sum(0 if dec else 1 for rssi, dec in dec_tuples)
+        channel_list = [ch_data[0] for ch_data in matrix]
+        n_samples = max([len(ch_data[1]) for ch_data in matrix] + [0])
 
-            return 1 if occupied > vacant else 0
-
-        for ch_data in matrix:
-            ch = ch_data[0]
-
-            # Check if ch is in channel dictionary
-            if ch not in self._channel:
-                self._channel[ch] = QChannel(h_weight=self._h_weight,
-                                             h_data=self._h_data,
-                                             n_weight=self._n_weight,
-                                             n_data=self._n_data
-                                             )
+        rssi = np.zeros((len(matrix), n_samples), dtype=np.float64)
+        dec = np.zeros((len(matrix), n_samples), dtype=np.float64)
+        valid = np.zeros((len(matrix), n_samples), dtype=bool)
 
-            # Calculate QValue
-            self._channel[ch].calc_q_val(final_decision=data_to_final_decision(ch_data[1]),
-                                         usensing=ch_data[1]
-                                         )
+        for idx, ch_data in enumerate(matrix):
+            n = len(ch_data[1])
+            if n:
+                rssi[idx, :n], dec[idx, :n] = zip(*ch_data[1])
+                valid[idx, :n] = True
 
-            # Use leonard's format
-            channel_list.append(ch)
-            qvalue_list.append(self._channel[ch].get_q_val())
+        qvalue_list = self.evaluate_arrays(channel_list, rssi, dec, valid)
 
         # Return expect format
-        return [channel_list, qvalue_list]
+        return [channel_list, qvalue_list.tolist()]
         
 #if __name__ == '__main__':
 #
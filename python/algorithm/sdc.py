@@ -25,6 +25,8 @@ sys.path.insert(0, path)
 
 from utils import Logger
 
+import numpy as np
+
 # constants
 IDLE = 0
 OCCUPIED = 1
@@ -33,9 +35,9 @@ OCCUPIED = 1
 class SDController:
     """
     Class of the algorithm.
+    Rewards of all CPEs are kept in a numpy array. Decisions of all CPEs (and channels) are fused at once.
     """
 
-    #::TODO:: alguns parametros nao sao usados
     def __init__(self, number_cpes, feedback_control, increase_rate, decrease_rate):
         """
         CTOR
@@ -45,98 +47,106 @@ class SDController:
         @param decrease_rate The decrease rate (float).
         """
         self._fb_cycle = 0
-        self._reward = [1.0] * number_cpes
+        self._reward = np.ones(number_cpes, dtype=np.float64)
+        self._increase_rate = increase_rate
+        self._decrease_rate = decrease_rate
         self._total_idle = self._total_occ = 0
-        Logger.register('sdc', ['decision', ])
+        Logger.register('sdc', ['decision', ], dtype=np.int32)
 
-    def sensing_decision(self, sensing_result, number_cpes):
+    def fuse(self, decisions):
         """
-        Algorithm sensing decision.
-        @param sensing_result
-        @param number_cpes
+        Fuse the decisions of all CPEs.
+        The decision with the highest sum of rewards wins. In case of a tie, the decision of the CPE with the greatest
+        reward wins (IDLE if the greatest rewards are also equal).
+        @param decisions Array (CPEs x channels) of decisions. A 1-D array is a single channel.
+        @return Array with the decision of each channel.
         """
-        #print "simple cycle"
-
-        #feedback cycle control
-        self._fb_cycle += 1
+        decisions = np.asarray(decisions)
+        if decisions.ndim == 1:
+            decisions = decisions[:, np.newaxis]
 
-        #initialize sum of scores for each decision (0,1)
-        sum_result0 = 0.0
-        sum_result1 = 0.0
+        reward = self._reward[:, np.newaxis]
+        idle = (decisions == IDLE)
+        occupied = (decisions == OCCUPIED)
 
-        #keeps the greatest reward for each decision
-        greatest_reward0 = 0.0
-        greatest_reward1 = 0.0
+        #sum of scores for each decision
+        score_r0 = np.sum(reward * idle, axis=0)
+        score_r1 = np.sum(reward * occupied, axis=0)
 
-        #sum of all scores for each decision
-        for decision, reward in zip(sensing_result, self._reward):
+        #greatest reward for each decision
+        greatest_reward0 = np.max(reward * idle, axis=0)
+        greatest_reward1 = np.max(reward * occupied, axis=0)
 
-            #sum of scores for "0" decision
-            if decision == IDLE:
-                sum_result0 += reward 
-                if reward > greatest_reward0:
-                    greatest_reward0 = reward 
-
-            #sum of scores for "1" decision
-            elif decision == OCCUPIED:
-                sum_result1 += reward 
-                if reward > greatest_reward1:
-                    greatest_reward1 = reward 
-
-        #divide the sum of scores by the total number of CPEs
-        score_r1 = sum_result1 / number_cpes
-        score_r0 = sum_result0 / number_cpes
+        #if both scores are equal, then verifies the decision made by the cpe with the greatest individual score
+        tie = np.where(greatest_reward0 >= greatest_reward1, IDLE, OCCUPIED)
 
-        #verifies which sum of scores is higher, score1 or score0
-        if score_r0 > score_r1:
-            sensing_decision = IDLE
+        return np.where(score_r0 > score_r1, IDLE, np.where(score_r0 < score_r1, OCCUPIED, tie))
 
-        elif score_r0 < score_r1:
-            sensing_decision = OCCUPIED
+    def sensing_decision(self, sensing_result, number_cpes=None):
+        """
+        Algorithm sensing decision.
+        @param sensing_result Decision of each CPE. Array (CPEs x channels) to decide several channels at once.
+        @param number_cpes Not used. Kept for compatibility.
+        @return Decision. Array with the decision of each channel if sensing_result is a matrix.
+        """
+        #feedback cycle control
+        self._fb_cycle += 1
 
-        #if both scores are equal, then verifies the decision made by the cpe with the greatest individual score
-        elif score_r0 == score_r1:
-            if greatest_reward0 >= greatest_reward1:
-                sensing_decision = IDLE
-            elif greatest_reward0 < greatest_reward1:
-                sensing_decision = OCCUPIED
+        sensing_result = np.asarray(sensing_result)
+        decisions = self.fuse(sensing_result)
 
         #verifies if is feedback cycle
         #if (self._fb_cycle % (feedback_control-1) == 0):
-        Logger.append('sdc', 'decision', sensing_decision)
-        if sensing_decision == OCCUPIED:
-            self._total_occ += 1
-        else:
-            self._total_idle += 1
-        self.feedback(sensing_result, sensing_decision, increase_rate, decrease_rate)
+        Logger.append_many('sdc', 'decision', decisions.tolist())
 
+        n_occ = int(np.sum(decisions == OCCUPIED))
+        self._total_occ += n_occ
+        self._total_idle += len(decisions) - n_occ
 
-    def feedback(self, sensing_result, sensing_decision, increase_rate, decrease_rate):
+        self.feedback(sensing_result, decisions)
+
+        return decisions if sensing_result.ndim > 1 else decisions[0]
+
+    def feedback(self, sensing_result, sensing_decision, increase_rate=None, decrease_rate=None):
         """
         If it is a Feedback cycle.
-        @param sensing_result
-        @param sensing_decision
-        @param increase_rate
-        @param decrease_rate
+        Channels are applied in order, as if each one was a feedback cycle.
+        @param sensing_result Decision of each CPE. Array (CPEs x channels) for several channels.
+        @param sensing_decision SDC decision. Array with one decision per channel for several channels.
+        @param increase_rate Default: the CTOR value.
+        @param decrease_rate Default: the CTOR value.
         """
-        #print "feedback cycle"
+        increase_rate = self._increase_rate if increase_rate is None else increase_rate
+        decrease_rate = self._decrease_rate if decrease_rate is None else decrease_rate
+
+        sensing_result = np.asarray(sensing_result)
+        if sensing_result.ndim == 1:
+            sensing_result = sensing_result[:, np.newaxis]
 
         #analyze if the decision made by each CPE matches the decision made by the SDC
-        for index, decision in enumerate(sensing_result):
-            #match, increase reward
-            if decision == sensing_decision:
-                self._reward[index] *= (1.0 + increase_rate)
-                if self._reward[index] > 1.0:
-                    self._reward[index] = 1.0
-
-            #doesnt match, decrease reward
-            elif decision != sensing_decision:
-                self._reward[index] *= (1.0 - decrease_rate)
-        
-        print "\n***********************"
-        print "result: " + str(sensing_result)
-        print "decision: " + str(sensing_decision)
-        print self._reward
+        for channel, decision in enumerate(np.atleast_1d(sensing_decision)):
+            match = (sensing_result[:, channel] == decision)
+
+            #match, increase reward. doesnt match, decrease reward
+            self._reward[match] = np.minimum(self._reward[match] * (1.0 + increase_rate), 1.0)
+            self._reward[~match] *= (1.0 - decrease_rate)
+
+
+def generate_hits(hit_rate, num_steps):
+    """
+    Synthetic sensing results.
+    @param hit_rate A list with the hit ratio (%) for every cpe.
+    @param num_steps Number of sensing results of each cpe.
+    @return Array (cpes x num_steps). Misses (1) are drawn without replacement.
+    """
+    array_hit = np.zeros((len(hit_rate), num_steps), dtype=np.int32)
+
+    # set some random positions of the arrays to one.
+    for i, rate in enumerate(hit_rate):
+        n_miss = int(np.ceil(num_steps - (num_steps * rate / 100)))
+        array_hit[i, random.sample(xrange(num_steps), n_miss)] = 1
+
+    return array_hit
 
 
 def execute_sensing_decision(hit_rate, num_steps):
@@ -163,39 +173,18 @@ def execute_sensing_decision(hit_rate, num_steps):
 
     sdc = SDController(num_cpes, feedback_control, increase_rate, decrease_rate)    
 
-    # each element of this array is also an array. the array of the index 0 (ie, array_hit[0]) corresponds to the hit_
-    # rate[0] and so on.
-    cpe_array = [0] * num_steps
-    
-    array_hit = []
+    # row i has the sensing results of the cpe i
+    array_hit = generate_hits(hit_rate, num_steps)
 
-    # num_cpes is the length of array_hit
-    for i in range(num_cpes):
-        # need to append as a list because otherwise if we modify some subarray, ALL arrays are modified too.
-        array_hit.append(list(cpe_array))
-
-    # list of lists, where the random indexes will be.
-    list_indexes = []
-    for i in range(num_cpes):
-        list_indexes.append(list([]))
-
-    # set some random positions of the arrays to one.
-    for i in range(num_cpes):
-        while len(list_indexes[i]) < (num_steps - (num_steps * hit_rate[i]/100)):
-            rand = random.randint(0, num_steps-1)
-            if rand not in list_indexes[i]:
-                list_indexes[i].append(rand)
-                array_hit[i][rand] = 1
+    # reward of each cpe before each step
+    reward_hist = np.zeros((num_steps, num_cpes), dtype=np.float64)
 
     for step in range(num_steps):
-        sensing_result = []
-            
-        for cpe in range(num_cpes):
-            sensing_result.append(array_hit[cpe][step])
-            Logger.append("reward", list_str_cpes[cpe], sdc._reward[cpe])    
-    
+        reward_hist[step] = sdc._reward
+        sdc.sensing_decision(array_hit[:, step], num_cpes)    
 
-        sdc.sensing_decision(sensing_result, num_cpes)    
+    for cpe in range(num_cpes):
+        Logger.append_many("reward", list_str_cpes[cpe], reward_hist[:, cpe].tolist())
 
     Logger.dump('./dump', '/cpes', 0)
 
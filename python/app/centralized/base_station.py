@@ -162,7 +162,7 @@ class GNamespace():
             [1.0, 1.0, 1.0, 1.0],  # link 5
             [1.0, 1.0, 1.0, 1.0]  # link 6
         ]
-        self.graph = Graph(self.interference_matrix, self.utility_matrix)
+        self.graph = Graph(self.interference_matrix, self.utility_matrix, mode=Graph.ASSIGNMENT)
 
 
 
@@ -188,7 +188,7 @@ class GNamespace():
             [1.0, 1.0, 1.0, 0.0]  # canal 4
         ]
 
-        self.genetic = Genetic(self.gen_occ_matrix, self.gen_reward_matrix, self.gen_interference_matrix)
+        self.genetic = Genetic()
 
 
         # blp
@@ -390,7 +390,7 @@ def algo_graph(links, channels):
     """
     # LOGIC HERE
     globs.graph.graph = globs.utility_matrix
-    links_dict = globs.graph.increaseUtility(channels, links)
+    links_dict = globs.graph.assign(links, channels)
     return links_dict
 
 
@@ -399,10 +399,12 @@ def algo_genetic(links, channels):
     @param links
     @param channels
     """
-    globs.genetic.occupancy_matrix = globs.gen_occ_matrix
-    globs.genetic.reward_matrix = globs.gen_reward_matrix
+    data = {Genetic.OCCUPANCY_MATRIX: globs.gen_occ_matrix,
+            Genetic.REWARD_MATRIX: globs.gen_reward_matrix,
+            Genetic.INTERFERENCE_MATRIX: globs.gen_interference_matrix,
+            Genetic.ITERATIONS: 1000}
 
-    res = globs.genetic.full_process(1000)
+    res = globs.genetic.evaluate(data)
 
     d = {}
     for i in links:
@@ -483,7 +485,7 @@ def algo_blp(links, channels):
     C = map(lambda x: globs.blp_rssi[x], channels)
     gama = [[1.0] * len(links)] * len(channels)
 
-    res = blp.BLP(n, l, u, Pmax, B, Pi, I, U, C, gama)
+    res = blp.BLP.blp_execution(n, l, u, Pmax, B, Pi, I, U, C, gama)
     print n
     print l
     print Pmax
@@ -0,0 +1,248 @@
+"""
+Copyright 2013 OpERA
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+"""
+
+## @package decision
+#  Benchmark of the decision algorithms.
+#
+#  Each algorithm runs through its evaluate(data) entry point on synthetic inputs (fixed seeds) of growing size.
+#  One JSON record per line is written with the wall time, the peak memory and the achieved objective:
+#
+#  python benchmark.py --sizes 4,8,16 --repeat 3 --output bench.json
+
+import sys
+import json
+import time
+import Queue
+import random
+import resource
+import multiprocessing
+from optparse import OptionParser
+
+import numpy as np
+
+from abstractDecisionAlgorithm import AbstractDecisionAlgorithm as Data
+from genetic import Genetic
+from simAnnealing import Channel, default_parameters
+from fuzzy import Fuzzy
+from blp import BLP
+from graph import Graph
+
+
+def generate_data(size, seed):
+    """
+    Synthetic input of the decision algorithms. size links/radios and size channels.
+    @param size Number of links and channels.
+    @param seed Random seed.
+    @return Dictionary with all keys of AbstractDecisionAlgorithm.
+    """
+    rnd = np.random.RandomState(seed)
+
+    # symmetric link x link interference. A link always interferes with itself
+    interference = np.triu(rnd.random_sample((size, size)) < 0.5, 1)
+    interference = (interference | interference.T | np.eye(size, dtype=bool)).astype(int)
+
+    data = {}
+    data[Data.RSSI] = rnd.random_sample(size).tolist()
+    data[Data.LINKS] = range(size)
+    data[Data.CHANNELS] = range(size)
+    data[Data.CHANNEL_PU_PRESENCE] = (100 * rnd.random_sample(size)).tolist()
+    data[Data.CHANNEL_SU_PRESENCE] = (100 * rnd.random_sample(size)).tolist()
+    data[Data.OCCUPANCY_MATRIX] = (rnd.random_sample((size, size)) < 0.7).astype(int).tolist()
+    data[Data.REWARD_MATRIX] = rnd.random_sample((size, size)).tolist()
+    data[Data.INTERFERENCE_MATRIX] = interference.tolist()
+    data[Data.ITERATIONS] = 100
+    data[Data.UTILITY_MATRIX] = rnd.random_sample((size, size)).tolist()
+    data[Data.POSSIBLE_LINKS] = range(size)
+    data[Data.POSSIBLE_FREQUENCIES] = range(size)
+    data[Data.SIM_ANNEALING_PARAMETERS] = default_parameters()
+
+    # channel bandwidths (BLP)
+    data['bandwidth'] = rnd.choice([200, 400, 500], size).tolist()
+
+    return data
+
+
+def run_genetic(data):
+    """
+    @param data Input (see generate_data).
+    @return Fitness of the best allocation.
+    """
+    genetic = Genetic()
+    return genetic.fitness(genetic.evaluate(data), data)
+
+
+def run_sim_annealing(data):
+    """
+    @param data Input (see generate_data).
+    @return Best (lowest) solution among the channels.
+    """
+    results = []
+    for pu_rate in data[Data.CHANNEL_PU_PRESENCE]:
+        params = dict(data[Data.SIM_ANNEALING_PARAMETERS], pu_rate=pu_rate / 100.0)
+        results.append(Channel().evaluate({Data.SIM_ANNEALING_PARAMETERS: params}))
+
+    return min(results)
+
+
+def run_fuzzy(data):
+    """
+    @param data Input (see generate_data).
+    @return Best (lowest) channel evaluation.
+    """
+    return min(Fuzzy().evaluate(data))
+
+
+def run_blp(data):
+    """
+    @param data Input (see generate_data).
+    @return Sum of the bandwidth of the allocated channels.
+    """
+    blp = BLP()
+    blp.channel_list = data['bandwidth']
+
+    return sum(data['bandwidth'][m - 1] for _, m in blp.evaluate(data))
+
+
+def run_graph(mode):
+    """
+    @param mode Graph mode.
+    @return Function running Graph in mode. It returns the sum of the utilities of the allocation.
+    """
+    def _run(data):
+        alloc = Graph(mode=mode).evaluate(data)
+        return sum(data[Data.UTILITY_MATRIX][l][f] for l, f in alloc.items())
+    return _run
+
+
+## Benchmarked algorithms: name -> function(data) returning the objective.
+ALGORITHMS = [
+    ('genetic', run_genetic),
+    ('sim_annealing', run_sim_annealing),
+    ('fuzzy', run_fuzzy),
+    ('blp', run_blp),
+    ('graph_greedy', run_graph(Graph.GREEDY)),
+    ('graph_assignment', run_graph(Graph.ASSIGNMENT)),
+]
+
+## Interval (seconds) of the checks of the benchmark process while waiting its record.
+POLL_INTERVAL = 1.0
+
+
+def _measure(name, size, seed, repeat, queue):
+    """
+    Run a benchmark case in a child process. The record is put in queue.
+    @param name Algorithm name.
+    @param size Input size.
+    @param seed Random seed.
+    @param repeat Number of runs.
+    @param queue multiprocessing.Queue.
+    """
+    func = dict(ALGORITHMS)[name]
+    record = {'algorithm': name, 'size': size, 'seed': seed, 'repeat': repeat}
+
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    try:
+        for _ in range(repeat):
+            # ::TRICKY:: some algorithms consume the input lists
+            data = generate_data(size, seed)
+            random.seed(seed)
+            np.random.seed(seed)
+
+            start = time.time()
+            objective = func(data)
+            times.append(time.time() - start)
+    except Exception as e:  #pylint: disable=W0703
+        record['error'] = repr(e)
+        queue.put(record)
+        return
+
+    record['time_min'] = min(times)
+    record['time_median'] = float(np.median(times))
+    record['peak_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0
+    record['objective'] = float(objective)
+    queue.put(record)
+
+
+def benchmark(sizes, repeat=3, seed=0, algorithms=None):
+    """
+    Benchmark the decision algorithms.
+    Each case runs in its own process, so peak_kb is the growth of the peak resident memory during the case.
+    @param sizes List of input sizes.
+    @param repeat Number of runs of each case.
+    @param seed Random seed of the inputs and of the algorithms.
+    @param algorithms List of algorithm names. Default: all in ALGORITHMS.
+    @return Generator of records (dict), one per algorithm and size. If the process of a case dies (e.g. killed
+            by the OOM killer), its record has only the case and 'error'.
+    """
+    names = [name for name, _ in ALGORITHMS]
+    for name in algorithms or names:
+        if name not in names:
+            raise AttributeError("Unknown algorithm: %s" % name)
+
+    for name in algorithms or names:
+        for size in sizes:
+            queue = multiprocessing.Queue()
+            proc = multiprocessing.Process(target=_measure, args=(name, size, seed, repeat, queue))
+            proc.start()
+
+            record = None
+            while record is None:
+                try:
+                    record = queue.get(timeout=POLL_INTERVAL)
+                except Queue.Empty:
+                    if proc.is_alive():
+                        continue
+
+                    # ::TRICKY:: the record may be put between the timeout and the check
+                    try:
+                        record = queue.get(timeout=POLL_INTERVAL)
+                    except Queue.Empty:
+                        record = {'algorithm': name, 'size': size, 'seed': seed, 'repeat': repeat,
+                                  'error': 'process exited with code %s' % proc.exitcode}
+            proc.join()
+
+            yield record
+
+
+def main():
+    """
+    Main function.
+    """
+    parser = OptionParser()
+    parser.add_option("", "--sizes", type="string", default="4,8,16", help="Comma separated input sizes.")
+    parser.add_option("", "--repeat", type="int", default=3, help="Runs of each case.")
+    parser.add_option("", "--seed", type="int", default=0, help="Random seed.")
+    parser.add_option("", "--algorithms", type="string", default="",
+                      help="Comma separated algorithms. Default: all (%s)." % ",".join(n for n, _ in ALGORITHMS))
+    parser.add_option("", "--output", type="string", default="", help="Output file. Default: stdout.")
+    (options, args) = parser.parse_args()
+
+    sizes = [int(size) for size in options.sizes.split(',')]
+    algorithms = options.algorithms.split(',') if options.algorithms else None
+
+    out = open(options.output, 'w') if options.output else sys.stdout
+    try:
+        for record in benchmark(sizes, options.repeat, options.seed, algorithms):
+            out.write(json.dumps(record, sort_keys=True) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -18,14 +18,197 @@ __author__ = 'jtsreinaldo'
 
 from abstractDecisionAlgorithm import AbstractDecisionAlgorithm
 
-import subprocess
-import imp
-import os
+import numpy as np
+import scipy
+from scipy.optimize import linprog
 
-DIR = "."
-TMPFILE = DIR + "/file.tmp"
-MODELFILE = DIR + "/shu.mod"
-OUTPUTFILE = DIR + "/temp.py"
+# Tolerance used to consider a relaxed variable integral
+INT_TOL = 1e-6
+
+# LP method of the relaxations. HiGHS if available (SciPy >= 1.6), otherwise interior point.
+LP_METHOD = 'highs' if tuple(int(v) for v in scipy.__version__.split('.')[:2]) >= (1, 6) else 'interior-point'
+LP_OPTIONS = {} if LP_METHOD == 'highs' else {'sparse': True}
+
+# LP method used when LP_METHOD fails (iteration limit, numerical difficulties).
+LP_FALLBACK = 'highs-ds' if LP_METHOD == 'highs' else 'simplex'
+
+# linprog status of an infeasible LP
+LP_INFEASIBLE = 2
+
+
+class BranchAndBound(object):
+    """
+    Branch and bound solver of the binary linear program of shu.mod.
+    Variables y[m, k, i] are 1 if link i transmits in channel m with rate k. Each node solves the LP relaxation.
+
+    The constraint matrix is built once. Only the rows depending on C (channel capacity/RSSI) are rebuilt when it
+    changes and the last solution is used as the initial incumbent (warm start).
+    """
+
+    def __init__(self, n, l, u, p_max, big_b, pi, big_i, big_u, gama):
+        """
+        CTOR
+        @param n Number of channels.
+        @param l Number of links.
+        @param u Number of rates.
+        @param p_max Max power of each link.
+        @param big_b Bandwidth of each channel.
+        @param pi Power mask of each channel.
+        @param big_i Interference matrix (l x l).
+        @param big_u Rates.
+        @param gama Matrix (n x u or larger).
+        """
+        self._n, self._l, self._u = n, l, u
+        self._pi = np.asarray(pi, dtype=np.float64)[:n]
+        self._p_max = np.asarray(p_max, dtype=np.float64)[:l]
+        self._gama = np.array([row[:u] for row in gama[:n]], dtype=np.float64)
+
+        # ::TRICKY:: variables are ordered (i, m, k): the order of the glpsol output
+        n_var = l * n * u
+        self._c = -np.tile(np.outer(np.asarray(big_b[:n], dtype=np.float64), np.asarray(big_u[:u])).ravel(), l)
+
+        # cr_to_pr {m, i} and power_suply {i}: scaled by C[m] * gama[m, k] in set_capacity
+        self._s_pr = np.kron(np.eye(l * n), np.ones(u))
+        self._s_ps = np.kron(np.eye(l), np.ones(n * u))
+
+        # cr_to_cr {m, (i, j) : i != j}
+        # ::TRICKY:: one_channel limits each channel to one link. Rows with 2 - I[i, j] >= 1 are redundant
+        rows, b_cr = [], []
+        for m in range(n):
+            for i in range(l):
+                for j in range(l):
+                    if i != j and 2 - big_i[i][j] < 1:
+                        row = np.zeros((l, n, u))
+                        row[i, m, :] += 1
+                        row[j, m, :] += 1
+                        rows.append(row.ravel())
+                        b_cr.append(2 - big_i[i][j])
+
+        # one_transmission_per_cr {i} and one_channel {m}
+        one_channel = np.tile(np.kron(np.eye(n), np.ones(u)), l)
+
+        self._a_static = np.vstack([np.array(rows).reshape(-1, n_var), self._s_ps, one_channel])
+        self._b_static = np.concatenate([b_cr, np.ones(l), np.ones(n)])
+
+        self._a_ub = None
+        self._b_ub = None
+        self._ub = None
+        self._x = None
+
+
+    def set_capacity(self, big_c):
+        """
+        Update the constraints depending on C.
+        @param big_c Capacity (or RSSI) of each channel.
+        """
+        # weight of each variable: C[m] * gama[m, k]
+        w = np.tile((np.asarray(big_c[:self._n], dtype=np.float64)[:, np.newaxis] * self._gama).ravel(), self._l)
+
+        self._a_ub = np.vstack([self._s_pr * w, self._s_ps * w, self._a_static])
+        self._b_ub = np.concatenate([np.tile(self._pi, self._l), self._p_max, self._b_static])
+
+        # variables that violate a constraint alone are fixed to 0
+        limit = np.minimum(np.repeat(np.tile(self._pi, self._l), self._u), np.repeat(self._p_max, self._n * self._u))
+        self._ub = (w <= limit + INT_TOL).astype(np.float64)
+
+
+    def _feasible(self, x):
+        """
+        @param x Binary solution.
+        @return True if x satisfies all constraints.
+        """
+        return np.all(x <= self._ub) and np.all(self._a_ub.dot(x) <= self._b_ub + INT_TOL)
+
+
+    def _round(self, x, lower, upper):
+        """
+        Rounding heuristic. Variables fixed to 1 are set, then the others are set in decreasing order of x while the
+        constraints hold.
+        @param x Relaxed solution.
+        @param lower Lower bound of the variables.
+        @param upper Upper bound of the variables.
+        @return Binary solution or None if the variables fixed to 1 are infeasible.
+        """
+        ret = lower.copy()
+        load = self._a_ub.dot(ret)
+        if np.any(load > self._b_ub + INT_TOL):
+            return None
+
+        for j in np.argsort(-x, kind='mergesort'):
+            if x[j] <= INT_TOL:
+                break
+            if ret[j] == 0 and upper[j] == 1 and np.all(load + self._a_ub[:, j] <= self._b_ub + INT_TOL):
+                ret[j] = 1
+                load += self._a_ub[:, j]
+
+        return ret
+
+
+    def _relax(self, lower, upper):
+        """
+        Solve the LP relaxation of a node. A failed LP is solved again with LP_FALLBACK.
+        @param lower Lower bound of the variables.
+        @param upper Upper bound of the variables.
+        @return linprog result. Status is 0 (solved) or LP_INFEASIBLE.
+        """
+        bounds = list(zip(lower, upper))
+
+        res = linprog(self._c, A_ub=self._a_ub, b_ub=self._b_ub, bounds=bounds, method=LP_METHOD, options=LP_OPTIONS)
+        if res.status in (0, LP_INFEASIBLE):
+            return res
+
+        res = linprog(self._c, A_ub=self._a_ub, b_ub=self._b_ub, bounds=bounds, method=LP_FALLBACK)
+        if res.status in (0, LP_INFEASIBLE):
+            return res
+
+        # ::TRICKY:: pruning a node not solved could discard the optimum
+        raise ValueError("LP relaxation failed (status %d): %s" % (res.status, res.message))
+
+
+    def solve(self):
+        """
+        Solve the binary linear program. Depth first, branching on the most fractional variable.
+        The relaxed solution of each node is rounded to improve the incumbent.
+        Raises ValueError if the relaxation of a node can not be solved.
+        @return Binary array with the optimal y, ordered (i, m, k).
+        """
+        best_x = np.zeros(len(self._c))
+        if self._x is not None and self._feasible(self._x):
+            best_x = self._x
+        best_val = self._c.dot(best_x)
+
+        stack = [(np.zeros(len(self._c)), self._ub)]
+        while stack:
+            lower, upper = stack.pop()
+
+            res = self._relax(lower, upper)
+            if res.status == LP_INFEASIBLE or res.fun >= best_val - INT_TOL * (1 + abs(best_val)):
+                continue
+
+            rounded = self._round(res.x, lower, upper)
+            if rounded is not None and self._c.dot(rounded) < best_val:
+                best_x, best_val = rounded, self._c.dot(rounded)
+                if res.fun >= best_val - INT_TOL * (1 + abs(best_val)):
+                    continue
+
+            frac = np.abs(res.x - np.round(res.x))
+            j = np.argmax(frac)
+
+            if frac[j] < INT_TOL:
+                best_x = np.round(res.x)
+                best_val = self._c.dot(best_x)
+                continue
+
+            # explore y[j] = 1 first
+            up_0 = upper.copy()
+            up_0[j] = 0
+            low_1 = lower.copy()
+            low_1[j] = 1
+            stack.append((lower, up_0))
+            stack.append((low_1, upper))
+
+        self._x = best_x
+        return best_x
 
 
 class BLP(AbstractDecisionAlgorithm):
@@ -33,6 +216,10 @@ class BLP(AbstractDecisionAlgorithm):
     BLP decision algorithm class.
     """
 
+    # Solver of the last call. Reused while only C changes.
+    _solver = None
+    _solver_key = None
+
     def __init__(self):
         """
         CTOR
@@ -44,86 +231,27 @@ class BLP(AbstractDecisionAlgorithm):
     def blp_execution(n, l, u, p_max, big_b, pi, big_i, big_u, big_c, gama):
         """
         Execution of the BLP algorithm.
-        @param n
-        @param l
-        @param u
-        @param p_max
-        @param big_b
-        @param pi
-        @param big_i
-        @param big_u
-        @param big_c
-        @param gama
-        """
-
-        ################################## Creating data for GLPK ###########################
-        text = "data;\n"
-        #Defining channel number
-        text += "param n := %d;\n" % (n)
-        #Defining number of links
-        text += "param l := %d;\n" % (l)
-        #Defining u
-        text += "param u := %d;\n" % (u)
-        #Defining links max power
-        text += "param Pmax :="
-        for i in range(l):
-            text += str(i + 1) + " " + str(p_max[i]) + " "
-        text += ";\n"
-        #Defining links bandwidth
-        text += "param B :="
-        for m in range(n):
-            text += str(m + 1) + " " + str(big_b[m]) + " "
-        text += ";\n"
-        #Defining channel capacity per channel or SNR
-        text += "param C :="
-        for m in range(n):
-            text += " %d %f" % (m + 1, big_c[m])
-        text += ";\n"
-        #Defining power mask
-        text += "param Pi := \n"
-        for i in range(n):
-            text += "%d %f " % (i + 1, pi[i])
-        text += ";\n"
-
-        #Creating Intereference matrix
-        text += "param I : \n"
-        text_aux = ":="
-        for i in range(l):
-            text += str(i + 1) + " "
-            text_aux += "\n"
-            text_aux += str(i + 1) + " "
-            for j in range(l):
-                text_aux += str(big_i[i][j]) + " "
-        text += text_aux
-        text += ";\n"
-        #Defining U
-        text += "param U := \n"
-        for i in range(u):
-            text += "%d %f " % (i + 1, big_u[i])
-        text += ";\n"
-        #Calculating gama
-        text += "param gama : \n"
-        for i in range(u):
-            text += str(i + 1) + " "
-        text += ":="
-        for m in range(n):
-            text += "\n"
-            text += str(m + 1) + " "
-            for k in range(u):
-                text += str(gama[m][k]) + " "
-        text += ";\nend;"
-        f = open(TMPFILE, "w")
-        f.write(text)
-        f.close()
-
-        # Execute this command in terminal.
-        cmd = "glpsol -m " + MODELFILE + " -d " + TMPFILE + " -o /dev/null -y " + OUTPUTFILE + " &>/dev/null"
-
-        subprocess.call([cmd], shell=True)
+        @param n Number of channels.
+        @param l Number of links.
+        @param u Number of rates.
+        @param p_max Max power of each link.
+        @param big_b Bandwidth of each channel.
+        @param pi Power mask of each channel.
+        @param big_i Interference matrix (l x l).
+        @param big_u Rates.
+        @param big_c Capacity (or RSSI) of each channel.
+        @param gama Matrix (n x u).
+        @return List of [link, channel] pairs (1-based), ordered by link.
+        """
+        key = repr((n, l, u, p_max, big_b, pi, big_i, big_u, gama))
+        if key != BLP._solver_key:
+            BLP._solver = BranchAndBound(n, l, u, p_max, big_b, pi, big_i, big_u, gama)
+            BLP._solver_key = key
 
-        import temp
+        BLP._solver.set_capacity(big_c)
+        y = BLP._solver.solve().reshape(l, n, u)
 
-        return temp.ret
+        return [[i + 1, m + 1] for i, m, k in zip(*np.nonzero(y))]
 
 
     def evaluate(self, data):
@@ -142,25 +270,8 @@ class BLP(AbstractDecisionAlgorithm):
         big_c = map(lambda x: data[self.RSSI][x], data[self.CHANNELS])
         gama = [[1.0] * len(data[self.LINKS])] * len(data[self.CHANNELS])
 
-        print "\n******************************************\n"
-        print "PARAMETERS"
-        print "\nn = " + str(n)
-        print "\nl = " + str(l)
-        print "\np_max = " + str(p_max)
-        print "\nbig_b = " + str(big_b)
-        print "\npi = " + str(pi)
-        print "\nbig_i = " + str(big_i)
-        print "\nbig_u = " + str(big_u)
-        print "\nu = " + str(u)
-        print "\nbig_c = " + str(big_c)
-        print "\ngama = " + str(gama)
-        print "\n******************************************\n"
-
         solution = self.blp_execution(n, l, u, p_max, big_b, pi, big_i, big_u, big_c, gama)
 
-        print "SOLUTION = " + str(solution)
-        print "\n******************************************\n"
-
         return solution
 
 
@@ -35,6 +35,8 @@ VERY_BAD_CHANNEL = 4
 SIZE_PRESENCE = 100
 SIZE_CHANNEL = 100  # SNR
 
+import numpy as np
+
 from abstractDecisionAlgorithm import AbstractDecisionAlgorithm
 
 
@@ -230,10 +232,44 @@ class ChannelClassification(object):
         return u
 
 
+def _curves(functions, size):
+    """
+    Sample membership functions.
+    @param functions List of membership functions.
+    @param size Number of points (0, 1, ..., size - 1).
+    @return Array (len(functions) x size).
+    """
+    return np.array([[f(i) for i in range(size)] for f in functions], dtype=np.float64)
+
+
+# Presence membership curves, one row per presence set. Memberships of any presence are interpolated on them.
+PRESENCE_AXIS = np.arange(SIZE_PRESENCE + 1, dtype=np.float64)
+PRESENCE_CURVES = _curves([UserPresence.u_low_presence,
+                           UserPresence.u_medium_presence,
+                           UserPresence.u_high_presence,
+                           UserPresence.u_very_high_presence,
+                           UserPresence.u_extreme_high_presence], SIZE_PRESENCE + 1)
+
+# Channel classification curves, one row per channel set.
+CHANNEL_AXIS = np.arange(SIZE_CHANNEL, dtype=np.float64)
+CHANNEL_CURVES = _curves([ChannelClassification.u_very_good_channel,
+                          ChannelClassification.u_good_channel,
+                          ChannelClassification.u_intermediate_channel,
+                          ChannelClassification.u_bad_channel,
+                          ChannelClassification.u_very_bad_channel], SIZE_CHANNEL)
+
+
 class Fuzzy(AbstractDecisionAlgorithm):
     """
     Fuzzy decision algorithm.
     """
+
+    # Weight of the PU presence in the channel evaluation. The SU presence has weight (1 - PU_WEIGHT).
+    PU_WEIGHT = 0.1
+
+    # Classification of the integer presences (0, 1, ..., SIZE_PRESENCE). Built on first use.
+    _lut = None
+
     def __init__(self):
         """
         CTOR
@@ -248,14 +284,21 @@ class Fuzzy(AbstractDecisionAlgorithm):
         @param u_user_presence
         @return The user presence.
         """
-        u_user_presence[LOW_PRESENCE] = UserPresence.u_low_presence(presence)
-        u_user_presence[MEDIUM_PRESENCE] = UserPresence.u_medium_presence(presence)
-        u_user_presence[HIGH_PRESENCE] = UserPresence.u_high_presence(presence)
-        u_user_presence[VERY_HIGH_PRESENCE] = UserPresence.u_very_high_presence(presence)
-        u_user_presence[EXTREME_HIGH_PRESENCE] = UserPresence.u_extreme_high_presence(presence)
+        u_user_presence[:] = Fuzzy.fuzzify_batch([presence])[0].tolist()
 
         return u_user_presence
 
+    @staticmethod
+    def fuzzify_batch(presence):
+        """
+        Fuzzifier of several presence values.
+        The membership curves are linearly interpolated between integer presences.
+        @param presence Sequence of presence values (0 to SIZE_PRESENCE).
+        @return Array (len(presence) x 5) with the membership degree of each presence set.
+        """
+        presence = np.asarray(presence, dtype=np.float64)
+        return np.array([np.interp(presence, PRESENCE_AXIS, curve) for curve in PRESENCE_CURVES]).T
+
 
     @staticmethod
     def evaluate_rules(u_user_presence, u_channel_classification):
@@ -300,99 +343,71 @@ class Fuzzy(AbstractDecisionAlgorithm):
         @param u_channel_classification
         @return The channel classification.
         """
-        numerator = 0.0
-        divisor = 0.0
-        channel_classification = 0.0
-        result_set = [0.0 for i in range(SIZE_CHANNEL)]
-
-        if u_channel_classification[VERY_GOOD_CHANNEL] > 0:
-            for i in range(SIZE_CHANNEL):
-                u_aux = ChannelClassification.u_very_good_channel(i)
-                if u_aux > u_channel_classification[VERY_GOOD_CHANNEL]:
-                    u_aux = u_channel_classification[VERY_GOOD_CHANNEL]
-                if u_aux > result_set[i]:
-                    result_set[i] = u_aux
-
-        if u_channel_classification[GOOD_CHANNEL] > 0:
-            for i in range(SIZE_CHANNEL):
-                u_aux = ChannelClassification.u_good_channel(i)
-                if u_aux > u_channel_classification[GOOD_CHANNEL]:
-                    u_aux = u_channel_classification[GOOD_CHANNEL]
-                if u_aux > result_set[i]:
-                    result_set[i] = u_aux
-
-        if u_channel_classification[INTERMEDIATE_CHANNEL] > 0:
-            for i in range(SIZE_CHANNEL):
-                u_aux = ChannelClassification.u_intermediate_channel(i)
-                if u_aux > u_channel_classification[INTERMEDIATE_CHANNEL]:
-                    u_aux = u_channel_classification[INTERMEDIATE_CHANNEL]
-                if u_aux > result_set[i]:
-                    result_set[i] = u_aux
-
-        if u_channel_classification[BAD_CHANNEL] > 0:
-            for i in range(SIZE_CHANNEL):
-                u_aux = ChannelClassification.u_bad_channel(i)
-                if u_aux > u_channel_classification[BAD_CHANNEL]:
-                    u_aux = u_channel_classification[BAD_CHANNEL]
-                if u_aux > result_set[i]:
-                    result_set[i] = u_aux
-
-        if u_channel_classification[VERY_BAD_CHANNEL] > 0:
-            for i in range(SIZE_CHANNEL):
-                u_aux = ChannelClassification.u_very_bad_channel(i)
-                if u_aux > u_channel_classification[VERY_BAD_CHANNEL]:
-                    u_aux = u_channel_classification[VERY_BAD_CHANNEL]
-                if u_aux > result_set[i]:
-                    result_set[i] = u_aux
+        return float(Fuzzy.defuzzify_batch([u_channel_classification])[0])
 
-        # Centroid: center of mass calculation
-        # From the uniom of the fuzzy sets to the channel classification
-        for i in range(SIZE_CHANNEL):
-            numerator = numerator + result_set[i] * i
 
-        for i in range(SIZE_CHANNEL):
-            divisor = divisor + result_set[i]
+    @staticmethod
+    def defuzzify_batch(u_channel_classification):
+        """
+        Defuzzifier of several channels.
+        Each channel set is clipped at its membership degree and the union of the sets is reduced to its centroid.
+        @param u_channel_classification Array (channels x 5) with the membership degree of each channel set.
+        @return Array with the classification of each channel.
+        """
+        u = np.maximum(np.asarray(u_channel_classification, dtype=np.float64), 0.0)
 
-        channel_classification = float(numerator) / divisor
-        return channel_classification
+        # union of the clipped fuzzy sets: (channels x SIZE_CHANNEL)
+        result_set = np.minimum(CHANNEL_CURVES, u[:, :, np.newaxis]).max(axis=1)
 
+        # Centroid: center of mass calculation
+        return result_set.dot(CHANNEL_AXIS) / result_set.sum(axis=1)
 
-    def evaluate(self, data):
+
+    @staticmethod
+    def classify(presence):
         """
-        Evaluates the decision algorithm.
-        @param data A dictionary with the parameters used by the algorithm.
+        Channel classification of several presence values.
+        Integer presences are read from a table computed once.
+        @param presence Sequence of presence values (0 to SIZE_PRESENCE).
+        @return Array with the classification of each presence.
         """
-        pu_weight = 0.6
-        pu_weight = 0.3
-        pu_weight = 0.1
+        if Fuzzy._lut is None:
+            # rules map each presence set to a channel set: same index
+            Fuzzy._lut = Fuzzy.defuzzify_batch(Fuzzy.fuzzify_batch(PRESENCE_AXIS))
 
-        evalf_pu = []
-        evalf_su = []
+        presence = np.asarray(presence, dtype=np.float64)
+        idx = np.clip(presence, 0, SIZE_PRESENCE).astype(np.int64)
 
-        for pu_per in data[self.CHANNEL_PU_PRESENCE]:
-            pu_list = [0] * 5
-            classification = [0] * 5
+        cached = (presence == idx)
+        out = np.empty(len(presence), dtype=np.float64)
+        out[cached] = Fuzzy._lut[idx[cached]]
 
-            Fuzzy.fuzzify(pu_per, pu_list)
-            Fuzzy.evaluate_rules(pu_list, classification)
+        if not cached.all():
+            out[~cached] = Fuzzy.defuzzify_batch(Fuzzy.fuzzify_batch(presence[~cached]))
 
-            val = Fuzzy.defuzzify(classification)
+        return out
 
-            evalf_pu.append(val)
 
-        for su_per in data[self.CHANNEL_SU_PRESENCE]:
-            su_list = [0] * 5
-            classification = [0] * 5
+    @staticmethod
+    def full_process(pu_presence, su_presence, pu_weight=PU_WEIGHT):
+        """
+        Evaluate a list of channels.
+        @param pu_presence List with the PU presence (%) of each channel.
+        @param su_presence List with the SU presence (%) of each channel.
+        @param pu_weight Weight of the PU presence.
+        @return List with the evaluation of each channel.
+        """
+        n = min(len(pu_presence), len(su_presence))
 
-            Fuzzy.fuzzify(su_per, su_list)
-            Fuzzy.evaluate_rules(su_list, classification)
+        evalf_pu = Fuzzy.classify(pu_presence[:n])
+        evalf_su = Fuzzy.classify(su_presence[:n])
 
-            val = Fuzzy.defuzzify(classification)
-            evalf_su.append(val)
+        return (evalf_pu * pu_weight + evalf_su * (1 - pu_weight)).tolist()
 
-        channel_eval = []
-        for pu_val, su_val in zip(evalf_pu, evalf_su):
-            final_val = pu_val * pu_weight + su_val * (1 - pu_weight)
-            channel_eval.append(final_val)
 
-        return channel_eval
+    def evaluate(self, data):
+        """
+        Evaluates the decision algorithm.
+        @param data A dictionary with the parameters used by the algorithm.
+        """
+        return Fuzzy.full_process(data[self.CHANNEL_PU_PRESENCE], data[self.CHANNEL_SU_PRESENCE])
@@ -24,26 +24,47 @@ Copyright 2013 OpERA
 #
 # To execute: ./genetic.py <number_of_iterations>
 
-import random
 import sys
 
+import numpy as np
+
 from abstractDecisionAlgorithm import AbstractDecisionAlgorithm
 
-POPSIZE = 4
+# Default population size
+POPSIZE = 32
+# Default number of best chromosomes copied to the next generation
+ELITE = 2
 
 
 class Genetic(AbstractDecisionAlgorithm):
     """
     Class for the Genetic decision algorithm.
+    A chromosome has one gene for each idle (radio, channel) pair of the occupancy matrix. The population is a
+    boolean matrix (chromosomes x genes) and the fitness of all chromosomes is calculated at once.
     """
 
     ##::TODO:: em vez de usar os parametros no init, agora eles estarao no dict data, parametro do metodo evaluate
-    def __init__(self):
+    def __init__(self, pop_size=POPSIZE, elite=ELITE, mutation_rate=None):
+        """
+        CTOR
+        @param pop_size Number of chromosomes of the population.
+        @param elite Number of best chromosomes copied to the next generation.
+        @param mutation_rate Probability of flipping each gene. Default: 1 / number of genes.
+        """
+        if not isinstance(pop_size, int) or pop_size < 2:
+            raise AttributeError("Invalid population size: %s" % (pop_size, ))
+        if not isinstance(elite, int) or not 0 <= elite < pop_size:
+            raise AttributeError("Invalid elite size: %s" % (elite, ))
+        if mutation_rate is not None and not (isinstance(mutation_rate, float) and 0.0 <= mutation_rate <= 1.0):
+            raise AttributeError("Invalid mutation rate: %s" % (mutation_rate, ))
 
         AbstractDecisionAlgorithm.__init__(self)
 
-        self.chromo = []
-        self.population = []
+        self._pop_size = pop_size
+        self._elite = elite
+        self._mutation_rate = mutation_rate
+
+        self.population = None
 
     ## Vou tentar adaptar os metodos de get que havia por aqui
     # Coomo os parametros nao estao mais no construtor, eh necessario passar o data
@@ -75,115 +96,122 @@ class Genetic(AbstractDecisionAlgorithm):
 
     def fitness(self, An, data):
         """
-        @param An
+        @param An Allocation matrix.
         @param data
         @return
         """
-        c = self.get_interference_matrix_c(data)
-        b = self.get_reward_matrix_b(data)
+        c = np.asarray(self.get_interference_matrix_c(data), dtype=np.float64)
+        b = np.asarray(self.get_reward_matrix_b(data), dtype=np.float64)
 
-        fit = 0
-        for i in range(len(An)):
-            for j in range(len(An[i])):
-                fit += An[i][j] * b[i][j] * c[i][j]
+        return np.sum(np.asarray(An) * b * c)
 
-        return fit
+    def fitness_population(self, population, weights):
+        """
+        Fitness of all chromosomes.
+        @param population Boolean matrix (chromosomes x genes).
+        @param weights Reward * interference of each gene.
+        @return Array with the fitness of each chromosome.
+        """
+        return population.dot(weights)
 
-    def generate_population(self, l):
+    def generate_population(self, n_genes):
         """
-        Generates population.
-        @param l
+        Generates a random population.
+        @param n_genes Number of genes of each chromosome.
         """
-        count = 0
-        m = 0
-        for i in range(0, len(l)):
-            count += l[i].count(1)
-
-        for i in range(0, POPSIZE):
-            for j in range(0, count):
-                gene = random.randint(0, 1)
-                self.chromo.append(gene)
-
-            An = []
-            m = 0
-            for k in range(len(l)):
-                An.append([])
-                for n in range(len(l[k])):
-                    if l[k][n] == 1:
-                        An[k].append(self.chromo[m])
-                        m += 1
-                    else:
-                        An[k].append(l[k][n])
-
-            self.population.append(An)
-            self.chromo = []
-
-    def random_parent(self, population):
+        self.population = np.random.randint(0, 2, size=(self._pop_size, n_genes)).astype(bool)
+
+    def select(self, fit, n_parents):
         """
-        @param population
-        @return
+        Tournament selection (2 chromosomes per tournament).
+        @param fit Fitness of the population.
+        @param n_parents Number of parents selected.
+        @return Indexes of the selected chromosomes.
         """
-        w_rnd_nr = random.random() * random.random() * (POPSIZE - 1)
-        w_rnd_nr = int(w_rnd_nr)
-        return (population[w_rnd_nr])
+        a = np.random.randint(0, len(fit), n_parents)
+        b = np.random.randint(0, len(fit), n_parents)
+
+        return np.where(fit[a] >= fit[b], a, b)
 
-    def cross_and_mutate(self, parent1, parent2, l):
+    def cross_and_mutate(self, parent1, parent2):
         """
-        @param parent1 The first parent.
-        @param parent2 The second parent.
-        @param l
-        @return The child.
+        One point crossover and bit flip mutation.
+        @param parent1 Boolean matrix with the first parent of each child.
+        @param parent2 Boolean matrix with the second parent of each child.
+        @return The children. Parents are not modified.
         """
-        #Cross
-        cross = random.randint(0, len(l) - 1)
-        child = parent1[:]
+        n_children, n_genes = parent1.shape
 
-        child[cross] = parent2[cross]
+        #Cross
+        cross = np.random.randint(0, n_genes + 1, n_children)
+        child = np.where(np.arange(n_genes) < cross[:, np.newaxis], parent1, parent2)
 
         #Mutate
-        mutchromo = random.randint(0, len(l) - 1)
-        mutgene = random.randint(0, len(l[0]) - 1)
-
-        child[mutchromo][mutgene] = random.randint(0, 1)
+        rate = self._mutation_rate if self._mutation_rate is not None else 1.0 / n_genes
+        child ^= (np.random.random(child.shape) < rate)
 
         return child
 
+    def next_generation(self, fit):
+        """
+        Replace the population by the elite and pop_size - elite children of selected parents.
+        @param fit Fitness of the population.
+        @return The new population. The elite chromosomes are the first rows.
+        """
+        n_children = self._pop_size - self._elite
+        parent1 = self.population[self.select(fit, n_children)]
+        parent2 = self.population[self.select(fit, n_children)]
+
+        children = self.cross_and_mutate(parent1, parent2)
+        elite = self.population[np.argsort(-fit, kind='mergesort')[:self._elite]]
+
+        self.population = np.vstack((elite, children))
+        return self.population
+
     def evaluate(self, data):
         """
         Evaluates the decision algorithm.
-        @param data A dictionary with the parameters used by the algorithm.
+        @param data A dictionary with the parameters used by the algorithm. data[ITERATIONS] is the number of
+                    children produced (one per iteration, as in the steady state version), so the budget of fitness
+                    evaluations does not depend on the population size.
+        @return Best allocation matrix (list of lists). Same shape of the occupancy matrix.
         """
 
         #Passo 1
         # Step 1
-        l = self.get_occupancy_matrix_l(data)
-        self.generate_population(l)
+        l = np.asarray(self.get_occupancy_matrix_l(data))
+        free = (l == 1)
+
+        weights = (np.asarray(self.get_reward_matrix_b(data), dtype=np.float64) *
+                   np.asarray(self.get_interference_matrix_c(data), dtype=np.float64))[free]
+
+        best_a = np.zeros(l.shape, dtype=int)
+        if not len(weights):
+            return best_a.tolist()
+
+        self.generate_population(len(weights))
 
         #Passo 2
         # Step 2
-        best_fitness = self.fitness(self.population[0], data)
-        best_a = self.population[0]
-        for An in self.population:
-            if self.fitness(An, data) > best_fitness:
-                best_fitness = self.fitness(An, data)
-                best_a = An
+        fit = self.fitness_population(self.population, weights)
+        best = int(np.argmax(fit))
+        best_chromo, best_fitness = self.population[best].copy(), fit[best]
 
-        for i in range(data[self.ITERATIONS]):
+        n_children = self._pop_size - self._elite
+        for i in range((data[self.ITERATIONS] + n_children - 1) // n_children):
 
             #Passos 3, 4 e 5
             # Steps 3, 4 and 5
-            parent1 = self.random_parent(self.population)
-            parent2 = self.random_parent(self.population)
-
-            child = self.cross_and_mutate(parent1, parent2, l)
+            self.next_generation(fit)
+            fit = self.fitness_population(self.population, weights)
 
-            if self.fitness(child, data) > best_fitness:
-                best_fitness = self.fitness(child, data)
-                best_a = child
+            best = int(np.argmax(fit))
+            if fit[best] > best_fitness:
+                best_chromo, best_fitness = self.population[best].copy(), fit[best]
 
-        print(best_a, best_fitness)
+        best_a[free] = best_chromo
 
-        return best_a
+        return best_a.tolist()
 
 def main():
     """
@@ -18,71 +18,87 @@ Copyright 2013 OpERA
 
 from abstractDecisionAlgorithm import AbstractDecisionAlgorithm
 
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+def _bits(mask):
+    """
+    @param mask Bitset (int).
+    @return List with the index of the bits set, in ascending order.
+    """
+    ret = []
+    idx = 0
+    while mask:
+        if mask & 1:
+            ret.append(idx)
+        mask >>= 1
+        idx += 1
+    return ret
+
 
 class Graph(AbstractDecisionAlgorithm):
     """
     Graph decision algorithm class.
     """
 
-    def __init__(self):
+    # Allocation modes
+    GREEDY = 'greedy'              # best remaining link x frequency pair each round
+    ASSIGNMENT = 'assignment'      # maximum weight bipartite matching (Hungarian)
+
+    def __init__(self, interference_matrix=None, utility_matrix=None, mode=GREEDY):
         """
         CTOR
+        @param interference_matrix Link x link matrix. 1 if the links interfere. Optional.
+        @param utility_matrix Link x frequency matrix. Optional.
+        @param mode GREEDY or ASSIGNMENT.
         """
+        if mode not in (Graph.GREEDY, Graph.ASSIGNMENT):
+            raise AttributeError("Invalid mode: %s" % str(mode))
 
         AbstractDecisionAlgorithm.__init__(self)
-        self._int_matrix = None
-        self.graph = None
+        self._int_matrix = interference_matrix
+        self.graph = utility_matrix
+        self.mode = mode
         self.matching = []
 
     def calc_possible_shares(self, data):
         """
         @param data A dictionary with the parameters used by the algorithm.
+        @return Sorted list of groups of links that can share a frequency: pairs of links that do not interfere,
+                the greedy group of each link with more than 2 links and each link alone.
         """
-
-        possible_shares = []
-
         self._int_matrix = data[self.INTERFERENCE_MATRIX]
         self.graph = data[self.UTILITY_MATRIX]
 
+        # bit j of compatible[i]/conflict[i] is set if link i does not interfere/interferes with link j
+        compatible = [0] * len(self._int_matrix)
+        conflict = [0] * len(self._int_matrix)
+        for i, row in enumerate(self._int_matrix):
+            for j, value in enumerate(row):
+                if j != i and value == 0:
+                    compatible[i] |= 1 << j
+                elif j != i and value == 1:
+                    conflict[i] |= 1 << j
+
+        shares = set()
         for i in range(len(self._int_matrix)):
-            for j in range(len(self._int_matrix[i])):
-                if (j != i) and (self._int_matrix[i][j] == 0):
-                    possible_shares.append([i, j])
-
-        stack = []
-
-        for i in range(len(self._int_matrix)):
-            stack.append(i)
+            for j in _bits(compatible[i]):
+                shares.add(tuple(sorted([i, j])))
 
-            for j in possible_shares:
-                if i == j[0]:
-                    stack.append(j[1])
+            # link i and its neighbors. Each member removes the higher members it interferes with
+            group = (1 << i) | compatible[i]
+            for k in _bits(group):
+                if group >> k & 1:
+                    group &= ~(conflict[k] & ~((2 << k) - 1))
 
-            elem_to_remove = []
-            for k in stack:
-                m = k + 1
-                while m <= len(stack):
-                    if (m in stack) and (self._int_matrix[k][m] == 1):
-                        elem_to_remove.append(m)
-                    m += 1
+            members = _bits(group)
+            if len(members) > 2:
+                shares.add(tuple(members))
 
-            for l in elem_to_remove:
-                if l in stack:
-                    stack.remove(l)
-            if len(stack) > 2:
-                possible_shares.append(stack)
+        possible_shares = sorted(list(share) for share in shares)
 
-            stack = []
-
-        a = []
-        for i in possible_shares:
-            i.sort()
-            if not (i in a):
-                a.append(i)
-
-        possible_shares = sorted(a)
-
-        for i in range(6):
+        for i in range(len(self._int_matrix)):
             possible_shares.append([i])
 
         return possible_shares
@@ -110,6 +126,9 @@ class Graph(AbstractDecisionAlgorithm):
         self._int_matrix = data[self.INTERFERENCE_MATRIX]
         self.graph = data[self.UTILITY_MATRIX]
 
+        if self.mode == Graph.ASSIGNMENT:
+            return self.assign(possible_links, possible_freqs)
+
         possible_shares = possible_links
 
         result = []
@@ -148,6 +167,23 @@ class Graph(AbstractDecisionAlgorithm):
         return dict_links_to_freq
 
 
+    def assign(self, links, freqs):
+        """
+        Allocate the frequencies maximizing the sum of the utilities.
+        Each link gets at most one frequency and each frequency at most one link.
+        @param links List of links (rows of the utility matrix).
+        @param freqs List of frequencies (columns of the utility matrix).
+        @return Dictionary {link: frequency}. min(len(links), len(freqs)) links are allocated.
+        """
+        if not links or not freqs:
+            return {}
+
+        utility = np.asarray(self.graph, dtype=np.float64)[np.ix_(links, freqs)]
+        rows, cols = linear_sum_assignment(-utility)
+
+        return dict((links[r], freqs[c]) for r, c in zip(rows, cols))
+
+
 def main():
 
     # Constants used in the 'data' dictionary:
@@ -0,0 +1,264 @@
+"""
+Copyright 2013 OpERA
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+"""
+
+#!/usr/bin/python
+
+## @package decision
+
+import unittest
+import numpy as np
+
+# Modules  tested
+from genetic import Genetic
+from fuzzy import Fuzzy, UserPresence, ChannelClassification, SIZE_PRESENCE, SIZE_CHANNEL
+from blp import BLP
+from graph import Graph
+
+
+class QaDecision(unittest.TestCase):
+    """
+    Test decision module.
+    """
+
+    def test_genetic_001(self):
+        """
+        Test the Genetic crossover, selection and elitism.
+        """
+        obj = Genetic(pop_size=6, elite=2, mutation_rate=0.0)
+        obj.population = np.random.randint(0, 2, size=(6, 10)).astype(bool)
+        fit = np.array([1.0, 5.0, 2.0, 4.0, 0.0, 3.0])
+
+        # Tournament selection favours the best chromosomes
+        self.assertTrue(np.mean(fit[obj.select(fit, 1000)]) > np.mean(fit))
+
+        # Without mutation each child is parent1 up to the crossover point and parent2 after it
+        parent1, parent2 = obj.population[:3].copy(), obj.population[3:].copy()
+        child = obj.cross_and_mutate(parent1, parent2)
+        for idx in range(3):
+            cross = 0
+            while cross < 10 and child[idx][cross] == parent1[idx][cross]:
+                cross += 1
+            self.assertTrue(np.array_equal(parent2[idx][cross:], child[idx][cross:]))
+
+        # Parents are not modified
+        self.assertTrue(np.array_equal(obj.population[:3], parent1))
+        self.assertTrue(np.array_equal(obj.population[3:], parent2))
+
+        # The best chromosomes are copied to the next generation
+        best = obj.population[[1, 3]].copy()
+        population = obj.next_generation(fit)
+        self.assertEqual((6, 10), population.shape)
+        self.assertTrue(np.array_equal(best, population[:2]))
+
+    def test_genetic_002(self):
+        """
+        Test the Genetic parameters and budget.
+        """
+        self.assertRaises(AttributeError, Genetic, [[1]], [[1]], [[1]])
+        self.assertRaises(AttributeError, Genetic, pop_size=4, elite=4)
+
+        data = {Genetic.OCCUPANCY_MATRIX: [[0, 1], [1, 1]],
+                Genetic.REWARD_MATRIX: [[1.0, 1.0], [1.0, 1.0]],
+                Genetic.INTERFERENCE_MATRIX: [[0.0, 1.0], [1.0, 0.0]],
+                Genetic.ITERATIONS: 30}
+
+        # Occupied channels are never allocated. Genes with weight are allocated
+        res = Genetic(pop_size=4, elite=1).evaluate(data)
+        self.assertEqual([0, 1], res[0])
+        self.assertEqual(1, res[1][0])
+
+    def test_fuzzy_001(self):
+        """
+        Test the Fuzzy classification against the scalar membership functions on integer presences.
+        """
+        presence_functions = [UserPresence.u_low_presence, UserPresence.u_medium_presence,
+                              UserPresence.u_high_presence, UserPresence.u_very_high_presence,
+                              UserPresence.u_extreme_high_presence]
+        channel_functions = [ChannelClassification.u_very_good_channel, ChannelClassification.u_good_channel,
+                             ChannelClassification.u_intermediate_channel, ChannelClassification.u_bad_channel,
+                             ChannelClassification.u_very_bad_channel]
+
+        def scalar_classify(presence):
+            # each presence set is mapped to the channel set with the same index (evaluate_rules)
+            u_sets = [f(presence) for f in presence_functions]
+
+            result_set = [0.0] * SIZE_CHANNEL
+            for u, f in zip(u_sets, channel_functions):
+                if u > 0:
+                    for i in range(SIZE_CHANNEL):
+                        result_set[i] = max(result_set[i], min(f(i), u))
+
+            return sum(r * i for i, r in enumerate(result_set)) / sum(result_set)
+
+        expected = [scalar_classify(p) for p in range(SIZE_PRESENCE + 1)]
+        self.assertTrue(np.allclose(expected, Fuzzy.classify(range(SIZE_PRESENCE + 1))))
+
+        u_user_presence = [0] * 5
+        Fuzzy.fuzzify(35, u_user_presence)
+        self.assertTrue(np.allclose([f(35) for f in presence_functions], u_user_presence))
+        self.assertAlmostEqual(expected[35], Fuzzy.defuzzify(Fuzzy.evaluate_rules(u_user_presence, [0] * 5)))
+
+        # PU presence has weight pu_weight
+        res = Fuzzy.full_process([10, 90], [50, 50, 50], pu_weight=0.25)
+        self.assertEqual(2, len(res))
+        self.assertAlmostEqual(0.25 * expected[10] + 0.75 * expected[50], res[0])
+        self.assertAlmostEqual(0.25 * expected[90] + 0.75 * expected[50], res[1])
+
+    def test_fuzzy_002(self):
+        """
+        Test the Fuzzy classification of fractional presences (e.g. 100.0 * occupied / total).
+        """
+        # Memberships are linearly interpolated between integer presences
+        u_low, u_high = Fuzzy.fuzzify_batch([33, 34])
+        self.assertTrue(np.allclose(u_low + (u_high - u_low) / 3.0, Fuzzy.fuzzify_batch([100.0 / 3])[0]))
+
+        # The classification is the defuzzification of the interpolated memberships
+        presence = [100.0 / 3, 12.5, 99.9]
+        expected = [Fuzzy.defuzzify(u) for u in Fuzzy.fuzzify_batch(presence)]
+        self.assertTrue(np.allclose(expected, Fuzzy.classify(presence)))
+
+        # Fractional and integer presences in the same call
+        self.assertTrue(np.allclose([Fuzzy.classify([50])[0], expected[1]], Fuzzy.classify([50.0, 12.5])))
+
+    @staticmethod
+    def _blp_brute_force(n, l, u, p_max, big_b, pi, big_i, big_u, big_c, gama):
+        """
+        Best objective of the binary linear program of shu.mod, by enumeration.
+        """
+        import itertools
+
+        best = 0.0
+        for y in itertools.product([0, 1], repeat=l * n * u):
+            y = np.array(y).reshape(l, n, u)
+            power = np.array(big_c[:n])[np.newaxis, :, np.newaxis] * np.array(gama)[np.newaxis, :n, :u] * y
+            per_link = y.sum(axis=2)
+
+            if np.any(power.sum(axis=2) > np.array(pi[:n]) + 1e-9) or \
+               np.any(power.sum(axis=(1, 2)) > np.array(p_max[:l]) + 1e-9) or \
+               np.any(per_link.sum(axis=1) > 1) or np.any(per_link.sum(axis=0) > 1):
+                continue
+            if any(per_link[i, m] + per_link[j, m] > 2 - big_i[i][j]
+                   for m in range(n) for i in range(l) for j in range(l) if i != j):
+                continue
+
+            best = max(best, float(np.sum(np.outer(big_b[:n], big_u[:u])[np.newaxis] * y)))
+
+        return best
+
+    @staticmethod
+    def _blp_value(solution, big_b):
+        """
+        Objective of a BLP solution with a single rate of value 1.
+        """
+        return sum(big_b[m - 1] for i, m in solution)
+
+    def test_blp_001(self):
+        """
+        Test the BLP branch and bound against the enumeration of small instances.
+        """
+        rnd = np.random.RandomState(3)
+
+        for _ in range(5):
+            n, l = 3, 3
+            big_b = rnd.randint(1, 10, n).tolist()
+            big_c = rnd.uniform(0.1, 1.0, n).tolist()
+            p_max = rnd.uniform(0.2, 1.0, l).tolist()
+            big_i = (rnd.rand(l, l) < 0.5).astype(float).tolist()
+
+            args = (n, l, 1, p_max, big_b, [1.0] * n, big_i, [1.0], big_c, [[1.0]] * n)
+            solution = BLP.blp_execution(*args)
+
+            # one channel per link and one link per channel
+            self.assertEqual(len(solution), len(set(i for i, m in solution)))
+            self.assertEqual(len(solution), len(set(m for i, m in solution)))
+            self.assertAlmostEqual(self._blp_brute_force(*args), self._blp_value(solution, big_b))
+
+    def test_blp_002(self):
+        """
+        Test the BLP solver reuse when only C changes and new solutions when other inputs change.
+        """
+        n, l = 3, 2
+        big_b = [5.0, 3.0, 1.0]
+        big_i = [[0.0, 1.0], [1.0, 0.0]]
+
+        def args(big_c, p_max):
+            return (n, l, 1, p_max, big_b, [1.0] * n, big_i, [1.0], big_c, [[1.0]] * n)
+
+        # Only C changes: the solver is reused (warm start) and the solution follows C
+        BLP.blp_execution(*args([0.5, 0.5, 0.5], [1.0, 1.0]))
+        solver = BLP._solver
+
+        solution = BLP.blp_execution(*args([2.0, 0.5, 0.5], [1.0, 1.0]))
+        self.assertTrue(solver is BLP._solver)
+        self.assertFalse(1 in [m for i, m in solution])
+        self.assertAlmostEqual(self._blp_brute_force(*args([2.0, 0.5, 0.5], [1.0, 1.0])),
+                               self._blp_value(solution, big_b))
+
+        # Other inputs change: a new solver, not the last solution
+        solution = BLP.blp_execution(*args([0.5, 0.5, 0.5], [0.1, 1.0]))
+        self.assertFalse(solver is BLP._solver)
+        self.assertEqual([[2, 1]], solution)
+
+        solution = BLP.blp_execution(*args([0.5, 0.5, 0.5], [1.0, 0.1]))
+        self.assertEqual([[1, 1]], solution)
+
+    def test_graph_001(self):
+        """
+        Test the Graph assignment against the enumeration of all allocations.
+        """
+        import itertools
+
+        utility = [[4, 3, 1, 10], [10, 5, 2, 6], [3, 6, 1, 4], [1, 6, 3, 1], [4, 5, 1, 3], [3, 0, 6, 11]]
+        obj = Graph(utility_matrix=utility, mode=Graph.ASSIGNMENT)
+
+        for links, freqs in [(range(6), range(4)), ([0, 2, 5], range(4)), ([1, 3], [0, 3])]:
+            size = min(len(links), len(freqs))
+            best = max(sum(utility[l][f] for l, f in zip(perm, comb))
+                       for perm in itertools.permutations(links, size)
+                       for comb in itertools.combinations(freqs, size))
+
+            res = obj.assign(list(links), list(freqs))
+            self.assertEqual(min(len(links), len(freqs)), len(res))
+            self.assertEqual(len(res), len(set(res.values())))
+            self.assertEqual(best, sum(utility[l][f] for l, f in res.items()))
+
+        self.assertEqual({}, obj.assign([], [0, 1]))
+        self.assertRaises(AttributeError, Graph, mode='invalid')
+
+    def test_graph_002(self):
+        """
+        Test the groups of links that can share a frequency.
+        """
+        rnd = np.random.RandomState(7)
+
+        for n_links in [1, 4, 6]:
+            interference = np.triu((rnd.rand(n_links, n_links) < 0.4).astype(int), 1)
+            interference = (interference + interference.T).tolist()
+
+            shares = Graph().calc_possible_shares({Graph.INTERFERENCE_MATRIX: interference,
+                                                   Graph.UTILITY_MATRIX: None})
+
+            # Links of a group do not interfere
+            for share in shares:
+                self.assertEqual(len(share), len(set(share)))
+                self.assertTrue(all(interference[i][j] == 0 for i in share for j in share if i != j))
+
+            # Each link alone
+            self.assertEqual([[i] for i in range(n_links)], shares[-n_links:])
+
+
+if __name__ == '__main__':
+    unittest.main()
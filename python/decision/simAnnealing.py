@@ -16,6 +16,10 @@ Copyright 2013 OpERA
 
 import random
 import math
+import multiprocessing
+
+import numpy as np
+
 from abstractDecisionAlgorithm import AbstractDecisionAlgorithm
 
 
@@ -151,16 +155,6 @@ class Channel(AbstractDecisionAlgorithm):
         f_min_interference = self.min_interference(bandwidth, tdd, power)
         f_max_spec_eff = self.max_spectral_eff(modulation_index, symbol_rate, bandwidth)
 
-        print "\nParametros:::\n"
-        print "\nw1 = " + str(self.w1)
-        print "\nw2 = " + str(self.w2)
-        print "\nw3 = " + str(self.w3)
-        print "\nw4 = " + str(self.w4)
-        print "\nw5 = " + str(self.w5)
-        print "\nw6 = " + str(self.w6)
-        print "\npu_rate = " + str(self.pu_rate)
-        print "\n"
-
 
         if self.w1 is not None and self.w2 is not None and self.w3 is not None and self.w4 is not None and \
            self.w5 is not None and self.w6 is not None and self.pu_rate is not None:
@@ -404,86 +398,194 @@ class Channel(AbstractDecisionAlgorithm):
         return self.solution
 
 
-def main():
-    SIM_ANNEALING_PARAMETERS = 14
+class BatchAnnealer(object):
+    """
+    Runs several simulated annealing chains at once.
+    Same algorithm of Channel.evaluate, with the parameters of all chains kept in arrays. The chains differ only in
+    the primary user rate (one per (link, channel) pair) and in the random numbers.
+    """
 
-    l = [1, 2]
-    ch = [1, 2, 3]
-    pu_rate = [1.0, 0.5, 0.1]
-    links = [[(1, pu_rate[0]), (2, pu_rate[1]), (3, pu_rate[2])], [(1, pu_rate[0]), (2, pu_rate[1]), (3, pu_rate[2])]]
+    def __init__(self, parameters):
+        """
+        CTOR
+        @param parameters Dictionary with the simulated annealing parameters (same of data[SIM_ANNEALING_PARAMETERS]).
+                          pu_rate is not used.
+        """
+        self._p = dict(parameters)
+        self._w = [float(self._p['w' + str(i)]) for i in range(1, 7)]
+        self._scheme = np.asarray(self._p['maximum_scheme'], dtype=np.float64)
+        self._max_idx = self._p['maximum_modulation_index']
 
-    data = {}
-    data[SIM_ANNEALING_PARAMETERS] = {}
+        # Temperature of each iteration (same stop condition of Channel.evaluate)
+        temperature = float(self._p['temperature'])
+        tk = temperature / (np.arange(max(int(math.ceil(10 * temperature)), 0) + 2) + 1.0)
+        self._tk = tk[:np.argmax(tk <= 0.1) + 1] if temperature > 0.1 else tk[:0]
+
+    def objective(self, bandwidth, power, modulation_index, symbol_rate, tdd, pbe, pu_rate):
+        """
+        Vectorized Channel.five_objective.
+        All parameters are arrays with one item per chain.
+        @return Array with the score of each chain.
+        """
+        p = self._p
+        w1, w2, w3, w4, w5, w6 = self._w
+        scheme = self._scheme[modulation_index]
+        max_scheme = self._scheme[self._max_idx]
+
+        fmin_power = power / p['max_power']
+        fmin_ber = math.log10(0.5) / np.log10(pbe)
+        fmax_throughput = np.log2(scheme) / np.log2(max_scheme)
+        f_min_interference = ((power + bandwidth + tdd) - (p['min_power'] + p['min_bandwidth'] + 1)) / float(
+            p['max_power'] + p['max_bandwidth'] + p['max_symbol_rate'])
+        f_max_spec_eff = 1 - (scheme * p['min_bandwidth'] * symbol_rate) / (
+            bandwidth * max_scheme * p['max_symbol_rate'])
+
+        return ((w1 * fmin_power) + (w2 * fmin_ber) + (w3 * fmax_throughput) +
+                (w4 * f_min_interference) + (w5 * f_max_spec_eff) + (w6 * pu_rate))
+
+    def run(self, pu_rates, n_chains=1, seed=None):
+        """
+        Run n_chains chains for each primary user rate.
+        @param pu_rates List of primary user rates.
+        @param n_chains Number of chains of each primary user rate.
+        @param seed Random seed. Optional.
+        @return Array (len(pu_rates) x n_chains) with the solution of each chain (-1 if no solution was found).
+        """
+        p = self._p
+        rnd = np.random.RandomState(seed)
 
-    # Weights for maximizing throughput
-    data[SIM_ANNEALING_PARAMETERS]['w1'] = 0.05
-    data[SIM_ANNEALING_PARAMETERS]['w2'] = 0.05
-    data[SIM_ANNEALING_PARAMETERS]['w3'] = 0.05
-    data[SIM_ANNEALING_PARAMETERS]['w4'] = 0.05
-    data[SIM_ANNEALING_PARAMETERS]['w5'] = 0.05
-    data[SIM_ANNEALING_PARAMETERS]['w6'] = 0.75
+        pu_rate = np.repeat(np.asarray(pu_rates, dtype=np.float64), n_chains)
+        n = len(pu_rate)
 
-    # Transmitted power between 0.158 and 251 mW
-    data[SIM_ANNEALING_PARAMETERS]['min_power'] = 1
-    data[SIM_ANNEALING_PARAMETERS]['max_power'] = 1
+        # continuous parameters: power, pbe, bandwidth, tdd, symbol_rate
+        names = ('power', 'pbe', 'bandwidth', 'tdd', 'symbol_rate')
+        low = np.array([float(p['min_' + name]) for name in names])
+        high = np.array([float(p['max_' + name]) for name in names])
 
-    # Modulation Scheme QAM between 2 and 256
-    # data[SIM_ANNEALING_PARAMETERS]['modulation_scheme'] = [4]
-    data[SIM_ANNEALING_PARAMETERS]['maximum_scheme'] = [4]
-    data[SIM_ANNEALING_PARAMETERS]['maximum_modulation_index'] = 0
+        # -----Initial solution -> Random solution
+        cur = low + (high - low) * rnd.random_sample((n, len(names)))
+        mod = rnd.randint(0, self._max_idx + 1, n)
+        sol = cur.copy()
 
-    # Bandwidth between 2 and 32 MHz
-    data[SIM_ANNEALING_PARAMETERS]['min_bandwidth'] = 200
-    data[SIM_ANNEALING_PARAMETERS]['max_bandwidth'] = 400
+        solution = self.objective(cur[:, 2], cur[:, 0], mod, cur[:, 4], cur[:, 3], cur[:, 1], pu_rate)
+        best = np.full(n, -1.0)
 
-    # TDD between
-    data[SIM_ANNEALING_PARAMETERS]['min_tdd'] = 485
-    data[SIM_ANNEALING_PARAMETERS]['max_tdd'] = 490
+        temperature = float(p['temperature'])
+        sign = True
+        for tk in self._tk:
+            ntk = (tk / temperature) * (high - low) + low
 
-    # Symbol Rate between 125kbps and 1Mbps
-    data[SIM_ANNEALING_PARAMETERS]['min_symbol_rate'] = 125
-    data[SIM_ANNEALING_PARAMETERS]['max_symbol_rate'] = 1024
+            # Choosing if each parameter will be modified
+            change = rnd.random_sample((n, len(names) + 1)) <= 0.05
 
-    # BER
-    data[SIM_ANNEALING_PARAMETERS]['max_pbe'] = math.pow(10, -6)
-    data[SIM_ANNEALING_PARAMETERS]['min_pbe'] = math.pow(10, -8)
+            cand = np.clip(sol + ntk if sign else sol - ntk, low, high)
+            cur = np.where(change[:, :len(names)], cand, cur)
 
-    # Initial temperature
-    data[SIM_ANNEALING_PARAMETERS]['temperature'] = 1000
+            # Circular list of modulations
+            mod = np.where(change[:, -1], (mod + (1 if sign else -1)) % (self._max_idx + 1), mod)
 
-    # Primary user rate.
-    data[SIM_ANNEALING_PARAMETERS]['pu_rate'] = pu_rate
+            # New solution
+            new_solution = self.objective(cur[:, 2], cur[:, 0], mod, cur[:, 4], cur[:, 3], cur[:, 1], pu_rate)
 
+            # New solution is better than the old solution
+            better = new_solution < solution
+            sol[better] = cur[better]
+            best = np.where(better & (new_solution > best), new_solution, best)
 
-    # to_sa is a list of list.
-    # inner list is  for each link
-    # [ [(ch1, pu_rate) (ch2, pu_rate) (ch3, pu_rate)] ]
+            # Probability of solution exchange, even if new solution is worse
+            prob = np.exp(np.minimum((solution - new_solution) / temperature, 0.0))
+            accept = ~better & (rnd.random_sample(n) < prob)
 
-    ## links = [[(1, pu_rate[0]), (2, pu_rate[1]), (3, pu_rate[2])], [(1, pu_rate[0]), (2, pu_rate[1]), (3, pu_rate[2])]]
-    links = [77, 79]
-    channels = [1, 2, 3]
+            solution = np.where(better | accept, new_solution, solution)
 
-    to_sa = [[(1, 77), (2, 77), (3, 77)], [(1, 79), (2, 79), (3, 79)]]
+            #Changing between inc/decrementing vars
+            sign = not sign
+
+        return best.reshape(len(pu_rates), n_chains)
+
+
+def _run_chains(args):
+    """
+    Worker of full_process.
+    @param args Tuple (parameters, pu_rates, n_chains, seed).
+    @return BatchAnnealer.run result.
+    """
+    parameters, pu_rates, n_chains, seed = args
+    return BatchAnnealer(parameters).run(pu_rates, n_chains, seed)
+
+
+def default_parameters():
+    """
+    @return Default simulated annealing parameters.
+    """
+    return {
+        # Weights for maximizing throughput
+        'w1': 0.05, 'w2': 0.05, 'w3': 0.05, 'w4': 0.05, 'w5': 0.05, 'w6': 0.75,
+        # Transmitted power between 0.158 and 251 mW
+        'min_power': 1, 'max_power': 1,
+        # Modulation Scheme QAM between 2 and 256
+        'maximum_scheme': [4], 'maximum_modulation_index': 0,
+        # Bandwidth between 2 and 32 MHz
+        'min_bandwidth': 200, 'max_bandwidth': 400,
+        # TDD between
+        'min_tdd': 485, 'max_tdd': 490,
+        # Symbol Rate between 125kbps and 1Mbps
+        'min_symbol_rate': 125, 'max_symbol_rate': 1024,
+        # BER
+        'max_pbe': math.pow(10, -6), 'min_pbe': math.pow(10, -8),
+        # Initial temperature
+        'temperature': 1000,
+    }
+
+
+def full_process(to_sa, parameters=None, n_chains=4, processes=1):
+    """
+    Anneal all (link, channel) pairs.
+    @param to_sa List of list. Inner list is for each link: [(ch1, pu_rate), (ch2, pu_rate), ...]
+    @param parameters Simulated annealing parameters. Default: default_parameters().
+    @param n_chains Number of chains of each pair. The best (lowest) solution of the chains is used.
+    @param processes Number of processes. The chains are split among the processes.
+    @return List of [link index, channel, solution], ordered by solution.
+    """
+    parameters = parameters or default_parameters()
+
+    pairs = [(i, ch, pu_rate) for i, link in enumerate(to_sa) for ch, pu_rate in link]
+    if not pairs:
+        return []
+
+    pu_rates = [pu_rate for _, _, pu_rate in pairs]
+
+    processes = max(1, min(processes, n_chains))
+    split = [len(c) for c in np.array_split(np.arange(n_chains), processes)]
+    jobs = [(parameters, pu_rates, size, random.randint(0, 2 ** 31 - 1)) for size in split]
+
+    if processes > 1:
+        pool = multiprocessing.Pool(processes)
+        try:
+            res = pool.map(_run_chains, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        res = [_run_chains(job) for job in jobs]
+
+    res = np.hstack(res)
 
-    results = []
-    for i in range(0, len(to_sa)):
-        for c in to_sa[i]:
+    # chains without solution (-1) are used only if no chain found a solution
+    best = np.min(np.where(res < 0, np.inf, res), axis=1)
+    best = np.where(np.isinf(best), -1.0, best)
 
-            channel = Channel()
+    results = [[i, ch, best[idx]] for idx, (i, ch, _) in enumerate(pairs)]
+    return sorted(results, key=lambda item: item[2])
 
-            data[channel.SIM_ANNEALING_PARAMETERS]['pu_rate'] = c[1]
 
-            simu = channel.evaluate(data)
+def main():
+    # to_sa is a list of list.
+    # inner list is  for each link
+    # [ [(ch1, pu_rate) (ch2, pu_rate) (ch3, pu_rate)] ]
+    to_sa = [[(1, 77), (2, 77), (3, 77)], [(1, 79), (2, 79), (3, 79)]]
 
-            flag = False
-            j = 0
-            while flag is False and j < len(results):
-                if results[j][2] > simu:
-                    results.insert(j, [i, c[0], simu])
-                    flag = True
-                j = j + 1
-            if flag is False:
-                results.append([i, c[0], simu])
+    results = full_process(to_sa)
 
     d = {}
 
@@ -500,4 +602,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
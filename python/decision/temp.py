@@ -1 +0,0 @@
-ret=[[1, 4],[2, 3],]
\ No newline at end of file
@@ -173,6 +173,9 @@ class UHDSSArch(UHDGenericArch, AbstractSSArch):
         @param input_signature A gr.io_signature instance.
         @param output_signature A gr.io_signature instance.
         """
+        # Frame based sensing. See set_frame_sensing
+        self._frame_sensing = None
+
         AbstractSSArch.__init__(self, name)
         UHDGenericArch.__init__(self,
                              name=name,
@@ -212,6 +215,42 @@ class UHDSSArch(UHDGenericArch, AbstractSSArch):
         return res
 
 
+    def set_frame_sensing(self, detector, n_frames, skip_frames=0, timeout=None):
+        """
+        Define the sensing by the number of frames consumed by the detector instead of the sensing time.
+        @param detector Detector block. Must have a 'counter' attribute (FrameCounter) and an output() method.
+        @param n_frames Number of fresh frames consumed in each sensing. None disables the frame sensing.
+        @param skip_frames Number of frames discarded after the device is tuned.
+        @param timeout Max time (seconds) to wait for the frames. None waits forever. On timeout the sensing raises
+                       IOError.
+        """
+        if n_frames is None:
+            self._frame_sensing = None
+        else:
+            self._frame_sensing = (detector, n_frames, skip_frames, timeout)
+
+
+    def _wait_sensing(self, sensing_duration):
+        """
+        Wait until the sensing data is available.
+        Sleeps sensing_duration or, if set_frame_sensing was called, waits for the detector to consume the frames.
+        @param sensing_duration Sensing duration. Not used in the frame sensing.
+        @return The detector when using the frame sensing, None otherwise.
+        Raises IOError if the detector did not consume the frames before the timeout.
+        """
+        if self._frame_sensing is None:
+            time.sleep(sensing_duration)
+            return None
+
+        detector, n_frames, skip_frames, timeout = self._frame_sensing
+
+        detector.counter.arm(n_frames, skip_frames)
+        if not detector.counter.wait(timeout):
+            raise IOError("Frame sensing timeout: %d frames not consumed in %s seconds" % (n_frames, timeout))
+
+        return detector
+
+
     #::TODO:: parametro sensing_duration == sensing_time???
     @abstractmethod
     def _get_sensing_data(self, channel, sensing_duration):
@@ -18,6 +18,9 @@ Copyright 2013 OpERA
 
 from gnuradio import gr
 
+from utils import FrameCounter
+
+import threading
 import numpy as np
 
 # ::TODO:: Call a callback function  when group_vlen items are grouped.
@@ -56,6 +59,9 @@ class GroupInN(gr.sync_block):
 
         self._callback = None
 
+        self._lock = threading.Lock()
+        self.counter = FrameCounter()
+
 #::TODO:: descricao dos metodos e de seus parametros
     def set_callback(self, callback):
         """
@@ -64,15 +70,19 @@ class GroupInN(gr.sync_block):
         self._callback = callback
 
 
-    def set_enable(self, val):
+    def set_enable(self, val, n_items=None, skip_items=0):
         """
         Enable/Disable grouping.
         @param val
+        @param n_items Number of items to group. Default: max_items_group.
+        @param skip_items Number of items discarded before grouping.
         """
-        if val:
-            self._item_group = []
+        with self._lock:
+            if val:
+                self._item_group = []
+                self.counter.arm(n_items or self._max_vlen, skip_items)
 
-        self._enable = val
+            self._enable = val
 
 
     def get_items(self):
@@ -91,24 +101,32 @@ class GroupInN(gr.sync_block):
         @param output_items
         """
 
-        # Return is disable or list is full
-        if not self._enable or len(self._item_group) > self._max_vlen:
-            return len(input_items)
-
-        # this code create the tuple of items
-        # items cannot be appended to tuples, so we need to change it in a loop
-        if self._ninputs == 1:
-            self._item_group.append(input_items[0][0])
-        else:
-            self._item_group.append((input_items[0][0],))
-            for i in xrange(1, self._ninputs):
-                self._item_group[-1] = self._item_group[-1] + (input_items[i][0],)
-
-        # Grouped all items ?
-        if len(self._item_group) >= self._max_vlen:
-            if self._callback:
-                self._callback(self, self._item_group)
-                self._item_group = []
+        n_items = len(input_items[0])
+        group = None
+
+        with self._lock:
+            # Return if disabled
+            if not self._enable:
+                return n_items
+
+            # Items of this call that belong to the group (the counter stops when the group is full)
+            start, stop = self.counter.count(n_items)
+
+            if self._ninputs == 1:
+                self._item_group.extend(input_items[0][start:stop])
+            else:
+                self._item_group.extend(zip(*[_in[start:stop] for _in in input_items]))
+
+            # Grouped all items ?
+            if stop > start and len(self._item_group) >= self._max_vlen:
+                if self._callback:
+                    group = self._item_group
+                    self._item_group = []
+                    self.counter.arm(self._max_vlen)
+
+        # ::TRICKY:: called without the lock: the callback may call set_enable
+        if group is not None:
+            self._callback(self, group)
 
-        return len(input_items)
+        return n_items
 
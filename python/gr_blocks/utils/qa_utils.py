@@ -78,9 +78,10 @@ class QaUtils(gr_unittest.TestCase):
         """
         Test if the group_in_n  is able to group a single input.
         In this test the number os total grouped items is 1.
+        Only the first max_items_group items after set_enable are grouped.
         """
         arr = [1.0, 1.0, 1.0, 2.0, 2.0, 2.0]
-        expected_result = [(1, 1, 1), (2, 2, 2)]
+        expected_result = [(1, 1, 1), (1, 1, 1)]
 
         grouper_vlen = len(expected_result) + 1  # +1 to not activate the callback
 
@@ -3,6 +3,7 @@ from waveform import *
 from feedback import *
 from rankingArch import *
 from cyclostationary import *
+from wideband import *
 
 from energyDecision    import EnergyDecision
 from waveformDecision  import WaveformDecision
@@ -10,3 +11,4 @@ from bayesianDecision  import BayesLearningThreshold
 from bayesianDecision  import BayesLearningThreshold2
 from sarsaDecision     import SARSA
 from cycloDecision     import CycloDecision
+from cycloFAM          import CycloFAM
@@ -351,14 +351,21 @@ class BayesLearningThreshold(AbstractAlgorithm):
 class BayesLearningThreshold2(AbstractAlgorithm):
     """
     Class for learning thresholds with bayes hypothesis.
+    The thresholds are a fixed grid over [min_th, max_th] with step delta_th. Counters, probabilities and risks of
+    all thresholds are kept in numpy arrays indexed by the grid position. Only visited thresholds (the initial one
+    and the neighbours of each selected threshold) are updated and considered in the min risk search.
     """
 
+    # Rows of the counter matrix. Row (2 * feedback + hypothesis), i.e. '00', '01', '10', '11'
+    C00, C01, C10, C11 = range(4)
+
     def __init__(self, in_th, min_th, max_th, delta_th, k):
         """
         CTOR
-        @param in_th Initial threshold.
+        @param in_th Initial threshold. Rounded to the nearest threshold of the grid.
         @param min_th Minimum threshold.
         @param max_th Maximum threshold.
+        @param delta_th Step between two thresholds.
         @param k Bayesian k factor.
         """
         Logger.register('bayes_decision', ['threshold', 'decision', 'risk']) 
@@ -369,38 +376,48 @@ class BayesLearningThreshold2(AbstractAlgorithm):
         self._max_th_limit = max_th
 
         self._k = k
-        self._th = in_th
 
-        self.init(in_th)
+        n_th = int(round((max_th - min_th) / float(delta_th))) + 1
+        self._grid = np.minimum(min_th + delta_th * np.arange(n_th), max_th)
+        self._exp_grid = np.exp(self._grid)
 
+        self.init(in_th)
 
-	self._th_dec = {}
+        self._xx = {}
+        self._xx[0] = {0: "00", 1: "01"}
+        self._xx[1] = {0: "10", 1: "11"}
 
-	self._xx = {};
-	self._xx[0] = {0: "00", 1: "01"}
-	self._xx[1] = {0: "10", 1: "11"}
-    
 
     def init(self, in_th):
-        # Initialize data structures
-        self._p = {}
+        """
+        Initialize data structures.
+        @param in_th Initial threshold.
+        """
+        n_th = len(self._grid)
+
+        # Global counters of feedback 0 and 1, and the probabilities of h0 and h1
+        self._c = np.zeros(2)
+        self._p_h0 = self._p_h1 = 0.0
+
+        # Counters '00', '01', '10', '11' and probabilities of each threshold
+        self._c_th = np.zeros((4, n_th))
+        self._pf = np.zeros(n_th)
+        self._pd = np.zeros(n_th)
+        self._pm = np.zeros(n_th)
+        self._r = np.ones(n_th) * 0.5
 
-	self._black_list = []
-        self._c = {}
-        self._c_sum = {}
-        self._r = {}
+        self._visited = np.zeros(n_th, dtype=bool)
 
-        for p in ['h0', 'h1', 'pf', 'pd', 'pm']:
-            self._p[p] = 0
-        for c in ['00', '01', '10', '11', 'ones', 'zeroes', '0', '1']:
-            self._c[c] = 0.0
-        self.t = { 1: {1: '11', 0: '10'}, 0: {1: '01', 0: '00'} }
+        self._th_idx = int(np.argmin(np.abs(self._grid - in_th)))
+        self._visited[self._th_idx] = True
 
-	#i = self._min_th_limit
-	#while i <= self._max_th_limit:
-        #	self.insert_th(i)
-	#	i+= self._delta_th
-	self.insert_th( in_th )
+
+    @property
+    def threshold(self):
+        """
+        @return Current threshold.
+        """
+        return self._grid[self._th_idx]
 
 
     @property
@@ -409,10 +426,10 @@ class BayesLearningThreshold2(AbstractAlgorithm):
         Feedback property getter
         @ret _feedback
         """
-	if self._feedback != -1:
-        	return self._feedback
-	else:
-		return self._feedback_prev
+        if self._feedback != -1:
+            return self._feedback
+        else:
+            return self._feedback_prev
 
 
     @feedback.setter
@@ -421,253 +438,95 @@ class BayesLearningThreshold2(AbstractAlgorithm):
         Feedback property setter.
         @param val New feedback value
         """
-	self._feedback_prev = self._feedback
+        self._feedback_prev = self._feedback
         self._feedback = val
 
 
-    def insert_th(self, th):
+    def update_global_counter(self):
         """
-        Insert a new threshold in list of usable thresholds.
-        Add all intermediate thresholds if necessary.
-        @param th New threshold
+        Update the probabilities of h0 and h1 based on the feedback.
         """
-        if th in self._r:
-            return;
-
-        def new_th(self, th):
-            """
-            New Threshold initialization.
-            @param th
-            """
-            self._r[th] = 0.5
+        self._c[self.feedback] += 1.0
 
-            self._c[th] = {}
-            for c in ['00', '01', '10', '11', 'zeroes', 'ones']:
-                self._c[th][c] = 0.0
-            self._p[th] = {}
-            for c in ['pd', 'pf', 'pm', 'h0', 'h1']:
-                self._p[th][c] = 0.0
+        self._p_h0 = self._c[0] / np.sum(self._c)
+        self._p_h1 = self._c[1] / np.sum(self._c)
 
-        # Insert thresholds between low and high
-        new_th(self, th)
 
-
-    def calculate_w(self, th):
+    def update_th_counter(self, energy, updated):
         """
-        w function.
-        @param th Threshold
+        Insert the neighbours of the current threshold and update the counters of all visited thresholds that were
+        not updated yet.
+        @param energy Signal energy.
+        @param updated Boolean array. Thresholds already updated with this signal. Updated in place.
         """
-        num = self._p[th]['pd'] * (1.0 - self._p[th]['pf'])
-        den = self._p[th]['pf'] * (1.0 - self._p[th]['pd'])
-
-        
-        try:
-            r =  log10(num/den)
-        except:
-            r = 1.0
-        return r
+        self._visited[max(self._th_idx - 1, 0)] = True
+        self._visited[min(self._th_idx + 1, len(self._grid) - 1)] = True
 
-    def calculate_Mu(self, th, N):
-        """
-        calculate_Mu function.
-        @param th Threshold
-        @param N
-        """
+        mask = self._visited & ~updated
+        updated |= mask
 
-        elem_1 = 0
-        try:
-            #elem_1 = (1.0/N) * log10(self._p[th]['h0'] / self._p[th]['h1'])
-            elem_1 = (1.0/N) * log10(self._p['h0'] / self._p['h1'])
-        except:
-            pass
+        ones = (energy > self._exp_grid[mask])
+        zeroes = (energy < self._exp_grid[mask])
 
-        elem_2 = 0
-        try:
-            elem_2 = log10((1.0-self._p[th]['pf']) / (1.0-self._p[th]['pd']))
-        except:
-            pass
+        row = 2 * self.feedback
+        self._c_th[row, mask] += zeroes
+        self._c_th[row + 1, mask] += ones
 
-        return elem_1 + elem_2
+        self.update_th(mask)
 
 
-    def bayesian_hypothesis(self, th, signal):
+    def update_th(self, mask):
         """
-        Calculate bayesian hipthosis
-        @param th Threshold
-        @param signal
+        Update probabilities and bayesian risk of the thresholds.
+        @param mask Boolean array. Thresholds updated.
         """
-        N = signal.size
-	th_r = math.e ** th
-        energy = np.sum(signal) / N
-
-	#l = list(np.sign(np.subtract(signal, th_r)))
-        #ones   = l.count(1)
-        #zeroes = l.count(-1) + l.count(0)
-        ones   = 1 if energy > th_r else 0
-        zeroes  = 1 if energy < th_r else 0
-
-        self._c[th]['zeroes'] = zeroes
-        self._c[th]['ones']   = ones
-	self._th_dec[th] =  1 if energy > th_r else 0
-
-        return 1 if energy > th_r else 0
-
-        # OLD (BUT CORRECT) IMPLEMENTATION OF THE BAYESIAN DETECTOR
-        # @WARNING Without numpy this is a MAJOR bottleneck
+        c = self._c_th[:, mask]
 
-        #w = self.calculate_w(th)
-        #mu = self.calculate_Mu(th, N)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            den = c[self.C00] + c[self.C01]
+            pf = np.where(den > 0, c[self.C01] / den, 1.5)
 
-	#l = list(np.sign(np.subtract(signal, th_r)))
-        #ones   = l.count(1)
-        #zeroes = l.count(-1) + l.count(0)
+            den = c[self.C10] + c[self.C11]
+            pd = np.where(den > 0, c[self.C11] / den, 1.5)
+            pm = np.where(den > 0, 1.0 - pd, 1.5)
 
-        #self._c[th]['zeroes'] = zeroes
-        #self._c[th]['ones']   = ones
+        self._pf[mask] = pf
+        self._pd[mask] = pd
+        self._pm[mask] = pm
 
-        #energy = np.sum(np.multiply([w] * N, np.sign(np.subtract(signal, th_r)))-mu)
-        #s = ((energy/N) - mu)
-	#dec = 1 if s > 0 else 0
-	#self._th_dec[th] = dec 
+        # update threshold bayesian risk. IMPORTANT !!!
+        self._r[mask] = pf * self._p_h0 + self._k * pm * self._p_h1
 
-        #return dec 
 
-    #::TODO: parametro th aparece na documentacao mas nao eh um parametro da funcao!
-    def update_global_counter(self):
+    def get_min_risk(self, hyp):
         """
-        Update values of PD, PF, P, C, etc, based on bayesian hypothesis and the feedback
-        @param th Threshold utilized
-        @param bayes_hyp Bayes hypothesis. 1 (occupied) or 0 (vacant)
+        Get minimum bayes risk among the visited thresholds whose hypothesis agrees with the feedback.
+        Ties are broken in favour of the lowest threshold if feedback is 0 and the highest if feedback is 1.
+        @param hyp Boolean array. Hypothesis of each threshold.
+        @return Tuple (risk, threshold index)
         """
-        # update counter
-        self._c[str(self.feedback)] += 1.0
+        feedback = self.feedback
+        if feedback not in (0, 1):
+            raise NotImplementedError
 
-        self._p['h0'] = self._c['0'] / sum(self._c[c] for c in ['0', '1'])
-        self._p['h1'] = self._c['1'] / sum(self._c[c] for c in ['0', '1'])
+        candidates = self._visited & (hyp == feedback)
+        visited = np.flatnonzero(self._visited)
 
-    def update_th_counter(self, signal):
-        """
-        Update values of counters specifics of a threshold
-        @param signal Signal received on antenna
-        """
-        th = self._th
-        th_p = max(th - self._delta_th, self._min_th_limit)
-        th_n = min(th + self._delta_th, self._max_th_limit)
-
-	if th_p != th:
-		self.insert_th(th_p)
-	if th_n != th:
-		self.insert_th(th_n)
-
-	for t in self._r.iterkeys() :
-		if t not in self._black_list:
-			self._black_list.append( t )
-			self.update_th(t, self.bayesian_hypothesis(t, signal))
-	#if self._feedback == 1:
-	#	for t in arange(th_p, th, self._delta_th):
-	#		self.update_th(t, self.bayesian_hypothesis(t, signal))
-	#elif self._feedback == 0:
-	#	for t in arange(th, th_n, self._delta_th):
-	#		self.update_th(t, self.bayesian_hypothesis(t, signal))
-
-	#if th_p != th:
-	#	self.insert_th(th_p)
-	#	self.update_th(th_p, self.bayesian_hypothesis(th_p, signal))
-	#if th_n != th:
-	#	self.insert_th(th_n)
-	#	self.update_th(th_n, self.bayesian_hypothesis(th_n, signal))
-
-
-    def update_th(self, th, hyp):
-        """
-        Update the threshold.
-        @param th Current Threshold
-        @param hyp Bayesian hypothesis regarding channel status
-        """
-        self._c[th][self.t[self.feedback][0]] += float(self._c[th]['zeroes'])
-        self._c[th][self.t[self.feedback][1]] += float(self._c[th]['ones'])
-
-	self._p[th]['h0'] = (self._c[th]['00']+self._c[th]['01']) / sum(self._c[th][c] for c in ['00', '01', '10', '11'])
-        self._p[th]['h1'] = (self._c[th]['10']+self._c[th]['11']) / sum(self._c[th][c] for c in ['00', '01', '10', '11'])
-
-        # update pf
-        try:
-            self._p[th]['pf'] = self._c[th]['01'] / sum(self._c[th][c] for c in ['01', '00'])
-        except ZeroDivisionError:
-            self._p[th]['pf'] = 1.5
-
-        # update pd
-        try:
-            self._p[th]['pd'] = self._c[th]['11'] / sum(self._c[th][c] for c in ['10', '11'])
-            self._p[th]['pm'] = 1.0 -  self._p[th]['pd']
-        except ZeroDivisionError:
-            self._p[th]['pd' ] = 1.5
-            self._p[th]['pm' ] = 1.5
+        # No threshold agrees with the feedback: go to the lowest/highest visited threshold
+        if not candidates.any():
+            idx = visited[0] if feedback == 1 else visited[-1]
+            return self._r[idx], idx
 
-        # update threshold bayesian risk. IMPORTANT !!!
-        r = (self._p[th]['pf'] * self._p['h0'] + self._k * self._p[th]['pm']* self._p['h1'])
-	self._r[th] = r
+        risk = np.where(candidates, self._r, np.inf)
+        if feedback == 0:
+            idx = int(np.argmin(risk))
+        else:
+            idx = len(risk) - 1 - int(np.argmin(risk[::-1]))
 
+        if risk[idx] < self._r[self._th_idx]:
+            return risk[idx], idx
+        return self._r[self._th_idx], self._th_idx
 
-    def get_min_risk(self):
-        """
-        Get minimum bayes risk and threshold.
-        @param bayes_hyp
-        @return Tuple (risk:threshold)
-        """
-        rl = list(OrderedDict(sorted(self._r.items())).iterkeys() )
-        rt = list(OrderedDict(sorted(self._r.items())).iteritems())
-    
-	if self.feedback == 1:
-		iterator = reversed(sorted(self._r.iterkeys()))
-	elif self.feedback == 0:
-		iterator = sorted(self._r.iterkeys())
-	else:
-		raise NotImplementedError
-
-        min_th = self._th
-        min_risk = self._r[min_th]
-	at_least_one = False
-        for th in iterator:
-	    if self._th_dec[th] != self.feedback:
-		continue
-            at_least_one = True
-
-            risk = self._r[th]
-	    #print "r: ", risk, "[", min_risk ,"] d:", self._th_dec[th], " f:", self.feedback
-            if risk < min_risk:
-                min_risk = risk
-                min_th = th
-
-	if at_least_one == False:
-		if self.feedback == 1:
-			min_th = sorted(self._r)[0]
-			min_risk = self._r[min_th]
-		elif self.feedback == 0:
-			min_th = sorted(self._r)[len(self._r)-1]
-			min_risk = self._r[min_th]
-		else:
-			raise NotImplementedError
-
-        return min_risk, min_th
-    
-        #if (idx == 0) or ( (idx < len(rl)-1) and rl[idx] > rl[idx-1] and rl[idx] > rl[idx+1]):
-        #    for th in sorted(self._r.iterkeys()):
-        #        risk = self._r[th]
-    
-        #        if risk < min_risk:
-        #            min_risk = risk
-        #            min_th = th
-        #else:
-        #    min_th =   rt[int(idx/2)][0]
-	#    idx = 0
-	#    while idx < len(rl) and min_th > rl[idx]:
-	#	idx+=1
-	#    min_th = rl[idx]
-	#    min_risk = self._r[min_th]
-
-
-        #return min_risk, min_th
 
     #:TODO:: o nome do paramtero eh signal, mas na doc tem um 'energy'
     def decision(self, signal):
@@ -676,36 +535,61 @@ class BayesLearningThreshold2(AbstractAlgorithm):
         @param energy Signal Energy
         @param signal
         """
-        #hypothesis
-        # update counters
-
-	if self._feedback == 0 or self._feedback == 1:
-        	self.update_global_counter()
-
-		th = self._th
-		r = self._r[th]
-		while True:
-			# update bayes
-			self.update_th_counter(signal)
-		    
-			# update risk
-			bayes_r, self._th = self.get_min_risk()
-
-			# invalidate threshold. Wait until a new is provided
-			if th == self._th or r == bayes_r :
-				self.feedback = -1 
-				break
-			th = self._th
-			r = self._r[th]
-		# Clear black list of threshold
-		self._black_list = []
-		#print "d:", self.bayesian_hypothesis(self._th, signal), " f:", self.feedback, " t:", math.e ** self._th, " e:", sum(signal)/50
-
-	bayes_hyp = self.bayesian_hypothesis(self._th, signal)
-
-	# Save all data
-	dec = 1 if bayes_hyp > 0 else 0
+        energy = np.sum(signal) / signal.size
+
+        if self._feedback == 0 or self._feedback == 1:
+            self.update_global_counter()
+
+            hyp = (energy > self._exp_grid)
+            updated = np.zeros(len(self._grid), dtype=bool)
+
+            th = self._th_idx
+            r = self._r[th]
+            while True:
+                # update bayes
+                self.update_th_counter(energy, updated)
+
+                # update risk
+                bayes_r, self._th_idx = self.get_min_risk(hyp)
+
+                # invalidate threshold. Wait until a new is provided
+                if th == self._th_idx or r == bayes_r:
+                    self.feedback = -1
+                    break
+                th = self._th_idx
+                r = self._r[th]
+
+        # Save all data
+        dec = 1 if energy > self._exp_grid[self._th_idx] else 0
         Logger.append('bayes_decision', 'decision', self._xx[Logger._ch_status][dec])
-	Logger.append('bayes_decision', 'threshold', self._th)
-	Logger.append('bayes_decision', 'risk', self._r[self._th])
+        Logger.append('bayes_decision', 'threshold', self.threshold)
+        Logger.append('bayes_decision', 'risk', self._r[self._th_idx])
         return dec, 0.0
+
+
+    def decision_batch(self, matrix):
+        """
+        Implementation of base class method.
+        Rows are decided with the current threshold. If a feedback is pending, the first row is decided with
+        decision() (which updates the threshold) and the remaining rows with the new threshold.
+        @param matrix 2-D array. Each row is one input of decision().
+        @return Tuple (decisions, values), one item per row.
+        """
+        matrix = np.asarray(matrix)
+        if not len(matrix):
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+
+        if self._feedback == 0 or self._feedback == 1:
+            dec_0, _ = self.decision(matrix[0])
+            dec, values = self.decision_batch(matrix[1:])
+            return np.concatenate(([dec_0], dec)).astype(np.int32), np.zeros(len(matrix), dtype=np.float64)
+
+        energy = np.sum(matrix, axis=1) / matrix.shape[1]
+        dec = (energy > self._exp_grid[self._th_idx]).astype(np.int32)
+
+        codes = self._xx[Logger._ch_status]
+        Logger.append_many('bayes_decision', 'decision', [codes[d] for d in dec])
+        Logger.append_many('bayes_decision', 'threshold', [self.threshold] * len(dec))
+        Logger.append_many('bayes_decision', 'risk', [self._r[self._th_idx]] * len(dec))
+
+        return dec, np.zeros(len(dec), dtype=np.float64)
@@ -20,6 +20,7 @@ Copyright 2013 OpERA
 
 from algorithm.abstractAlgorithm import ThresholdAlgorithm
 from utils import Logger
+from cycloFAM import CycloFAM
 import copy
 
 import numpy as np
@@ -27,23 +28,40 @@ import numpy as np
 
 class CycloDecision(ThresholdAlgorithm):
     """
-    Simple energy threshold comparison algorithm.
+    Cyclostationary feature threshold comparison algorithm.
     """
 
-    def __init__(self, Np, P, L, th=0):
+    OPERA = 'opera'
+    NUMPY = 'numpy'
+
+    def __init__(self, Np, P, L, th=0, backend=None):
         """
         CTOR
         @param Np
         @param P
         @param L
         @param th Decision threshold.
+        @param backend FAM implementation: CycloDecision.OPERA (compiled gr-opera block) or CycloDecision.NUMPY
+                       (CycloFAM). Default: OPERA if gr-opera is installed, NUMPY otherwise.
         """
         ThresholdAlgorithm.__init__(self, th)
 
-        Logger.register('cyclo_decision', ['decision', ])
+        Logger.register('cyclo_decision', ['decision', ], dtype='S2')
+
+        if backend is None:
+            try:
+                from opera import cyclo_fam_calcspectrum_vcf
+                backend = CycloDecision.OPERA
+            except ImportError:
+                backend = CycloDecision.NUMPY
 
-        from opera import cyclo_fam_calcspectrum_vcf
-        self._algorithm = cyclo_fam_calcspectrum_vcf(Np, P, L)
+        if backend == CycloDecision.OPERA:
+            from opera import cyclo_fam_calcspectrum_vcf
+            self._algorithm = cyclo_fam_calcspectrum_vcf(Np, P, L)
+        elif backend == CycloDecision.NUMPY:
+            self._algorithm = CycloFAM(Np, P, L)
+        else:
+            raise AttributeError("Unknown FAM backend: %s" % backend)
 
 	self._xx = {};
 	self._xx[0] = {0: "00", 1: "01"}
@@ -65,3 +83,21 @@ class CycloDecision(ThresholdAlgorithm):
         Logger.append('cyclo_decision', 'decision', self._xx[Logger._ch_status][dec])
 
         return dec, _sum
+
+    def decision_batch(self, matrix):
+        """
+        Implementation of base class method.
+        @param matrix 2-D array. Each row is a Np*P vector of samples.
+        @return Tuple (decisions, values), one item per row.
+        """
+        if isinstance(self._algorithm, CycloFAM):
+            _sum = self._algorithm.calculate_cyclo_batch(matrix) / matrix.shape[1]
+        else:
+            _sum = np.array([self._algorithm.calculate_cyclo(row.tolist()) for row in matrix]) / matrix.shape[1]
+
+        dec = (_sum > self.threshold).astype(np.int32)
+
+        codes = self._xx[Logger._ch_status]
+        Logger.append_many('cyclo_decision', 'decision', [codes[d] for d in dec])
+
+        return dec, _sum
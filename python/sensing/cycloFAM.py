@@ -0,0 +1,128 @@
+"""
+Copyright 2013 OpERA
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+"""
+
+"""
+@package algorithm
+"""
+
+import numpy as np
+
+
+class CycloFAM(object):
+    """
+    FFT Accumulation Method (FAM) estimate of the spectral correlation function.
+    NumPy implementation of opera.cyclo_fam_calcspectrum_vcf. Can be used as the CycloDecision backend.
+
+    The input of calculate_cyclo is P consecutive Np-point FFTs (channelizer output), taken every L samples.
+    channelize() builds this input from raw complex samples.
+    """
+    ## Rows of the batch computed at once by calculate_cyclo_batch. Each row needs P*Np*Np complex values.
+    CHUNK_ROWS = 8
+
+    def __init__(self, Np, P, L):
+        """
+        CTOR
+        @param Np Number of points of the channelizer FFT.
+        @param P Number of channelizer FFTs (points of the second FFT).
+        @param L Decimation (hop) between two channelizer FFTs, in samples.
+        """
+        self._Np = Np
+        self._P = P
+        self._L = L
+
+        self._window = np.hamming(Np)
+        self._scale = np.sum(self._window * self._window) * P
+
+        # Down-conversion of each bin k of the channelizer FFT p: exp(-j*2*pi*k*p*L/Np)
+        _p, _k = np.meshgrid(np.arange(P), np.arange(Np), indexing='ij')
+        self._phasor = np.exp(-2j * np.pi * _k * _p * L / float(Np))
+
+        self._estimate = np.zeros((P, Np, Np), dtype=np.float64)
+
+
+    def channelize(self, samples):
+        """
+        Windowed channelizer FFTs.
+        @param samples Complex samples. At least (P-1)*L + Np samples.
+        @return Flat array with P Np-point FFTs (input of calculate_cyclo).
+        """
+        samples = np.asarray(samples)
+        idx = np.arange(self._P)[:, np.newaxis] * self._L + np.arange(self._Np)
+
+        return np.fft.fft(samples[idx] * self._window, axis=1).ravel()
+
+
+    def spectrum(self, matrix):
+        """
+        Estimate the spectral correlation of a batch of inputs.
+        @param matrix 2-D array. Each row has P Np-point FFTs.
+        @return Array (rows x P x Np x Np). Item [r, q, k, l] is the magnitude of the q-th point of the P-point FFT
+                of the product of bins k and l of row r.
+        """
+        demod = np.asarray(matrix).reshape(-1, self._P, self._Np) * self._phasor
+        demod = np.fft.fftshift(demod, axes=2)
+
+        prod = demod[:, :, :, np.newaxis] * np.conj(demod[:, :, np.newaxis, :])
+
+        return np.abs(np.fft.fft(prod, axis=1)) / self._scale
+
+
+    def calculate_cyclo_batch(self, matrix):
+        """
+        Cyclostationary feature of a batch of inputs.
+        @param matrix 2-D array. Each row has P Np-point FFTs.
+        @return Array with the peak of the spectral correlation outside the cyclic frequency 0, normalized by the
+                mean PSD, of each row.
+        """
+        matrix = np.asarray(matrix).reshape(-1, self._P * self._Np)
+        diag = np.arange(self._Np)
+
+        peak = np.zeros(len(matrix))
+        psd = np.zeros(len(matrix))
+
+        # Chunks of rows bound the memory of the (rows x P x Np x Np) spectrum
+        for start in range(0, len(matrix), self.CHUNK_ROWS):
+            stop = start + self.CHUNK_ROWS
+            spectrum = self.spectrum(matrix[start:stop])
+
+            psd[start:stop] = np.mean(spectrum[:, 0, diag, diag], axis=1)
+            if stop >= len(matrix):
+                self._estimate = spectrum[-1].copy()
+
+            # ::TRICKY:: cells with k == l and q == 0 are the PSD (cyclic frequency 0). They are not cyclic features.
+            spectrum[:, 0, diag, diag] = 0.0
+            peak[start:stop] = np.max(spectrum, axis=(1, 2, 3))
+
+        psd[psd == 0] = np.inf
+
+        return peak / psd
+
+
+    def calculate_cyclo(self, data_in):
+        """
+        Cyclostationary feature of a single input.
+        Same interface of opera.cyclo_fam_calcspectrum_vcf.calculate_cyclo.
+        @param data_in P Np-point FFTs.
+        @return Peak of the spectral correlation outside the cyclic frequency 0, normalized by the mean PSD.
+        """
+        return self.calculate_cyclo_batch(np.array(data_in, ndmin=2))[0]
+
+
+    def get_estimate(self):
+        """
+        @return Last spectral correlation estimate (P x Np x Np). See spectrum().
+        """
+        return self._estimate
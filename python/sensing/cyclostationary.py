@@ -27,9 +27,11 @@ from gnuradio import filter  #pylint: disable=F0401
 from gnuradio import fft     #pylint: disable=F0401
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 import math
 
 from device import UHDSSArch  #pylint: disable=F0401
+from utils import FrameCounter  #pylint: disable=F0401
 
 #from OpERA  import cyclo_detector
 
@@ -231,14 +233,17 @@ from device import UHDSSArch  #pylint: disable=F0401
 #::TODO:: descricao de classes, metodos e seus parametros
 class CycloBuffer(gr.sync_block):
     """
-
+    Groups the last P Np-vectors (oldest first) in a single Np*P vector.
+    One output is produced for each input (sliding window).
+    The vectors are kept in a preallocated 2-D history buffer, and the outputs of a work() call are written with a
+    single copy of a strided view of this buffer.
     """
 
     def __init__(self, Np, P, L):
         """
         CTOR
-        @param Np
-        @param P
+        @param Np Vector size.
+        @param P Number of vectors grouped.
         @param L
         """
 
@@ -248,14 +253,15 @@ class CycloBuffer(gr.sync_block):
                                out_sig=[np.dtype((np.complex64,  Np*P))]
                                )
 
-	self._Np = Np
-	self._P = P
-	self._L = L
+        self._Np = Np
+        self._P = P
+        self._L = L
 
-	self._dec = 0
-	self._p = 0
+        self._dec = 0
         self._sum = 0
-	self._to_algo = [np.array([np.complex64()] * Np) ] * P 
+
+        # Rows [0, P-1) hold the last P-1 vectors of the previous work() call. Grows on demand.
+        self._history = np.zeros((P - 1 + 1024, Np), dtype=np.complex64)
 
 
     def work(self, input_items, output_items):
@@ -263,22 +269,29 @@ class CycloBuffer(gr.sync_block):
         @param input_items
         @param output_items
         """
+        _in = input_items[0]
+        n_items = len(_in)
+        keep = self._P - 1
+
+        if keep + n_items > len(self._history):
+            history = np.zeros((2 * (keep + n_items), self._Np), dtype=np.complex64)
+            history[:keep] = self._history[:keep]
+            self._history = history
 
-	_out_idx = 0
+        self._history[keep:keep + n_items] = _in
 
-        for idx in range(len(input_items[0])):
-            self._to_algo[self._p][:] = input_items[0][idx]
+        # windows[i] is rows [i, i+P) of the history
+        row_stride, item_stride = self._history.strides
+        windows = as_strided(self._history,
+                             shape=(n_items, self._P, self._Np),
+                             strides=(row_stride, row_stride, item_stride))
 
-	    self._p += 1
-	    if (self._p == self._P): 
-                self._p = 0
+        output_items[0][:n_items].reshape(n_items, self._P, self._Np)[:] = windows
 
-	    xxx = []
-	    for x in self._to_algo:
-	    	xxx.extend(x)
-	    output_items[0][idx][:] = np.array(xxx)
+        # keep the last P-1 vectors for the next call
+        self._history[:keep] = self._history[n_items:n_items + keep]
 
-        return len(output_items[0])
+        return n_items
 
     def output(self):
         return (self._dec, self._sum)
@@ -314,6 +327,9 @@ class CycloDetector(gr.sync_block):
         self._sum = 0
 	self._to_algo = []
 
+        # Counts frames for UHDSSArch.set_frame_sensing
+        self.counter = FrameCounter()
+
 
     def work(self, input_items, output_items):
         """
@@ -321,10 +337,13 @@ class CycloDetector(gr.sync_block):
         @param output_items
         """
 
-        for idx in range(len(input_items[0])):
-		self._dec, self._sum = self._algorithm.decision(input_items[0][idx])
-		
-	return len(input_items[0])
+        if len(input_items[0]):
+            dec, _sum = self._algorithm.decision_batch(input_items[0])
+            self._dec, self._sum = dec[-1], _sum[-1]
+
+            self.counter.count(len(input_items[0]))
+
+        return len(input_items[0])
 
     def output(self):
         return (self._dec, self._sum)
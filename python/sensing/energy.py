@@ -25,6 +25,7 @@ from gnuradio import gr         #pylint: disable = F0401
 
 from device import UHDSSArch #pylint: disable=F0401
 from utils  import Logger    #pylint: disable=F0401
+from utils  import FrameCounter  #pylint: disable=F0401
 
 import time
 import numpy as np
@@ -52,6 +53,9 @@ class EnergyDetector(gr.sync_block):
         self._energy = 0
         self._decision = 0
 
+        # Counts frames for UHDSSArch.set_frame_sensing
+        self.counter = FrameCounter()
+
         if not self._algorithm:
             raise AttributeError("Algorithm must be an ThresholdLearningAlgorithm")
 
@@ -63,8 +67,11 @@ class EnergyDetector(gr.sync_block):
         @param output_items Energy calculated.
         @return
         """
-        for idx in range(len(input_items[0])):
-            self._decision, self._energy = self._algorithm.decision(input_items[0][idx])
+        if len(input_items[0]):
+            dec, energy = self._algorithm.decision_batch(input_items[0])
+            self._decision, self._energy = dec[-1], energy[-1]
+
+            self.counter.count(len(input_items[0]))
 
         return len(input_items[0])
 
@@ -77,6 +84,88 @@ class EnergyDetector(gr.sync_block):
         return (self._decision, self._energy)
 
 
+class PSDMovingAverage(gr.decim_block):
+    """
+    Moving average of the last mavg_size PSD frames.
+    Frames are kept in a ring buffer and a running sum is updated in O(fft_size) per frame.
+    One averaged frame is emitted every (mavg_size - overlap) input frames.
+    """
+
+    def __init__(self, vec_size, mavg_size, overlap=None, name="psd_moving_average"):
+        """
+        CTOR
+        @param vec_size Input/output array size.
+        @param mavg_size Number of frames averaged.
+        @param overlap Number of frames shared between two consecutive outputs. Default: mavg_size - 1 (one output per input).
+        @param name Block name.
+        """
+        if overlap is None:
+            overlap = mavg_size - 1
+
+        if mavg_size < 1 or not 0 <= overlap < mavg_size:
+            raise AttributeError("mavg_size must be >= 1 and 0 <= overlap < mavg_size")
+
+        gr.decim_block.__init__(self,
+                name=name,
+                in_sig = [np.dtype((np.float32, vec_size))],   #pylint: disable=E1101
+                out_sig= [np.dtype((np.float32, vec_size))],   #pylint: disable=E1101
+                decim  = mavg_size - overlap
+        )
+
+        self._mavg_size = mavg_size
+        self._step = mavg_size - overlap
+
+        self._ring = np.zeros((mavg_size, vec_size), dtype=np.float64)
+        self._sum = np.zeros(vec_size, dtype=np.float64)
+        self._pos = 0
+        self._filled = 0
+
+
+    def push(self, frame):
+        """
+        Insert a frame in the ring buffer, replacing the oldest one.
+        @param frame Array of vec_size floats.
+        """
+        self._sum += frame
+        self._sum -= self._ring[self._pos]
+        self._ring[self._pos] = frame
+
+        self._pos += 1
+        if self._pos == self._mavg_size:
+            self._pos = 0
+            # ::TRICKY:: recalculate the sum once per lap to avoid accumulating rounding errors
+            self._sum = np.sum(self._ring, axis=0)
+
+        if self._filled < self._mavg_size:
+            self._filled += 1
+
+
+    def average(self):
+        """
+        @return Average of the frames in the ring buffer.
+        """
+        return self._sum / max(self._filled, 1)
+
+
+    def work(self, input_items, output_items):
+        """
+        Average the input frames.
+        @param input_items Input array with float values.
+        @param output_items Averaged PSD.
+        @return
+        """
+        _in = input_items[0]
+        _out = output_items[0]
+
+        for idx in range(len(_out)):
+            for frame in _in[idx * self._step:(idx + 1) * self._step]:
+                self.push(frame)
+
+            _out[idx][:] = self.average()
+
+        return len(_out)
+
+
 class EnergyDetectorGambi(gr.hier_block2):
     """
     Top level of Energy Detector sensing algorithm.
@@ -85,10 +174,12 @@ class EnergyDetectorGambi(gr.hier_block2):
        in0    :    A vector of floats with len fft_size
     """
 
-    def __init__(self, fft_size, mavg_size, name="EnergyDetectorC"):
+    def __init__(self, fft_size, mavg_size, overlap=None, name="EnergyDetectorC"):
         """
         CTOR
         @param fft_size FFT Size.
+        @param mavg_size Number of FFT frames averaged. 1 disables the average.
+        @param overlap Number of frames shared between two consecutive averages. See PSDMovingAverage.
         """
 
         gr.hier_block2.__init__(self,
@@ -104,7 +195,11 @@ class EnergyDetectorGambi(gr.hier_block2):
         c2mag_0 = blocks.complex_to_mag_squared(fft_size)
 
         ## Flow graph
-        self.connect(self, s2v_0, fft_0, c2mag_0, self)  #pylint: disable=E1101
+        if mavg_size > 1:
+            self.mavg_0 = PSDMovingAverage(fft_size, mavg_size, overlap)
+            self.connect(self, s2v_0, fft_0, c2mag_0, self.mavg_0, self)  #pylint: disable=E1101
+        else:
+            self.connect(self, s2v_0, fft_0, c2mag_0, self)  #pylint: disable=E1101
         #self.connect(self, s2v_0, fft_0, self)  #pylint: disable=E1101
 
 
@@ -113,24 +208,25 @@ class EnergySSArch(UHDSSArch):
     Architecture for performing energy detection
     """
 
-    def __init__(self, fft_size, mavg_size):
+    def __init__(self, fft_size, mavg_size, overlap=None):
         """
         CTOR
         @param fft_size FFT Size.
         @param mavg_size Moving average array size.
-        @param algorithm A ThresholdAlgorithm instance.
+        @param overlap Number of frames shared between two consecutive averages. Default: mavg_size - 1.
         """
 
         self._detector = EnergyDetectorGambi(
                 fft_size = fft_size,
                 mavg_size = mavg_size,
+                overlap = overlap,
         )
 
         # ::TRICKY:: Calls abstract _build method
         UHDSSArch.__init__(self,
                            name="EnergySSArch",
                            input_signature=gr.io_signature(1, 1, gr.sizeof_gr_complex),
-                           output_signature=gr.io_signature(1, 1, gr.sizeof_float * 1024),
+                           output_signature=gr.io_signature(1, 1, gr.sizeof_float * fft_size),
                            )
 
 
@@ -152,8 +248,10 @@ class EnergySSArch(UHDSSArch):
         @param sensing_time
         @return Return the energy of the the channel
         """
-        # Sleep for sensing_time
-        time.sleep(sensing_time)
+        detector = self._wait_sensing(sensing_time)
+
+        if detector is not None:
+            return detector.output()
         return self.output()
 
     def output(self):
@@ -161,5 +259,5 @@ class EnergySSArch(UHDSSArch):
         Implementation of the base class abstract method.
         @return Return tuple (decision, energy)
         """
-	raise NotImplemented
+        raise NotImplemented
         return self._detector._ec.output()
@@ -35,11 +35,19 @@ class EnergyDecision(ThresholdAlgorithm):
         @param th Decision threshold.
         """
         ThresholdAlgorithm.__init__(self, th)
-        Logger.register('energy_decision', ['energy', 'decision'])
+        Logger.register('energy_decision', ['energy', ], dtype=np.float64)
+        Logger.register('energy_decision', ['decision', ], dtype='S2')
 
-	self._xx = {};
-	self._xx[0] = {0: "00", 1: "01"}
-	self._xx[1] = {0: "10", 1: "11"}
+        # Disabled items (see Logger.configure) get no-op appenders
+        self._log_energy = Logger.appender('energy_decision', 'energy')
+        self._log_decision = Logger.appender('energy_decision', 'decision')
+        self._log_energy_many = Logger.appender('energy_decision', 'energy', many=True)
+        self._log_decision_many = Logger.appender('energy_decision', 'decision', many=True)
+        self._log_decisions = Logger.is_enabled('energy_decision', 'decision')
+
+        self._xx = {}
+        self._xx[0] = {0: "00", 1: "01"}
+        self._xx[1] = {0: "10", 1: "11"}
 
     def decision(self, data_in):
         """"
@@ -49,9 +57,27 @@ class EnergyDecision(ThresholdAlgorithm):
         """
         energy = np.sum(data_in) / data_in.size
 
-	dec = 1 if self.threshold < energy else 0
+        dec = 1 if self.threshold < energy else 0
+
+        self._log_energy(energy)
+        if self._log_decisions:
+            self._log_decision(self._xx[Logger._ch_status][dec])
+
+        return dec, energy
+
+    def decision_batch(self, matrix):
+        """
+        Implementation of base class method.
+        @param matrix 2-D array. Each row is the mag squared of samples.
+        @return Tuple (decisions, energies), one item per row.
+        """
+        energy = np.sum(matrix, axis=1) / matrix.shape[1]
+
+        dec = (energy > self.threshold).astype(np.int32)
 
-        Logger.append('energy_decision', 'energy', energy)
-        Logger.append('energy_decision', 'decision', self._xx[Logger._ch_status][dec])
+        self._log_energy_many(energy)
+        if self._log_decisions:
+            codes = self._xx[Logger._ch_status]
+            self._log_decision_many([codes[d] for d in dec])
 
         return dec, energy
@@ -21,6 +21,7 @@ Copyright 2013 OpERA
 
 from gnuradio import gr
 from device import UHDSSArch
+from algorithm import DecisionCost
 import numpy as np
 
 
@@ -90,6 +91,10 @@ class FeedbackSSArch(gr.sync_block):
 	self._algo2 = algo2
 	self._feedback = feedback_algorithm
 
+	# Measured cost of learner and manager decisions
+	self._learner_cost = DecisionCost('ata', 'learner_cost')
+	self._manager_cost = DecisionCost('ata', 'manager_cost')
+
 	gr.sync_block.__init__(self,
 		name="hier",
 		in_sig = [np.dtype((np.float32, input_len)), np.dtype((np.float32, input_len))], 
@@ -98,31 +103,53 @@ class FeedbackSSArch(gr.sync_block):
 	 )
 
 
-	Logger.register('ata', ['decision', ] )
+	Logger.register('ata', ['decision', ], dtype=np.int32)
 
 
 
     def work(self, input_items, output_items):
-		for idx in range(len(input_items[0])):
-			self._feedback.wait()
-			if self._feedback.feedback():
-				dec2, e2 = self._algo2.decision(input_items[1][idx])
-				self._algo1.feedback = dec2
-
-				dec1, e1 = self._algo1.decision(input_items[1][idx])
-
-				if dec1 == dec2:
-					self._feedback.increase_time()
-				else:
-					self._feedback.decrease_time()
-			else:
-				dec1, e1 = self._algo1.decision(input_items[0][idx])
-			
-            		Logger.append('ata', 'decision', dec1)
-
-		return len(input_items[0])
-				
-			
+        """
+        Frames until the next feedback slot are decided by the learner in a single decision_batch call.
+        Only feedback frames are processed one at a time (manager decision + learner feedback).
+        @param input_items
+        @param output_items
+        """
+        n_items = len(input_items[0])
+
+        idx = 0
+        while idx < n_items:
+            # Frames without feedback
+            n_bulk = min(self._feedback.frames_to_feedback() - 1, n_items - idx)
+            if n_bulk > 0:
+                dec1, e1 = self._learner_cost.decision_batch(self._algo1, input_items[0][idx:idx + n_bulk])
+                self._feedback.skip(n_bulk)
+
+                Logger.append_many('ata', 'decision', dec1)
+                idx += n_bulk
+                continue
+
+            # Feedback frame
+            self._feedback.wait()
+            if self._feedback.feedback():
+                dec2, e2 = self._manager_cost.decision(self._algo2, input_items[1][idx])
+                self._feedback.add_cost(self._manager_cost.last)
+                self._algo1.feedback = dec2
+
+                dec1, e1 = self._learner_cost.decision(self._algo1, input_items[1][idx])
+
+                if dec1 == dec2:
+                    self._feedback.increase_time()
+                else:
+                    self._feedback.decrease_time()
+            else:
+                dec1, e1 = self._learner_cost.decision(self._algo1, input_items[0][idx])
+
+            Logger.append('ata', 'decision', dec1)
+            idx += 1
+
+        return n_items
+
+
     #::TODO:: parametros nao usados
     def _get_sensing_data(self, channel, sensing_time):
         """
@@ -28,7 +28,7 @@ sys.path.insert(0, path)
 from gnuradio import gr, gr_unittest, fft, blocks, digital
 
 from OpERAFlow import OpERAFlow
-from energy import EnergyDetectorC, EnergySSArch
+from energy import EnergyDetectorC, EnergySSArch, PSDMovingAverage
 from device import RadioDevice
 from sensing import EnergyDecision
 from gr_blocks.utils import SNREstimator, UHDSourceDummy
@@ -156,6 +156,23 @@ class QaEnergyDetector(gr_unittest.TestCase):
         ###self.assertEqual(expected_result , device.sink.output()[1])
         self.assertEqual(expected_result, device.ed.output()[1])  # uses 'name' parameter of the add_arch method
 
+    def test_005(self):
+        """
+        Test the moving average of PSD frames with 50% overlap.
+        """
+        vec_size = 2
+        frames = (1, 1, 3, 3, 5, 5, 7, 7)
+        expected_result = (2.0, 2.0, 4.0, 4.0, 6.0, 6.0)
+
+        src = blocks.vector_source_f(data=frames, vlen=vec_size)
+        mavg = PSDMovingAverage(vec_size, mavg_size=2, overlap=1)
+        dst = blocks.vector_sink_f(vlen=vec_size)
+
+        self.tb.connect(src, mavg, dst)
+        self.tb.run()
+
+        self.assertFloatTuplesAlmostEqual(expected_result, dst.data()[vec_size:])
+
 
 if __name__ == '__main__':
     gr_unittest.main()
@@ -31,7 +31,10 @@ import numpy as np
 # Modules  tested
 from energyDecision import EnergyDecision
 from waveformDecision import WaveformDecision
-from bayesianDecision import BayesLearningThreshold
+from bayesianDecision import BayesLearningThreshold, BayesLearningThreshold2
+from wideband import channel_bin_matrix
+from cycloFAM import CycloFAM
+from sarsaDecision import SARSA
 
 # Other modules needed
 from device import radioDevice
@@ -72,6 +75,80 @@ class QaDecision(unittest.TestCase):
         # Random will (probably) not match any signal
         self.assertEqual((0, 0.0), dec)
 
+    def test_ed_003(self):
+        """
+        Test EnergyDecision batch decision against the single decision.
+        """
+        from utils import Logger
+        Logger._ch_status = 0
+
+        ed = EnergyDecision(1.0)
+        matrix = np.array([[0.5, 0.5], [2.0, 2.0], [0.0, 4.0]])
+
+        dec, energy = ed.decision_batch(matrix)
+
+        self.assertEqual([0, 1, 1], list(dec))
+        for idx in range(len(matrix)):
+            self.assertEqual((dec[idx], energy[idx]), ed.decision(matrix[idx]))
+
+    def test_wfd_001(self):
+        """
+        Test the Waveform pattern bank against scipy correlations.
+        """
+        import scipy.stats as sc
+        from utils import Logger
+        Logger._ch_status = 0
+
+        patterns = np.random.rand(3, 64)
+        frames = np.random.randint(0, 8, size=(4, 64)).astype(np.float64)  # with ties
+
+        for method, corr in ((WaveformDecision.SPEARMAN, sc.spearmanr), (WaveformDecision.PEARSON, sc.pearsonr)):
+            wd = WaveformDecision(0.5, waveforms=patterns, method=method)
+
+            dec, max_corr = wd.decision_batch(frames)
+            for idx, frame in enumerate(frames):
+                expected = max(abs(corr(frame, p)[0]) for p in patterns)
+                self.assertAlmostEqual(expected, max_corr[idx])
+                self.assertEqual(dec[idx], wd.decision(frame)[0])
+
+    def test_wideband_001(self):
+        """
+        Test the mapping of FFT bins to channels.
+        """
+        from utils import Channel
+
+        # 8 bins of 1 Hz from -4 to 3 Hz
+        channels = [Channel(0, -3.0, 2.0), Channel(1, 1.0, 4.0)]
+        matrix = channel_bin_matrix(channels, fft_size=8, center_freq=0.0, samp_rate=8.0)
+
+        psd = np.array([2, 2, 0, 1, 1, 1, 1, 0], dtype=np.float64)
+        self.assertEqual([2.0, 1.0], list(matrix.dot(psd)))
+
+        self.assertRaises(AttributeError, channel_bin_matrix, [Channel(2, 10.0, 1.0)], 8, 0.0, 8.0)
+
+    def test_cyclo_001(self):
+        """
+        Test the NumPy FAM against the element by element computation.
+        """
+        import math
+        Np, P, L = 8, 4, 2
+
+        fam = CycloFAM(Np, P, L)
+        samples = np.random.randn((P - 1) * L + Np) + 1j * np.random.randn((P - 1) * L + Np)
+        fft_in = fam.channelize(samples)
+
+        demod = np.zeros((P, Np), dtype=complex)
+        for p in range(P):
+            for i in range(Np):
+                demod[p][i] = fft_in[p * Np + i] * np.exp(-2j * math.pi * i * p * L / float(Np))
+        demod = np.fft.fftshift(demod, axes=1)
+
+        spectrum = fam.spectrum(fft_in)[0]
+        for k in range(Np):
+            for l in range(Np):
+                expected = np.abs(np.fft.fft(demod[:, k] * np.conj(demod[:, l]))) / fam._scale
+                self.assertTrue(np.allclose(expected, spectrum[:, k, l]))
+
     def test_bayes_001(self):
         """
         Test BayesLearningThreshold basic parameters.
@@ -116,5 +193,54 @@ class QaDecision(unittest.TestCase):
         self.assertEqual((0, 0), dec)
 
 
+    def test_bayes_003(self):
+        """
+        Test BayesLearningThreshold2 threshold grid and feedback.
+        """
+        from utils import Logger
+        Logger._ch_status = 0
+
+        obj = BayesLearningThreshold2(in_th=5.1, min_th=0.0, max_th=12.0, delta_th=0.5, k=1)
+
+        # in_th is rounded to the grid
+        self.assertEqual(25, len(obj._grid))
+        self.assertEqual(5.0, obj.threshold)
+
+        # Signal energy is below the threshold but the channel is occupied: threshold must decrease
+        signal = np.array([np.exp(3.0)])
+        self.assertEqual(0, obj.decision(signal)[0])
+
+        for _ in range(5):
+            obj.feedback = 1
+            dec = obj.decision(signal)
+
+        self.assertEqual((1, 0.0), dec)
+        self.assertTrue(obj.threshold < 3.0)
+
+
+    def test_sarsa_001(self):
+        """
+        Test SARSA Q-table save and load.
+        """
+        import tempfile
+        from utils import Logger
+        Logger._ch_status = 0
+
+        obj = SARSA(min_th=0.0, max_th=10.0, delta_th=1.0)
+        for _ in range(100):
+            obj.feedback = random.choice([0, 1])
+            obj.decision(np.array([random.uniform(0.0, 10.0)]))
+
+        path = os.path.join(tempfile.mkdtemp(), 'q_table.npy')
+        obj.save(path)
+
+        other = SARSA(min_th=0.0, max_th=10.0, delta_th=1.0)
+        other.load(path)
+        self.assertTrue(np.array_equal(obj.q_table, other.q_table))
+        self.assertEqual(int(np.argmax(np.max(obj.q_table, axis=1))), other.s_idx)
+
+        self.assertRaises(AttributeError, SARSA(min_th=0.0, max_th=10.0, delta_th=2.0).load, path)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -65,10 +65,12 @@ class QLearningWorker(gr.sync_block):
         @param output_items
         @return
         """
-        for idx in range(len(input_items[0])):
-            output_items[1][idx], output_items[0][idx] = self._algorithm.decision( input_items[0][idx] )
+        n = len(input_items[0])
 
-        return len(output_items)
+        if n:
+            output_items[1][:n], output_items[0][:n] = self._algorithm.decision_batch(input_items[0])
+
+        return n
 
 
 class SimpleRankingDetector(gr.hier_block2):
@@ -165,13 +167,35 @@ class RankingArch( UHDSSArch ):
         #           If is the case, then check the DeviceChannelModel::center_freq method
         self.radio.set_center_freq( the_channel )
 
-        self._grouper.set_enable( True )
-        time.sleep( sensing_time )
+        if self._frame_sensing is None:
+            self._grouper.set_enable( True )
+            time.sleep( sensing_time )
+        else:
+            _, n_frames, skip_frames, timeout = self._frame_sensing
+
+            self._grouper.set_enable( True, n_items = n_frames, skip_items = skip_frames )
+            if not self._grouper.counter.wait( timeout ):
+                self._grouper.set_enable( False )
+                raise IOError("Frame sensing timeout: %d items not grouped in %s seconds" % (n_frames, timeout))
+
         self._grouper.set_enable( False )
 
         return self._grouper.get_items()
 
 
+    def set_frame_sensing(self, detector, n_frames, skip_frames=0, timeout=None):
+        """
+        Sense n_frames fresh outputs of the detector instead of sleeping sensing_time.
+        Reimplement from UHDSSArch::set_frame_sensing
+        @param detector Not used: the outputs of the detector are always counted by the grouper. Pass None.
+        @param n_frames Number of (decision, energy) items grouped in each sensing. None disables the frame sensing.
+        @param skip_frames Number of items discarded after the device is tuned.
+        @param timeout Max time (seconds) to wait for the items. None waits forever. On timeout the sensing raises
+                       IOError.
+        """
+        UHDSSArch.set_frame_sensing(self, self._grouper, n_frames, skip_frames, timeout)
+
+
     def sense_channel(self, the_channel, sensing_time):
         """
         ## SS on a single channel
@@ -16,7 +16,6 @@ Copyright 2013 OpERA
 
 import random as rd
 import numpy as np
-from array import *
 from utils import Logger
 from algorithm.abstractAlgorithm import AbstractAlgorithm
 
@@ -109,20 +108,15 @@ class SARSA(AbstractAlgorithm):
         # Max jump
         self.max_jump = int(self.nstates / 50)
 
-        # Map the threshold value to the index of this threshold in self.states
-        self.state_map = {'0.0': 0}
-        for i in range(self.nstates):
-            self.state_map[self.states[i]] = i
-
         # How many actions I'm using?
         self.nactions = len(self.actions)
 
         # Build an empty q_table with size (nactions * nstates)
         self.q_table = self.build_q_table()
 
-        # Guess what?
-        self.s = self.get_initial_state()
-        self.a = self.e_greedy_selection(self.s)
+        # Current state and action. Both are indexes (of self.states and self.actions)
+        self.s_idx = self.get_initial_state()
+        self.a_idx = self.e_greedy_selection(self.s_idx)
 
         # May be messy
         if self.verbose:
@@ -131,6 +125,14 @@ class SARSA(AbstractAlgorithm):
         Logger.register('bayes_learning', ['hypothesis', 'feedback', 'state', 'reward', 'action'])
 
 
+    @property
+    def threshold(self):
+        """
+        @return Threshold of the current state.
+        """
+        return self.states[self.s_idx]
+
+
     def print_q_table(self):
         """
         """
@@ -138,6 +140,32 @@ class SARSA(AbstractAlgorithm):
             print "%.4f  %s" % (self.states[i], self.q_table[i])
 
 
+    def save(self, path):
+        """
+        Save the Q-table in a .npy file.
+        @param path File path.
+        """
+        np.save(path, self.q_table)
+
+
+    def load(self, path):
+        """
+        Load a Q-table saved with save() and move to the best state of the learned policy.
+        @param path File path.
+        """
+        q_table = np.load(path)
+
+        if q_table.shape != self.q_table.shape:
+            raise AttributeError("Q-table shape %s does not match (%d states x %d actions)" %
+                                 (str(q_table.shape), self.nstates, self.nactions))
+
+        self.q_table = q_table.astype(np.float64)
+
+        # Warm start: state whose best action has the highest value
+        self.s_idx = int(np.argmax(np.max(self.q_table, axis=1)))
+        self.a_idx = self.e_greedy_selection(self.s_idx)
+
+
     def finish(self):
         """
         Print the results.
@@ -176,7 +204,7 @@ class SARSA(AbstractAlgorithm):
     def get_action_list(self):
         """
         """
-        return array('i', [self.action.DECR, self.action.HOLD, self.action.INCR])
+        return np.array([self.action.DECR, self.action.HOLD, self.action.INCR])
 
 
     def get_state_list(self):
@@ -189,33 +217,33 @@ class SARSA(AbstractAlgorithm):
 
     def get_initial_state(self):
         """
-        @return The first state.
+        @return Index of the first state.
         """
         # Last element. Believe it.
-        #return self.states[ -1 ]
+        #return self.nstates - 1
         # Starting from the middle.
-        #return self.states[ int( self.nstates/2 ) ]
+        #return int( self.nstates/2 )
         # Lowest threshold, Bayes mode
-        return self.states[0]
+        return 0
 
 
     def build_q_table(self):
         """
         """
         # Filled with zeros
-        return [[0 for i in range(self.nactions)] for i in range(self.nstates)]
+        return np.zeros((self.nstates, self.nactions), dtype=np.float64)
 
 
-    def get_best_action(self, state):
+    def get_best_action(self, state_idx):
         """
-        @param state
+        @param state_idx Index of the state.
+        @return Index of the action with more rewards.
         """
         # Get the line corresponding to the state
-        state_row = self.q_table[self.state_map[state]]
-        # Get action with more rewards ...
-        max_val = max(state_row)
-        # and get the index of this action
-        max_val_idx = state_row.index(max_val)
+        state_row = self.q_table[state_idx]
+        # Get index of the action with more rewards (first one in case of tie)
+        max_val_idx = int(np.argmax(state_row))
+        max_val = state_row[max_val_idx]
 
         if self.verbose:
             print state_row
@@ -224,32 +252,35 @@ class SARSA(AbstractAlgorithm):
         return max_val_idx
 
 
-    def e_greedy_selection(self, state):
+    def e_greedy_selection(self, state_idx):
         """
         Chooses an action for the given state
-        @param state
+        @param state_idx Index of the state.
+        @return Index of the action.
         """
 
         idx = 0
 
         # Higher probability. Get the action with more rewards.
         if rd.random() > self.epsilon:
-            idx = self.get_best_action(state)
+            idx = self.get_best_action(state_idx)
         else:
             # Randomly chosen action
             idx = rd.randint(0, self.nactions - 1)
 
-        return self.actions[idx]
+        return idx
 
 
-    def do_action(self, state, action):
+    def do_action(self, state_idx, action_idx):
         """
 
-        @param state
-        @param action
+        @param state_idx Index of the current state.
+        @param action_idx Index of the action.
+        @return Index of the next state.
         """
 
-        final_state_index = cur_idx = self.state_map[state]
+        final_state_index = cur_idx = state_idx
+        action = self.actions[action_idx]
 
         if action == self.action.HOLD:
             #self.action_i = 0
@@ -272,14 +303,14 @@ class SARSA(AbstractAlgorithm):
 
             final_state_index = min(self.nstates - 1, cur_idx + state_jump)
 
-        return self.states[final_state_index]
+        return final_state_index
 
 
-    def get_reward(self, energy, state):
+    def get_reward(self, energy, state_idx):
         """
 
         @param energy
-        @param state
+        @param state_idx Index of the state.
         """
 
         if self.feedback_received == False:
@@ -289,7 +320,7 @@ class SARSA(AbstractAlgorithm):
         rw = 0
         my_decision = 0
 
-        if energy > state:
+        if energy > self.states[state_idx]:
             # Occupied
             my_decision = 1
         else:
@@ -307,27 +338,19 @@ class SARSA(AbstractAlgorithm):
     def update_q_table(self, s, a, rw, sp, ap):
         """
 
-        @param s
-        @param a
+        @param s Index of current state
+        @param a Index of current action
         @param rw
-        @param sp
-        @param ap
-        """
-
-        # Index of current state
-        state_idx = self.state_map[s]
-        # Index of next state
-        next_state_idx = self.state_map[sp]
-        # Index of current action
-        act_idx = self.actions.index(a)
-        # Index of next action
-        next_act_idx = self.actions.index(ap)
+        @param sp Index of next state
+        @param ap Index of next action
+        """
+
         # Current value in q_table
-        cur_val = self.q_table[state_idx][act_idx]
+        cur_val = self.q_table[s, a]
         # q_table value corresponding to the next state and action
-        next_val = self.q_table[next_state_idx][next_act_idx]
+        next_val = self.q_table[sp, ap]
         # Update current value
-        self.q_table[state_idx][act_idx] += self.alpha * (rw + self.gamma * next_val - cur_val)
+        self.q_table[s, a] += self.alpha * (rw + self.gamma * next_val - cur_val)
 
 
     def decision(self, energy):
@@ -342,21 +365,23 @@ class SARSA(AbstractAlgorithm):
         if self.cycle_counter_max == self.cycle_counter:
             self.cycle_counter = 0
 
-        sp = self.do_action(self.s, self.a)
+        sp = self.do_action(self.s_idx, self.a_idx)
         rw = self.get_reward(energy, sp)
         ap = self.e_greedy_selection(sp)
 
-        self.update_q_table(self.s, self.a, rw, sp, ap)
+        self.update_q_table(self.s_idx, self.a_idx, rw, sp, ap)
 
-        self.s = sp
-        self.a = ap
+        self.s_idx = sp
+        self.a_idx = ap
 
         #self.epsilon *= 0.999
 
-        Logger.append('bayes_learning', 'hypothesis', 1.0 if energy > self.s else 0.0)
+        th = self.states[sp]
+
+        Logger.append('bayes_learning', 'hypothesis', 1.0 if energy > th else 0.0)
         Logger.append('bayes_learning', 'feedback', self._feedback)
-        Logger.append('bayes_learning', 'state', self.s)
+        Logger.append('bayes_learning', 'state', th)
         Logger.append('bayes_learning', 'reward', rw)
-        Logger.append('bayes_learning', 'action', self.a)
+        Logger.append('bayes_learning', 'action', self.actions[ap])
 
-        return 1 if (energy > sp) else 0, energy
+        return 1 if (energy > th) else 0, energy
@@ -25,6 +25,7 @@ import time
 
 from device import UHDSSArch   #pylint: disable=F0401
 from utils import Logger       #pylint: disable=F0401
+from utils import FrameCounter #pylint: disable=F0401
 
 
 #::TODO:: descricao das classes, metodos e seus parametros
@@ -132,6 +133,9 @@ class WaveformDetector(gr.sync_block):
         self._corr = 0
         self._dec = 0
 
+        # Counts frames for UHDSSArch.set_frame_sensing
+        self.counter = FrameCounter()
+
     def work(self, input_items, output_items):
         """
         Process inputs.
@@ -139,8 +143,11 @@ class WaveformDetector(gr.sync_block):
         @param output_items Energy calculated.
         @return
         """
-        for idx in range(len(input_items[0])):
-            self._dec, self._corr = self._algorithm.decision(input_items[0][idx])
+        if len(input_items[0]):
+            dec, corr = self._algorithm.decision_batch(input_items[0])
+            self._dec, self._corr = dec[-1], corr[-1]
+
+            self.counter.count(len(input_items[0]))
 
         return len(input_items[0])
 
@@ -217,7 +224,10 @@ class WaveformSSArch(UHDSSArch):
         @param sensing_time
         @return Return a tuple (decision, correlation)
         """
-        time.sleep( sensing_time )
+        detector = self._wait_sensing(sensing_time)
+
+        if detector is not None:
+            return detector.output()
         return self.output()
 
 
@@ -0,0 +1,228 @@
+"""
+Copyright 2013 OpERA
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+"""
+
+## @package ssf
+#  Wideband energy sensing: all channels inside the device bandwidth are sensed with a single capture.
+
+from gnuradio import gr      #pylint: disable = F0401
+from gnuradio import fft     #pylint: disable = F0401
+from gnuradio import blocks  #pylint: disable = F0401
+
+from device import UHDSSArch #pylint: disable=F0401
+from utils  import Logger    #pylint: disable=F0401
+
+import time
+import threading
+import numpy as np
+
+
+def channel_bin_matrix(channel_list, fft_size, center_freq, samp_rate):
+    """
+    Map the bins of a shifted FFT to the sub-band of each channel.
+    @param channel_list List of Channel objects.
+    @param fft_size FFT size.
+    @param center_freq Device center frequency.
+    @param samp_rate Device sample rate (captured bandwidth).
+    @return Matrix (len(channel_list) x fft_size). Row i averages the bins of channel_list[i].
+    """
+    # Frequency of each bin of a shifted FFT (DC in the middle)
+    bin_freq = center_freq + (np.arange(fft_size) - fft_size / 2) * (float(samp_rate) / fft_size)
+
+    matrix = np.zeros((len(channel_list), fft_size), dtype=np.float64)
+
+    for idx, channel in enumerate(channel_list):
+        low = channel.get_freq() - channel.get_bandwidth() / 2.0
+        high = channel.get_freq() + channel.get_bandwidth() / 2.0
+
+        mask = (bin_freq >= low) & (bin_freq < high)
+        if not mask.any():
+            raise AttributeError("Channel %s is outside the captured band" % repr(channel))
+
+        matrix[idx][mask] = 1.0 / np.count_nonzero(mask)
+
+    return matrix
+
+
+class WidebandEnergyDetector(gr.sync_block):
+    """
+    Sink Block.
+    Accumulates PSD frames until reset() is called.
+    """
+
+    def __init__(self, vec_size, name="wideband_energy_detector"):
+        """
+        CTOR
+        @param vec_size Input array size.
+        @param name Block name.
+        """
+        gr.sync_block.__init__(self,
+                name=name,
+                in_sig = [np.dtype((np.float32, vec_size))],  #pylint: disable=E1101
+                out_sig= None   #pylint: disable=E1101
+        )
+
+        self._lock = threading.Lock()
+        self._psd_sum = np.zeros(vec_size, dtype=np.float64)
+        self._count = 0
+
+
+    def work(self, input_items, output_items):
+        """
+        Accumulate the PSD frames.
+        @param input_items Input array with float values.
+        @param output_items
+        @return
+        """
+        with self._lock:
+            self._psd_sum += np.sum(input_items[0], axis=0)
+            self._count += len(input_items[0])
+
+        return len(input_items[0])
+
+
+    def reset(self):
+        """
+        Discard all accumulated frames.
+        """
+        with self._lock:
+            self._psd_sum[:] = 0
+            self._count = 0
+
+
+    def output(self):
+        """
+        @return Tuple (average PSD, number of frames averaged).
+        """
+        with self._lock:
+            return self._psd_sum / max(self._count, 1), self._count
+
+
+class WidebandSSArch(UHDSSArch):
+    """
+    Architecture for performing energy detection of several channels with a single capture.
+    The device stays tuned and one FFT over the device bandwidth is split in the sub-bands of each channel.
+    """
+
+    def __init__(self, fft_size, threshold=0, thresholds=None):
+        """
+        CTOR
+        @param fft_size FFT Size.
+        @param threshold Decision threshold used for channels not present in thresholds.
+        @param thresholds Dictionary {channel number: threshold}. Optional.
+        """
+        self._fft_size = fft_size
+        self._threshold = threshold
+        self._thresholds = dict(thresholds) if thresholds else {}
+
+        # cache of the last channel to bin mapping
+        self._map_key = None
+        self._map = None
+
+        # ::TRICKY:: Calls abstract _build method
+        UHDSSArch.__init__(self,
+                           name="WidebandSSArch",
+                           input_signature=gr.io_signature(1, 1, gr.sizeof_gr_complex),
+                           output_signature=gr.io_signature(0, 0, 0),
+                           )
+
+        Logger.register('wideband_ss', ['energy', 'decision', 'frames'])
+
+
+    def _build(self, input_signature, output_signature):
+        """
+        Implementation of base abstract method.
+        @param input_signature The input signature.
+        @param output_signature The output signature.
+        """
+        self._s2v = blocks.stream_to_vector(gr.sizeof_gr_complex, self._fft_size)
+        self._fft = fft.fft_vcc(self._fft_size, True, [], True)
+        self._c2mag = blocks.complex_to_mag_squared(self._fft_size)
+        self._detector = WidebandEnergyDetector(self._fft_size)
+
+        self._add_connections([self, self._s2v, self._fft, self._c2mag, self._detector])
+
+        return None
+
+
+    def set_threshold(self, channel, threshold):
+        """
+        Set the decision threshold of a single channel.
+        @param channel Channel object.
+        @param threshold Decision threshold.
+        """
+        self._thresholds[channel.get_channel()] = threshold
+
+
+    def _bin_matrix(self, channel_list):
+        """
+        @param channel_list List of Channel objects.
+        @return Channel to bin matrix for the current device configuration.
+        """
+        center_freq = self.radio.get_center_freq()
+        samp_rate = self.radio.get_samp_rate()
+
+        key = (center_freq, samp_rate, tuple((ch.get_freq(), ch.get_bandwidth()) for ch in channel_list))
+        if key != self._map_key:
+            self._map = channel_bin_matrix(channel_list, self._fft_size, center_freq, samp_rate)
+            self._map_key = key
+
+        return self._map
+
+
+    def sense_channel_list(self, channel_list, sensing_duration):
+        """
+        Sense all channels with a single capture. The device center frequency is not changed.
+        Reimplement from AbstractSSArch::sense_channel_list
+        @param channel_list List of Channel objects inside the device bandwidth.
+        @param sensing_duration Sensing duration.
+        @return List of tuples (decision, energy), one per channel.
+        """
+        matrix = self._bin_matrix(channel_list)
+
+        self._detector.reset()
+        time.sleep(sensing_duration)
+        psd, frames = self._detector.output()
+
+        energy = matrix.dot(psd)
+        threshold = np.array([self._thresholds.get(ch.get_channel(), self._threshold) for ch in channel_list])
+        dec = (energy > threshold).astype(np.int32)
+
+        Logger.append('wideband_ss', 'energy', energy.tolist())
+        Logger.append('wideband_ss', 'decision', dec.tolist())
+        Logger.append('wideband_ss', 'frames', frames)
+
+        return [(dec[idx], energy[idx]) for idx in range(len(channel_list))]
+
+
+    def sense_channel(self, channel, sensing_duration):
+        """
+        SS on a single channel. The device center frequency is not changed.
+        Reimplement from UHDSSArch::sense_channel
+        @param channel Channel object.
+        @param sensing_duration Sensing duration.
+        @return Tuple (decision, energy)
+        """
+        return self.sense_channel_list([channel], sensing_duration)[0]
+
+
+    def _get_sensing_data(self, channel, sensing_duration):
+        """
+        Implementation of the base class abstract method.
+        @param channel Channel object.
+        @param sensing_duration Sensing duration.
+        @return Tuple (decision, energy)
+        """
+        return self.sense_channel(channel, sensing_duration)
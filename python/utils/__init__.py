@@ -2,6 +2,12 @@ from channel import Channel
 from channel import ChannelModeler
 from channel import ChannelThread
 
+from frameCounter import FrameCounter
+from logAggregate import LogStats
+from logAggregate import LogHistogram
+from logAggregate import LogCounter
+from logAggregate import LogQuantiles
+
 from logger   import Logger
 
 from packet   import PktBitRate
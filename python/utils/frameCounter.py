@@ -0,0 +1,99 @@
+"""
+Copyright 2013 OpERA
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+"""
+
+"""
+@package utils
+"""
+
+import time
+import threading
+
+
+class FrameCounter(object):
+    """
+    Counts the frames consumed by a signal processing block during a sensing window.
+    The sensing thread calls arm() after tuning the device and then wait().
+    The block calls count() from its work() function. wait() returns as soon as the window is complete.
+    """
+
+    def __init__(self):
+        """
+        CTOR
+        """
+        self._cond = threading.Condition()
+
+        self._armed = False
+        self._skip = 0
+        self._needed = 0
+        self._count = 0
+
+
+    def arm(self, n_frames, skip=0):
+        """
+        Start a new sensing window.
+        @param n_frames Number of frames in the window.
+        @param skip Number of frames discarded before the window starts (frames still in the pipeline when the
+                    device was tuned).
+        """
+        with self._cond:
+            self._needed = n_frames
+            self._skip = skip
+            self._count = 0
+            self._armed = True
+
+
+    def count(self, n_items):
+        """
+        Account the frames consumed in a work() call.
+        @param n_items Number of frames consumed.
+        @return Tuple (start, stop). Frames [start:stop] of this work() call belong to the sensing window.
+        """
+        with self._cond:
+            if not self._armed or self._count >= self._needed:
+                return 0, 0
+
+            start = min(self._skip, n_items)
+            self._skip -= start
+
+            stop = min(n_items, start + self._needed - self._count)
+            self._count += stop - start
+
+            if self._count >= self._needed:
+                self._cond.notify_all()
+
+            return start, stop
+
+
+    def wait(self, timeout=None):
+        """
+        Block until the sensing window is complete.
+        @param timeout Max time (seconds) to wait. None waits forever.
+        @return True if all frames of the window were consumed, False on timeout.
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.time() + timeout
+
+            while self._armed and self._count < self._needed:
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            self._armed = False
+            return self._count >= self._needed
@@ -0,0 +1,447 @@
+"""
+Copyright 2013 OpERA
+
+  Licensed under the Apache License, Version 2.0 (the "License");
+  you may not use this file except in compliance with the License.
+  You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+  Unless required by applicable law or agreed to in writing, software
+  distributed under the License is distributed on an "AS IS" BASIS,
+  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+  See the License for the specific language governing permissions and
+  limitations under the License.
+"""
+
+"""
+@package utils
+"""
+
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import Counter
+
+import numpy as np
+
+
+class LogAggregate(object):
+    """
+    Storage of a logged variable that keeps a summary instead of the values.
+    Register an item with Logger.register(name, item, aggregate=Class) (or a function returning a new aggregate).
+    The channel status of the values is not kept.
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        """
+        CTOR
+        """
+        # held by appends and reads (Logger merges from any thread)
+        self._lock = threading.Lock()
+        self._count = 0
+
+
+    def __len__(self):
+        """
+        @return Number of values added.
+        """
+        return self._count
+
+
+    def append(self, value, ch_status=None):
+        """
+        Add a value.
+        @param value Value.
+        @param ch_status Not used.
+        """
+        with self._lock:
+            self._add(value)
+            self._count += 1
+
+
+    def extend(self, values, ch_status=None):
+        """
+        Add a sequence of values.
+        @param values Sequence (list or numpy array) of values.
+        @param ch_status Not used.
+        """
+        if not len(values):
+            return
+
+        with self._lock:
+            self._add_many(values)
+            self._count += len(values)
+
+
+    def clear(self):
+        """
+        Discard all values.
+        """
+        with self._lock:
+            self._clear()
+            self._count = 0
+
+
+    def summary(self):
+        """
+        @return Dictionary with the summary. Values are JSON serializable.
+        """
+        with self._lock:
+            ret = self._summary()
+            ret['count'] = self._count
+            return ret
+
+
+    @abstractmethod
+    def _add(self, value):
+        """
+        Add a value. Called with the lock held.
+        Must be implemented on derived class.
+        @param value Value.
+        """
+        pass
+
+
+    def _add_many(self, values):
+        """
+        Add a sequence of values. Called with the lock held.
+        @param values Sequence of values.
+        """
+        for value in values:
+            self._add(value)
+
+
+    @abstractmethod
+    def _clear(self):
+        """
+        Discard all values. Called with the lock held.
+        Must be implemented on derived class.
+        """
+        pass
+
+
+    @abstractmethod
+    def _summary(self):
+        """
+        Must be implemented on derived class.
+        @return Dictionary with the summary. Called with the lock held.
+        """
+        pass
+
+
+class LogStats(LogAggregate):
+    """
+    Running count, mean, variance (population), min and max (Welford).
+    """
+
+    def __init__(self):
+        """
+        CTOR
+        """
+        LogAggregate.__init__(self)
+        self._clear()
+
+
+    def _add(self, value):
+        """
+        Implementation of base class abstract method.
+        @param value Number.
+        """
+        n = self._count + 1
+        delta = value - self._mean
+
+        self._mean += delta / float(n)
+        self._m2 += delta * (value - self._mean)
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+
+
+    def _add_many(self, values):
+        """
+        Reimplementation of base class method. Merges the statistics of the batch (Chan et al.).
+        @param values Sequence of numbers.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        n_a, n_b = self._count, len(values)
+        mean_b = values.mean()
+        delta = mean_b - self._mean
+
+        self._mean += delta * n_b / float(n_a + n_b)
+        self._m2 += float(np.sum((values - mean_b) ** 2)) + delta * delta * n_a * n_b / float(n_a + n_b)
+        self._min = min(self._min, float(values.min()))
+        self._max = max(self._max, float(values.max()))
+
+
+    def _clear(self):
+        """
+        Implementation of base class abstract method.
+        """
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = float('inf')
+        self._max = float('-inf')
+
+
+    def _summary(self):
+        """
+        Implementation of base class abstract method.
+        @return {'mean', 'var', 'std', 'min', 'max'}. None if no value was added.
+        """
+        if not self._count:
+            return dict.fromkeys(['mean', 'var', 'std', 'min', 'max'])
+
+        var = self._m2 / self._count
+        return {'mean': float(self._mean), 'var': float(var), 'std': float(np.sqrt(var)),
+                'min': float(self._min), 'max': float(self._max)}
+
+
+class LogHistogram(LogAggregate):
+    """
+    Histogram with fixed bins of equal width.
+    """
+
+    def __init__(self, low, high, bins):
+        """
+        CTOR
+        @param low Lower edge of the first bin.
+        @param high Upper edge of the last bin.
+        @param bins Number of bins.
+        """
+        if not high > low or bins < 1:
+            raise AttributeError("Invalid histogram: [%s, %s), %s bins" % (low, high, bins))
+
+        LogAggregate.__init__(self)
+
+        self._low = float(low)
+        self._high = float(high)
+        self._scale = bins / (self._high - self._low)
+        self._counts = np.zeros(bins, dtype=np.int64)
+
+        self._clear()
+
+
+    def _add(self, value):
+        """
+        Implementation of base class abstract method.
+        @param value Number.
+        """
+        if value < self._low:
+            self._underflow += 1
+        elif value >= self._high:
+            self._overflow += 1
+        else:
+            # ::TRICKY:: rounding may give len(counts) for values close to high
+            self._counts[min(int((value - self._low) * self._scale), len(self._counts) - 1)] += 1
+
+
+    def _add_many(self, values):
+        """
+        Reimplementation of base class method.
+        @param values Sequence of numbers.
+        """
+        values = np.asarray(values, dtype=np.float64)
+
+        inside = (values >= self._low) & (values < self._high)
+        self._underflow += int(np.count_nonzero(values < self._low))
+        self._overflow += int(np.count_nonzero(values >= self._high))
+
+        idx = np.minimum(((values[inside] - self._low) * self._scale).astype(np.int64), len(self._counts) - 1)
+        self._counts += np.bincount(idx, minlength=len(self._counts))
+
+
+    def _clear(self):
+        """
+        Implementation of base class abstract method.
+        """
+        self._counts[:] = 0
+        self._underflow = 0
+        self._overflow = 0
+
+
+    def _summary(self):
+        """
+        Implementation of base class abstract method.
+        @return {'edges', 'counts', 'underflow', 'overflow'}. Values outside [low, high) are under/overflow.
+        """
+        return {'edges': np.linspace(self._low, self._high, len(self._counts) + 1).tolist(),
+                'counts': self._counts.tolist(),
+                'underflow': self._underflow,
+                'overflow': self._overflow}
+
+
+class LogCounter(LogAggregate):
+    """
+    Number of values of each category (e.g. the decision codes "00", "01", "10" and "11").
+    """
+
+    def __init__(self):
+        """
+        CTOR
+        """
+        LogAggregate.__init__(self)
+        self._counts = Counter()
+
+
+    def _add(self, value):
+        """
+        Implementation of base class abstract method.
+        @param value Category (hashable).
+        """
+        self._counts[value] += 1
+
+
+    def _add_many(self, values):
+        """
+        Reimplementation of base class method.
+        @param values Sequence of categories.
+        """
+        self._counts.update(values.tolist() if isinstance(values, np.ndarray) else values)
+
+
+    def _clear(self):
+        """
+        Implementation of base class abstract method.
+        """
+        self._counts.clear()
+
+
+    def _summary(self):
+        """
+        Implementation of base class abstract method.
+        @return {'counts': {str(category): count}}.
+        """
+        return {'counts': dict((str(k), v) for k, v in self._counts.items())}
+
+
+class LogQuantiles(LogAggregate):
+    """
+    Approximate quantiles (t-digest).
+    Values are kept in a buffer. When it is full, the buffer and the centroids are sorted and merged. A centroid at
+    quantile q holds at most 4 * n * q * (1 - q) / compression of the n values, so extreme quantiles are more accurate.
+    """
+
+    def __init__(self, compression=100, quantiles=(0.5, 0.9, 0.99)):
+        """
+        CTOR
+        @param compression Accuracy of the digest. The number of centroids grows with it.
+        @param quantiles Quantiles in the summary.
+        """
+        LogAggregate.__init__(self)
+
+        self._compression = float(compression)
+        self._quantiles = list(quantiles)
+        self._buffer_size = 10 * int(compression)
+
+        self._clear()
+
+
+    def _add(self, value):
+        """
+        Implementation of base class abstract method.
+        @param value Number.
+        """
+        self._buffer.append(value)
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+
+    def _add_many(self, values):
+        """
+        Reimplementation of base class method.
+        @param values Sequence of numbers.
+        """
+        self._buffer.extend(values.tolist() if isinstance(values, np.ndarray) else values)
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+
+    def _clear(self):
+        """
+        Implementation of base class abstract method.
+        """
+        self._means = np.zeros(0)
+        self._weights = np.zeros(0)
+        self._buffer = []
+        self._min = float('inf')
+        self._max = float('-inf')
+
+
+    def _compress(self):
+        """
+        Merge the buffer in the centroids.
+        """
+        if not self._buffer:
+            return
+
+        buf = np.asarray(self._buffer, dtype=np.float64)
+        self._buffer = []
+        self._min = min(self._min, float(buf.min()))
+        self._max = max(self._max, float(buf.max()))
+
+        values = np.concatenate((self._means, buf))
+        weights = np.concatenate((self._weights, np.ones(len(buf))))
+        order = np.argsort(values, kind='mergesort')
+        values, weights = values[order].tolist(), weights[order].tolist()
+
+        total = sum(weights)
+        means, sizes = [], []
+        cum = 0.0
+        mean, weight = values[0], weights[0]
+
+        for value, w in zip(values[1:], weights[1:]):
+            # max weight of a centroid at quantile q: 4 * total * q * (1 - q) / compression
+            q = (cum + (weight + w) / 2.0) / total
+            if weight + w <= 4 * total * q * (1 - q) / self._compression:
+                weight += w
+                mean += (value - mean) * w / weight
+            else:
+                means.append(mean)
+                sizes.append(weight)
+                cum += weight
+                mean, weight = value, w
+
+        means.append(mean)
+        sizes.append(weight)
+
+        self._means = np.array(means)
+        self._weights = np.array(sizes)
+
+
+    def quantile(self, q):
+        """
+        @param q Quantile (0 to 1).
+        @return Approximate value of quantile q. None if no value was added.
+        """
+        with self._lock:
+            return self._quantile(q)
+
+
+    def _quantile(self, q):
+        """
+        @param q Quantile (0 to 1). Called with the lock held.
+        @return Approximate value of quantile q. None if no value was added.
+        """
+        self._compress()
+        if not len(self._weights):
+            return None
+
+        # each centroid is at the middle of its weight. min and max are the ends
+        total = self._weights.sum()
+        centers = np.cumsum(self._weights) - self._weights / 2.0
+
+        return float(np.interp(q * total, np.concatenate(([0.0], centers, [total])),
+                               np.concatenate(([self._min], self._means, [self._max]))))
+
+
+    def _summary(self):
+        """
+        Implementation of base class abstract method.
+        @return {'quantiles': {str(q): value}, 'min', 'max', 'centroids'}.
+        """
+        quantiles = dict((str(q), self._quantile(q)) for q in self._quantiles)
+        if not len(self._weights):
+            return {'quantiles': quantiles, 'min': None, 'max': None, 'centroids': 0}
+
+        return {'quantiles': quantiles, 'min': self._min, 'max': self._max, 'centroids': len(self._weights)}
@@ -18,12 +18,647 @@ Copyright 2013 OpERA
 #@package utils
 
 import os
+import json
+import time
+import threading
+from itertools import count
+from operator import itemgetter
 from threading import Semaphore 
+
+import numpy as np
+
+from logAggregate import LogAggregate
 #import matplotlib
 #matplotlib.use("Agg")
 #import matplotlib.pyplot as plt
 
 
+class LogColumn(object):
+    """
+    Typed storage of a logged variable.
+    Values are kept in a NumPy array (one item per append) that doubles its size when full.
+    """
+
+    # Initial capacity
+    CHUNK = 1024
+
+    def __init__(self, dtype, ch_status=True, timestamps=False):
+        """
+        CTOR
+        @param dtype Dtype of the values. Sub-array dtypes (e.g. np.dtype((np.float32, (n,)))) store one vector per item.
+        @param ch_status Keep the global channel status (int8, -1 if None) of each item.
+        @param timestamps Keep the time (time.time()) of each item.
+        """
+        self.dtype = np.dtype(dtype)
+
+        # held by appends and drain (stream thread)
+        self._lock = threading.Lock()
+
+        self._size = 0
+        self._data = np.empty(self.CHUNK, dtype=self.dtype)
+        self._status = np.empty(self.CHUNK, dtype=np.int8) if ch_status else None
+        self._time = np.empty(self.CHUNK, dtype=np.float64) if timestamps else None
+
+
+    def __len__(self):
+        """
+        @return Number of items.
+        """
+        return self._size
+
+
+    def _reserve(self, n_items):
+        """
+        Grow the arrays, doubling the capacity, until n_items more items fit.
+        @param n_items Number of items to append.
+        """
+        needed = self._size + n_items
+        if needed <= len(self._data):
+            return
+
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+
+        def _grow(arr):
+            new = np.empty((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            new[:self._size] = arr[:self._size]
+            return new
+
+        self._data = _grow(self._data)
+        if self._status is not None:
+            self._status = _grow(self._status)
+        if self._time is not None:
+            self._time = _grow(self._time)
+
+
+    def append(self, value, ch_status=None):
+        """
+        Add an item.
+        @param value Value.
+        @param ch_status Global channel status.
+        """
+        with self._lock:
+            self._reserve(1)
+
+            self._data[self._size] = value
+            if self._status is not None:
+                self._status[self._size] = -1 if ch_status is None else ch_status
+            if self._time is not None:
+                self._time[self._size] = time.time()
+
+            self._size += 1
+
+
+    def extend(self, values, ch_status=None):
+        """
+        Add several items at once.
+        @param values Sequence or array of values.
+        @param ch_status Global channel status (same for all items).
+        """
+        values = np.asarray(values, dtype=self.dtype.base)
+        n_items = len(values)
+
+        with self._lock:
+            self._reserve(n_items)
+
+            end = self._size + n_items
+            self._data[self._size:end] = values
+            if self._status is not None:
+                self._status[self._size:end] = -1 if ch_status is None else ch_status
+            if self._time is not None:
+                self._time[self._size:end] = time.time()
+
+            self._size = end
+
+
+    def clear(self):
+        """
+        Discard all items. The capacity is kept.
+        """
+        with self._lock:
+            self._size = 0
+
+
+    def drain(self):
+        """
+        Remove all items.
+        @return Dictionary with copies of the values ('values'), status ('status') and time ('time') arrays.
+                Status and time are present only if kept.
+        """
+        with self._lock:
+            ret = dict((k, v.copy()) for k, v in self.arrays('values').items())
+            self._size = 0
+
+        return dict((k.replace('values/', ''), v) for k, v in ret.items())
+
+
+    @property
+    def values(self):
+        """
+        @return Array (view) with the values.
+        """
+        return self._data[:self._size]
+
+
+    @property
+    def ch_status(self):
+        """
+        @return Array (view) with the channel status of each item. None if not kept.
+        """
+        return None if self._status is None else self._status[:self._size]
+
+
+    @property
+    def timestamps(self):
+        """
+        @return Array (view) with the time of each item. None if not kept.
+        """
+        return None if self._time is None else self._time[:self._size]
+
+
+    def arrays(self, prefix):
+        """
+        @param prefix Name of the values array.
+        @return Dictionary {name: array} with the values, status (prefix/status) and time (prefix/time).
+        """
+        ret = {prefix: self.values}
+        if self._status is not None:
+            ret[prefix + '/status'] = self.ch_status
+        if self._time is not None:
+            ret[prefix + '/time'] = self.timestamps
+        return ret
+
+
+class LogStream(object):
+    """
+    Background writer of the typed items (LogColumn) of Logger.
+    A thread drains the items every interval seconds (or as soon as an item has max_items values) and appends them
+    to binary files. Drained items are removed from memory. Files are fsync'ed every fsync_interval seconds.
+    Files are truncated when a stream first writes to them. Write errors are printed and the thread keeps draining
+    (values that could not be written are lost). stop() raises IOError if any write failed.
+
+    Files of item 'variable' of object 'name', in directory:
+      - name_variable[_it].json: header (dtype and shape of the values).
+      - name_variable[_it].bin: values, raw.
+      - name_variable[_it].status.bin: channel status (int8), if kept.
+      - name_variable[_it].time.bin: time (float64), if kept.
+    Use LogStream.load to read them.
+    """
+
+    def __init__(self, history, directory, it=-1, interval=1.0, max_items=65536, fsync_interval=10.0, flush=None):
+        """
+        CTOR
+        @param history Logger history (dictionary {name: {variable: data}}).
+        @param directory Directory of the files.
+        @param it Test Iteration (used do separate repetitions of tests).
+        @param interval Max time (seconds) between two drains.
+        @param max_items Number of values of an item that triggers a drain.
+        @param fsync_interval Time (seconds) between two fsync of the files.
+        @param flush Function called before each drain (e.g. to merge pending values in history). Optional.
+        """
+        self._history = history
+        self._flush = flush
+        self._directory = directory
+        self._it = it
+
+        self.interval = interval
+        self.max_items = max_items
+        self.fsync_interval = fsync_interval
+
+        self._files = {}
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+        # Number of failed drains and the first error
+        self.n_errors = 0
+        self.error = None
+
+
+    @staticmethod
+    def path(directory, name, variable, it=-1):
+        """
+        @param directory Directory of the files.
+        @param name Object name.
+        @param variable Variable name.
+        @param it Test Iteration.
+        @return Path of the files of an item, without extension.
+        """
+        return directory + '/' + name + '_' + variable + ('_' + str(it) if it != -1 else '')
+
+
+    @staticmethod
+    def load(directory, name, variable, it=-1):
+        """
+        Read the files of an item.
+        @param directory Directory of the files.
+        @param name Object name.
+        @param variable Variable name.
+        @param it Test Iteration.
+        @return Dictionary with the values ('values'), status ('status') and time ('time') arrays.
+        """
+        path = LogStream.path(directory, name, variable, it)
+
+        with open(path + '.json') as fd:
+            header = json.load(fd)
+
+        ret = {'values': np.fromfile(path + '.bin', dtype=np.dtype((header['dtype'], tuple(header['shape']))))}
+        for key, dtype in (('status', np.int8), ('time', np.float64)):
+            if os.path.exists(path + '.' + key + '.bin'):
+                ret[key] = np.fromfile(path + '.' + key + '.bin', dtype=dtype)
+
+        return ret
+
+
+    def start(self):
+        """
+        Start the writer thread.
+        """
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='LogStream')
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def stop(self):
+        """
+        Stop the writer thread. All pending items are written and the files are closed.
+        Raises IOError if a write failed while streaming.
+        """
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+
+        for fd in self._files.values():
+            try:
+                fd.flush()
+                os.fsync(fd.fileno())
+                fd.close()
+            except (IOError, OSError) as e:
+                self._report(e)
+        self._files = {}
+
+        if self.error is not None:
+            raise IOError("LogStream: %d failed writes. First error: %s" % (self.n_errors, self.error))
+
+
+    def wake(self):
+        """
+        Drain the items now.
+        """
+        self._wake.set()
+
+
+    def _report(self, error):
+        """
+        Account and print a write error.
+        @param error Exception.
+        """
+        self.n_errors += 1
+        if self.error is None:
+            self.error = error
+
+        print 'LogStream: write failed:', error
+
+
+    def _run(self):
+        """
+        Writer thread.
+        """
+        last_sync = time.time()
+
+        while self._running:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+            # ::TRICKY:: the thread must survive errors, otherwise the items grow in memory
+            try:
+                self._drain()
+
+                if time.time() - last_sync >= self.fsync_interval:
+                    last_sync = time.time()
+                    for fd in self._files.values():
+                        fd.flush()
+                        os.fsync(fd.fileno())
+            except Exception as e:  #pylint: disable=W0703
+                self._report(e)
+
+        try:
+            self._drain()
+        except Exception as e:  #pylint: disable=W0703
+            self._report(e)
+
+
+    def _file(self, name, variable, column, key):
+        """
+        @param name Object name.
+        @param variable Variable name.
+        @param column LogColumn of the item.
+        @param key 'values', 'status' or 'time'.
+        @return File object of an item. Opened (truncated, and the header written) on first use.
+        """
+        if (name, variable, key) not in self._files:
+            path = LogStream.path(self._directory, name, variable, self._it)
+
+            if key == 'values':
+                with open(path + '.json', 'w') as fd:
+                    json.dump({'dtype': column.dtype.base.str, 'shape': list(column.dtype.shape)}, fd)
+
+            self._files[(name, variable, key)] = open(path + ('.bin' if key == 'values' else '.' + key + '.bin'),
+                                                      'wb')
+
+        return self._files[(name, variable, key)]
+
+
+    def _drain(self):
+        """
+        Write the values of all typed items and remove them from memory.
+        """
+        if self._flush is not None:
+            self._flush()
+
+        for name in list(self._history):
+            for variable, column in list(self._history[name].items()):
+                if not isinstance(column, LogColumn) or not len(column):
+                    continue
+
+                for key, arr in column.drain().items():
+                    self._file(name, variable, column, key).write(arr.tobytes())
+
+
+# Sequence number of the appends (next() is atomic)
+_SEQ = count()
+
+# Status of values appended with ch_status=None
+_NO_STATUS = object()
+
+
+def _noop(*args):
+    """
+    Appender of disabled items.
+    """
+    pass
+
+
+class LogKey(object):
+    """
+    Registered item of Logger.
+    Each thread appends to its own buffer, without locks. The buffers are merged in the item storage (list or
+    LogColumn), in append order, when a buffer is full and before the storage is read, dumped or streamed.
+    """
+
+    # Number of values of a thread buffer that triggers a merge
+    BUFFER_SIZE = 1024
+
+    def __init__(self, name, variable, storage, printed=False, sample=1):
+        """
+        CTOR
+        @param name Object name.
+        @param variable Variable name.
+        @param storage List, LogColumn or LogAggregate.
+        @param printed Print the appended values.
+        @param sample Keep 1 in sample values. 0 disables the item.
+        """
+        self.name = name
+        self.variable = variable
+        self.storage = storage
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._buffers = []
+
+        self._printed = printed
+        self._sample = 1
+        self._seen = count()
+
+        self.set_sample(sample)
+
+
+    def set_printed(self, printed):
+        """
+        @param printed Print the appended values.
+        """
+        self._printed = printed
+        self._bind()
+
+
+    def set_sample(self, sample):
+        """
+        @param sample Keep 1 in sample values. 0 disables the item.
+        """
+        if not isinstance(sample, (int, long)) or sample < 0:
+            raise AttributeError("Invalid sample rate of %s:%s: %s" % (self.name, self.variable, sample))
+
+        self._sample = sample
+        self._bind()
+
+
+    @property
+    def enabled(self):
+        """
+        @return True if the appended values are kept.
+        """
+        return self._sample != 0
+
+
+    def _bind(self):
+        """
+        Select the append functions.
+        """
+        # ::TRICKY:: bound methods: appends do not check the print list or the sample rate of the item
+        store = self._append_print if self._printed else self._append
+        store_many = self._append_many_print if self._printed else self._append_many
+
+        if self._sample == 0:
+            self.append = self.append_many = _noop
+        elif self._sample > 1:
+            self._store, self._store_many = store, store_many
+            self.append, self.append_many = self._append_sampled, self._append_many_sampled
+        else:
+            self.append, self.append_many = store, store_many
+
+
+    def _append_sampled(self, value, ch_status):
+        """
+        Add 1 in sample values.
+        @param value Value.
+        @param ch_status Global channel status or _NO_STATUS.
+        """
+        if next(self._seen) % self._sample == 0:
+            self._store(value, ch_status)
+
+
+    def _append_many_sampled(self, values, ch_status):
+        """
+        Add 1 in sample values of a sequence.
+        @param values Sequence (list or numpy array) of values.
+        @param ch_status Global channel status or _NO_STATUS.
+        """
+        keep = [i for i in xrange(len(values)) if next(self._seen) % self._sample == 0]
+        if not keep:
+            return
+
+        if isinstance(values, np.ndarray):
+            values = values[keep]
+        else:
+            values = [values[i] for i in keep]
+
+        self._store_many(values, ch_status)
+
+
+    def _new_buffer(self):
+        """
+        @return Buffer of the current thread.
+        """
+        buf = self._local.buffer = []
+        with self._lock:
+            self._buffers.append(buf)
+        return buf
+
+
+    def _append(self, value, ch_status):
+        """
+        Add a value.
+        @param value Value.
+        @param ch_status Global channel status or _NO_STATUS.
+        """
+        if not Logger._enable:
+            return
+
+        try:
+            buf = self._local.buffer
+        except AttributeError:
+            buf = self._new_buffer()
+
+        buf.append((next(_SEQ), value, ch_status, False))
+        if len(buf) >= LogKey.BUFFER_SIZE:
+            self.merge()
+
+
+    def _append_many(self, values, ch_status):
+        """
+        Add a sequence of values.
+        @param values Sequence (list or numpy array) of values.
+        @param ch_status Global channel status or _NO_STATUS.
+        """
+        if not Logger._enable:
+            return
+
+        try:
+            buf = self._local.buffer
+        except AttributeError:
+            buf = self._new_buffer()
+
+        # ::TRICKY:: values are merged later. Copy them: callers reuse their arrays (e.g. GNU Radio buffers)
+        values = np.array(values) if isinstance(values, np.ndarray) else list(values)
+
+        buf.append((next(_SEQ), values, ch_status, True))
+        if len(buf) >= LogKey.BUFFER_SIZE:
+            self.merge()
+
+
+    def _append_print(self, value, ch_status):
+        """
+        Print and add a value.
+        @param value Value.
+        @param ch_status Global channel status or _NO_STATUS.
+        """
+        print self.name + ":" + self.variable + " = " + str(value)
+        self._append(value, ch_status)
+
+
+    def _append_many_print(self, values, ch_status):
+        """
+        Print and add a sequence of values.
+        @param values Sequence (list or numpy array) of values.
+        @param ch_status Global channel status or _NO_STATUS.
+        """
+        for value in values:
+            print self.name + ":" + self.variable + " = " + str(value)
+        self._append_many(values, ch_status)
+
+
+    def merge(self):
+        """
+        Move the values of all thread buffers to the storage, in append order.
+        """
+        with self._lock:
+            items = []
+            for buf in self._buffers:
+                # ::TRICKY:: slice and del are atomic. Values appended meanwhile stay in the buffer
+                n_items = len(buf)
+                if n_items:
+                    items.extend(buf[:n_items])
+                    del buf[:n_items]
+
+            if not items:
+                return
+
+            if len(self._buffers) > 1:
+                items.sort(key=itemgetter(0))
+
+            if isinstance(self.storage, (LogColumn, LogAggregate)):
+                self._write_column(items)
+            else:
+                self._write_list(items)
+
+        if isinstance(self.storage, LogColumn) and Logger._stream is not None and \
+           len(self.storage) >= Logger._stream.max_items:
+            Logger._stream.wake()
+
+
+    def _write_list(self, items):
+        """
+        @param items List of buffer items.
+        """
+        for _, value, ch_status, many in items:
+            if many and ch_status is _NO_STATUS:
+                self.storage.extend(value)
+            elif many:
+                self.storage.extend([(v, ch_status) for v in value])
+            elif ch_status is _NO_STATUS:
+                self.storage.append(value)
+            else:
+                self.storage.append( (value, ch_status) )
+
+
+    def _write_column(self, items):
+        """
+        Write in a LogColumn or LogAggregate.
+        @param items List of buffer items. Consecutive single values with the same status are copied at once.
+        """
+        values = []
+        status = None
+
+        for _, value, ch_status, many in items:
+            ch_status = None if ch_status is _NO_STATUS else ch_status
+
+            if values and (many or ch_status != status):
+                self.storage.extend(values, status)
+                values = []
+
+            if many:
+                self.storage.extend(value, ch_status)
+            else:
+                values.append(value)
+                status = ch_status
+
+        if values:
+            self.storage.extend(values, status)
+
+
+    def clear(self, storage):
+        """
+        Discard all values not merged and replace the storage.
+        @param storage New storage.
+        """
+        with self._lock:
+            for buf in self._buffers:
+                del buf[:len(buf)]
+            self.storage = storage
+
+
 class Logger(object):
     """
     Log class.
@@ -35,6 +670,18 @@ class Logger(object):
     _objects = {}
     _ch_status = None
     _print_list = {}
+    _stream = None
+
+    # Registered items: {(name, variable): LogKey}
+    _keys = {}
+    _reg_lock = threading.Lock()
+
+    # Sample rates: {'name' or 'name:variable': sample}. See Logger.configure
+    _rules = {}
+
+    # Environment variables read at startup (see Logger.configure_env)
+    ENV_RULES = 'OPERA_LOG'
+    ENV_CONFIG = 'OPERA_LOG_CONFIG'
 
     __lock = Semaphore()
 
@@ -59,6 +706,9 @@ class Logger(object):
             Logger._print_list[name] = []
             Logger._print_list[name].append(variable)
 
+        if (name, variable) in Logger._keys:
+            Logger._keys[(name, variable)].set_printed(True)
+
 
     @staticmethod    
     def remove_from_print_list(name, variable):
@@ -83,6 +733,9 @@ class Logger(object):
 
                     Logger._print_list[name].pop(del_index)
 
+                if (name, variable) in Logger._keys:
+                    Logger._keys[(name, variable)].set_printed(False)
+
 
     @staticmethod
     def clear_all():
@@ -92,30 +745,188 @@ class Logger(object):
         """
 	for name in Logger._history:
 		for i in Logger._history[name]:
-			Logger._history[name][i] = []
+			if isinstance(Logger._history[name][i], (LogColumn, LogAggregate)):
+				Logger._history[name][i].clear()
+			else:
+				Logger._history[name][i] = []
+
+			if (name, i) in Logger._keys:
+				Logger._keys[(name, i)].clear(Logger._history[name][i])
 
 	print "--- Clearing ch_status" 
         Logger._ch_status = None
 
 
     @staticmethod
-    def register(name, item, default_value=0):
+    def register(name, item, default_value=0, dtype=None, ch_status=True, timestamps=False, aggregate=None):
         """
         Register object to log.
         @param name Object name.
         @param item List/String of items to log.
         @param default_value Default value.
+        @param dtype Dtype of the items. If given the items are stored in a LogColumn instead of a list.
+        @param ch_status Typed items only. Keep the global channel status of each value.
+        @param timestamps Typed items only. Keep the time of each value.
+        @param aggregate LogAggregate class (or function returning a new LogAggregate). If given the items keep a
+                         summary of the values instead of the values (e.g. LogStats, lambda: LogHistogram(0, 1, 10)).
         """
-        if not name in Logger._history:
-            Logger._history[name] = {}
+        if not isinstance(item, list):
+            item = [item]
+
+        with Logger._reg_lock:
+            if not name in Logger._history:
+                Logger._history[name] = {}
 
-        if isinstance(item, list):
             for i in item:
-                if i not in Logger._history[name]:
+                key = Logger._keys.get((name, i))
+                if key is not None:
+                    key.merge()
+
+                current = Logger._history[name].get(i)
+
+                # ::TRICKY:: a list item with data is not converted
+                empty = current is None or (isinstance(current, list) and not current)
+                if aggregate is not None and empty:
+                    Logger._history[name][i] = aggregate()
+                elif dtype is not None and empty:
+                    Logger._history[name][i] = LogColumn(dtype, ch_status=ch_status, timestamps=timestamps)
+                elif i not in Logger._history[name]:
                     Logger._history[name][i] = []
+
+                if key is None:
+                    Logger._keys[(name, i)] = LogKey(name, i, Logger._history[name][i],
+                                                     printed=i in Logger._print_list.get(name, []),
+                                                     sample=Logger._sample(name, i))
+                else:
+                    key.storage = Logger._history[name][i]
+
+
+    @staticmethod
+    def _sample(name, variable):
+        """
+        @param name Object name.
+        @param variable Variable name.
+        @return Sample rate of the item. A rule of the variable overrides a rule of the object.
+        """
+        return Logger._rules.get(name + ':' + variable, Logger._rules.get(name, 1))
+
+
+    @staticmethod
+    def configure(rules):
+        """
+        Enable, disable or sample items. Applies to registered items and to items registered later.
+        Example: {'energy_decision': False, 'energy_decision:decision': 10} keeps 1 in 10 decisions and no energy.
+        @param rules Dictionary {'name' or 'name:variable': rule}. The rule is True (keep all values), False
+                     (disable) or N (keep 1 in N values, 0 disables).
+        """
+        for pattern, rule in rules.items():
+            sample = int(rule) if isinstance(rule, bool) else rule
+            if not isinstance(sample, (int, long)) or sample < 0:
+                raise AttributeError("Invalid rule of %s: %s" % (pattern, rule))
+
+            Logger._rules[pattern] = sample
+
+        with Logger._reg_lock:
+            for (name, variable), key in Logger._keys.items():
+                key.set_sample(Logger._sample(name, variable))
+
+
+    @staticmethod
+    def configure_yaml(path):
+        """
+        Load rules (see Logger.configure) from a YAML file. Example:
+            energy_decision: false
+            energy_decision:decision: 10
+        @param path YAML file.
+        """
+        import yaml
+
+        with open(path) as fd:
+            Logger.configure(yaml.safe_load(fd) or {})
+
+
+    @staticmethod
+    def configure_env(environ=None):
+        """
+        Load rules (see Logger.configure) from the environment. Called when the module is imported.
+        ENV_CONFIG is a YAML file (see Logger.configure_yaml).
+        ENV_RULES is a comma separated list of rules, applied after the file. Example: energy_decision=0,ss_time=10
+        @param environ Dictionary of environment variables. Default: os.environ.
+        """
+        environ = os.environ if environ is None else environ
+
+        if environ.get(Logger.ENV_CONFIG):
+            Logger.configure_yaml(environ[Logger.ENV_CONFIG])
+
+        rules = {}
+        for rule in environ.get(Logger.ENV_RULES, '').split(','):
+            if rule.strip():
+                pattern, _, sample = rule.partition('=')
+                try:
+                    rules[pattern.strip()] = int(sample)
+                except ValueError:
+                    raise AttributeError("Invalid rule in %s: %s" % (Logger.ENV_RULES, rule))
+
+        Logger.configure(rules)
+
+
+    @staticmethod
+    def is_enabled(name, variable):
+        """
+        Check if an item keeps values, e.g. to skip building values of disabled items in hot paths.
+        ::TRICKY:: same as Logger.appender, check it after Logger.configure.
+        @param name Object name.
+        @param variable Variable name.
+        @return False if the item is disabled by Logger.configure.
+        """
+        key = Logger._keys.get((name, variable))
+        if key is None:
+            Logger.register(name, variable)
+            key = Logger._keys[(name, variable)]
+
+        return key.enabled
+
+
+    @staticmethod
+    def appender(name, variable, ch_status=False, many=False):
+        """
+        Append function of an item, for hot paths. Same as Logger.append (or Logger.append_many) without the item
+        lookup. Disabled items return a no-op function.
+        ::TRICKY:: the function is resolved when called: get it after Logger.configure.
+        @param name Object name.
+        @param variable Variable name.
+        @param ch_status Append global channel status also.
+        @param many Return an append_many function.
+        @return Function(value) or function(values).
+        """
+        key = Logger._keys.get((name, variable))
+        if key is None:
+            Logger.register(name, variable)
+            key = Logger._keys[(name, variable)]
+
+        if not key.enabled:
+            return _noop
+
+        if ch_status is None and many:
+            return lambda values: key.append_many(values, _NO_STATUS)
+        elif ch_status is None:
+            return lambda value: key.append(value, _NO_STATUS)
+        elif many:
+            return lambda values: key.append_many(values, Logger._ch_status)
         else:
-           if item not in Logger._history[name]:
-               Logger._history[name][item] = []
+            return lambda value: key.append(value, Logger._ch_status)
+
+
+    @staticmethod
+    def flush(name=None, variable=None):
+        """
+        Merge the values appended by all threads in the history.
+        @param name Object name. Default: all objects.
+        @param variable Variable name. Default: all variables of the object(s).
+        """
+        for (key_name, key_variable), key in Logger._keys.items():
+            if (name is None or key_name == name) and (variable is None or key_variable == variable):
+                key.merge()
 
 
     @staticmethod
@@ -124,9 +935,19 @@ class Logger(object):
         Get data from object.
         @param name Name of object.
         @param variable Name of object variable.
+        @return List of values, copy of the array of values (typed items), summary (aggregate items) or global value.
         """
+        Logger.flush(name, variable)
+
         data = Logger._history[name][variable]
 
+        # ::TRICKY:: values is a view of the column buffer, overwritten after clear
+        if isinstance(data, LogColumn):
+            return data.values.copy()
+
+        if isinstance(data, LogAggregate):
+            return data.summary()
+
         # Is array
         # Copy array data to other array (deep copy)
         if isinstance(data, list):
@@ -145,28 +966,36 @@ class Logger(object):
     def append(name, variable, value, ch_status=False):
         """
         Add data.
+        Thread safe. The value is kept in a buffer of the calling thread until it is merged (see LogKey).
         @param name Object name.
         @param variable Variable name.
         @param value Value.
         @param ch_status Append global channel status also.
         """
+        key = Logger._keys.get((name, variable))
+        if key is None:
+            Logger.register(name, variable)
+            key = Logger._keys[(name, variable)]
 
-        Logger.register(name, variable)
+        key.append(value, _NO_STATUS if ch_status is None else Logger._ch_status)
 
-        # Check if the name and the variable are associated in the print list.
-        # If so, print the value.
-        if name in Logger._print_list:
-            if variable in Logger._print_list[name]:
-                print name + ":" + variable + " = " + str(value)
 
-        # Return if log is not enable
-        if not Logger._enable:
-            return
+    @staticmethod
+    def append_many(name, variable, values, ch_status=False):
+        """
+        Add a sequence of data at once.
+        Same as calling Logger.append for each item of values.
+        @param name Object name.
+        @param variable Variable name.
+        @param values Sequence (list or numpy array) of values. Typed items copy arrays without boxing each value.
+        @param ch_status Append global channel status also.
+        """
+        key = Logger._keys.get((name, variable))
+        if key is None:
+            Logger.register(name, variable)
+            key = Logger._keys[(name, variable)]
 
-        if ch_status is None:
-            Logger._history[name][variable].append(value)
-        else:
-            Logger._history[name][variable].append( (value, Logger._ch_status) )
+        key.append_many(values, _NO_STATUS if ch_status is None else Logger._ch_status)
 
 
     @staticmethod
@@ -182,6 +1011,7 @@ class Logger(object):
 
         Logger.register(name, variable)
         Logger._history[name][variable] = value
+        Logger._keys[(name, variable)].clear(value)
 
 
     @staticmethod
@@ -230,16 +1060,65 @@ class Logger(object):
         plt.savefig(direc + subdirec + '/plot_' + str(it) + '.pdf')
 
 
+    @staticmethod
+    def start_stream(direc, subdirec, it=-1, interval=1.0, max_items=65536, fsync_interval=10.0):
+        """
+        Stream the typed items to binary files in background (see LogStream) instead of keeping them in memory.
+        Items without dtype are not streamed.
+        @param direc Directory.
+        @param subdirec Subdirectory.
+        @param it Test Iteration.
+        @param interval Max time (seconds) between two writes.
+        @param max_items Number of values of an item that triggers a write.
+        @param fsync_interval Time (seconds) between two fsync of the files.
+        """
+        if Logger._stream is not None:
+            raise AttributeError("Logger is already streaming")
+
+        Logger.directory(direc, subdirec)
+
+        Logger._stream = LogStream(Logger._history, direc + subdirec, it, interval, max_items, fsync_interval,
+                                   flush=Logger.flush)
+        Logger._stream.start()
+
+
+    @staticmethod
+    def stop_stream():
+        """
+        Write all pending typed items and stop the background writer.
+        Raises IOError if a write failed while streaming.
+        """
+        if Logger._stream is not None:
+            stream, Logger._stream = Logger._stream, None
+            stream.stop()
+
+
     @staticmethod
     def dump(direc, subdirec, it=-1):
         """
         Save all objects.
+        Typed items (LogColumn) of all objects are saved in a single file, logger[_it].npz. Each item is saved as
+        'object/item' (plus 'object/item/status' and 'object/item/time' if kept).
+        Summaries of the aggregate items (LogAggregate) are saved in summary[_it].json: {'object/item': summary}.
+        If streaming, the stream is stopped first: the streamed values are in the stream files. If a stream write
+        failed, IOError is raised after all objects are saved.
         @param direc Directory.
         @param subdirec Subdirectory.
         @param it Iterations.
         """
+        # ::TRICKY:: streamed items are already in their files
+        stream_error = None
+        try:
+            Logger.stop_stream()
+        except IOError as e:
+            stream_error = e
+
+        Logger.flush()
+
         Logger.directory(direc, subdirec)
 
+        arrays = {}
+        summaries = {}
         for name in Logger._history:
             print 'Saving object:',  name
             Logger.dump_obj(name=name,
@@ -247,6 +1126,22 @@ class Logger(object):
                             directory=direc + subdirec,
                             it=it)
 
+            for d, data in Logger._history[name].items():
+                if isinstance(data, LogColumn) and len(data):
+                    arrays.update(data.arrays(name + '/' + d))
+                elif isinstance(data, LogAggregate):
+                    summaries[name + '/' + d] = data.summary()
+
+        if arrays:
+            np.savez(direc + subdirec + '/logger' + ('_' + str(it) if it != -1 else '') + '.npz', **arrays)
+
+        if summaries:
+            with open(direc + subdirec + '/summary' + ('_' + str(it) if it != -1 else '') + '.json', 'w') as fd:
+                json.dump(summaries, fd, sort_keys=True, indent=1)
+
+        if stream_error is not None:
+            raise stream_error
+
 
     @staticmethod
     def dump_obj(name, data, directory, it=-1):
@@ -258,8 +1153,12 @@ class Logger(object):
         @param it Test Iteration (used do separate repetitions of tests).
         """
         for d in data:
+            # Typed and aggregate items are saved by dump
+            if isinstance(data[d], (LogColumn, LogAggregate)):
+                continue
+
             # Save list
-            if isinstance(data[d], list):
+            elif isinstance(data[d], list):
                 print '\titem: ', d, '[', len(data[d]), ']'
                 # File name
                 fstr = '/' + name + '_' + d + ('_' + str(it) if it != -1 else '') + '.txt'
@@ -291,3 +1190,6 @@ class Logger(object):
         if not os.path.exists(d + subd):
             os.makedirs(d + subd)
         Logger.__lock.release()
+
+
+Logger.configure_env()
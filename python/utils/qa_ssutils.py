@@ -31,6 +31,7 @@ sys.path.insert(0, path)
 
 # OpERA UUT 
 from logger import Logger
+from frameCounter import FrameCounter
 
 
 class QaUtils(unittest.TestCase):
@@ -78,6 +79,212 @@ class QaUtils(unittest.TestCase):
 
         shutil.rmtree('./dump')
 
+    def test_logger_column(self):
+        """
+        Test the Logger typed items.
+        """
+        import numpy as np
+
+        Logger._enable = True
+        Logger._ch_status = 1
+
+        Logger.register('qa_column', ['energy', 'psd'], dtype=np.float32)
+        Logger.register('qa_column', 'vector', dtype=np.dtype((np.float64, (2,))), ch_status=False, timestamps=True)
+
+        for i in xrange(3000):
+            Logger.append('qa_column', 'energy', i)
+        Logger.append_many('qa_column', 'energy', np.arange(10))
+        Logger.append_many('qa_column', 'vector', [[1, 2], [3, 4]])
+
+        # Values are copied by append_many: changes after the call are not logged
+        psd = np.arange(4)
+        Logger.append_many('qa_column', 'psd', psd)
+        psd[:] = -1
+        self.assertEqual([0, 1, 2, 3], Logger.get_data('qa_column', 'psd').tolist())
+
+        energy = Logger.get_data('qa_column', 'energy')
+        self.assertEqual(3010, len(energy))
+        self.assertEqual(np.float32, energy.dtype)
+        self.assertEqual(range(3000) + range(10), energy.tolist())
+        self.assertEqual([[1, 2], [3, 4]], Logger.get_data('qa_column', 'vector').tolist())
+
+        Logger.dump('./dump', '/config2', 1)
+        arrays = np.load('./dump/config2/logger_1.npz')
+
+        self.assertTrue(np.array_equal(energy, arrays['qa_column/energy']))
+        self.assertTrue(np.all(arrays['qa_column/energy/status'] == 1))
+        self.assertEqual((2,), arrays['qa_column/vector/time'].shape)
+        self.assertFalse('qa_column/vector/status' in arrays)
+        self.assertFalse('qa_column/psd/time' in arrays)
+        arrays.close()
+
+        Logger.clear_all()
+        self.assertEqual(0, len(Logger.get_data('qa_column', 'energy')))
+
+        # get_data returns a copy: new values do not overwrite it
+        Logger.append('qa_column', 'energy', -1)
+        self.assertEqual([-1], Logger.get_data('qa_column', 'energy').tolist())
+        self.assertEqual(range(3000) + range(10), energy.tolist())
+
+        shutil.rmtree('./dump')
+
+    def test_logger_stream(self):
+        """
+        Test the Logger background writer.
+        """
+        import time
+        import numpy as np
+        from logger import LogStream
+
+        Logger._enable = True
+        Logger._ch_status = 0
+
+        Logger.register('qa_stream', 'energy', dtype=np.float64, timestamps=True)
+        Logger.start_stream('./dump', '/config3', 2, interval=0.01, max_items=100)
+
+        for i in xrange(1000):
+            Logger.append('qa_stream', 'energy', i)
+        Logger.append_many('qa_stream', 'energy', np.arange(10))
+
+        # drained items are removed from memory
+        time.sleep(0.1)
+        self.assertEqual(0, len(Logger.get_data('qa_stream', 'energy')))
+
+        Logger.dump('./dump', '/config3', 2)
+        arrays = LogStream.load('./dump/config3', 'qa_stream', 'energy', 2)
+
+        self.assertEqual(range(1000) + range(10), arrays['values'].tolist())
+        self.assertEqual(1010, len(arrays['time']))
+        self.assertTrue(np.all(arrays['status'] == 0))
+        self.assertTrue(Logger._stream is None)
+
+        # A new stream overwrites the files of the same iteration
+        Logger.start_stream('./dump', '/config3', 2)
+        Logger.append_many('qa_stream', 'energy', np.arange(5))
+        Logger.stop_stream()
+        self.assertEqual(range(5), LogStream.load('./dump/config3', 'qa_stream', 'energy', 2)['values'].tolist())
+
+        # Write errors do not stop the stream. They are raised by stop
+        stream = LogStream({'qa_stream': {'energy': Logger._history['qa_stream']['energy']}}, './dump/missing')
+        stream.start()
+        Logger.append('qa_stream', 'energy', 1)
+        Logger.flush()
+        stream.wake()
+        time.sleep(0.1)
+        self.assertTrue(stream._thread.is_alive())
+        self.assertRaises(IOError, stream.stop)
+
+        shutil.rmtree('./dump')
+
+    def test_logger_threads(self):
+        """
+        Test Logger appends from several threads.
+        """
+        import threading
+
+        Logger._enable = True
+        Logger._ch_status = 0
+
+        def _append(thread):
+            for i in xrange(3000):
+                Logger.append('qa_threads', 'value', (thread, i), ch_status=None)
+
+        threads = [threading.Thread(target=_append, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # no value lost and the order of each thread is kept
+        data = Logger.get_data('qa_threads', 'value')
+        self.assertEqual(12000, len(data))
+        for t in range(4):
+            self.assertEqual(range(3000), [i for thread, i in data if thread == t])
+
+    def test_logger_config(self):
+        """
+        Test Logger enable, disable and sampling rules.
+        """
+        Logger._enable = True
+        Logger._ch_status = 0
+
+        Logger.configure_env({Logger.ENV_RULES: 'qa_config=0,qa_config:sampled=3'})
+        disabled = Logger.appender('qa_config', 'disabled', ch_status=None)
+        sampled = Logger.appender('qa_config', 'sampled', ch_status=None)
+
+        for i in xrange(10):
+            disabled(i)
+            sampled(i)
+        Logger.append_many('qa_config', 'sampled', range(10, 20), ch_status=None)
+
+        self.assertEqual([], Logger.get_data('qa_config', 'disabled'))
+        self.assertFalse(Logger.is_enabled('qa_config', 'disabled'))
+        self.assertTrue(Logger.is_enabled('qa_config', 'sampled'))
+        self.assertEqual(range(0, 20, 3), Logger.get_data('qa_config', 'sampled'))
+
+        self.assertRaises(AttributeError, Logger.configure, {'qa_config': -1})
+        Logger.configure({'qa_config': True, 'qa_config:sampled': 1})
+
+    def test_logger_aggregate(self):
+        """
+        Test the Logger aggregate items.
+        """
+        import numpy as np
+        from logAggregate import LogStats, LogHistogram, LogCounter, LogQuantiles
+
+        Logger._enable = True
+        Logger._ch_status = 0
+
+        values = np.random.rand(5000)
+
+        Logger.register('qa_aggregate', 'stats', aggregate=LogStats)
+        Logger.register('qa_aggregate', 'histogram', aggregate=lambda: LogHistogram(0.0, 0.5, 5))
+        Logger.register('qa_aggregate', 'counter', aggregate=LogCounter)
+        Logger.register('qa_aggregate', 'quantiles', aggregate=lambda: LogQuantiles(quantiles=[0.1, 0.5]))
+
+        for value in values[:1000]:
+            for item in ['stats', 'histogram', 'quantiles']:
+                Logger.append('qa_aggregate', item, value)
+            Logger.append('qa_aggregate', 'counter', "01" if value > 0.5 else "00")
+        for item in ['stats', 'histogram', 'quantiles']:
+            Logger.append_many('qa_aggregate', item, values[1000:])
+
+        stats = Logger.get_data('qa_aggregate', 'stats')
+        self.assertEqual(5000, stats['count'])
+        self.assertAlmostEqual(np.mean(values), stats['mean'])
+        self.assertAlmostEqual(np.var(values), stats['var'])
+
+        histogram = Logger.get_data('qa_aggregate', 'histogram')
+        self.assertEqual(np.histogram(values, bins=5, range=(0.0, 0.5))[0].tolist(), histogram['counts'])
+        self.assertEqual(np.sum(values >= 0.5), histogram['overflow'])
+
+        counter = Logger.get_data('qa_aggregate', 'counter')
+        self.assertEqual({"00": np.sum(values[:1000] <= 0.5), "01": np.sum(values[:1000] > 0.5)}, counter['counts'])
+
+        quantiles = Logger.get_data('qa_aggregate', 'quantiles')['quantiles']
+        self.assertTrue(abs(np.percentile(values, 10) - quantiles['0.1']) < 0.01)
+        self.assertTrue(abs(np.percentile(values, 50) - quantiles['0.5']) < 0.01)
+
+    def test_frame_counter(self):
+        """
+        Test the FrameCounter sensing window.
+        """
+        counter = FrameCounter()
+
+        # Not armed: no frame belongs to a window
+        self.assertEqual((0, 0), counter.count(10))
+
+        counter.arm(5, skip=3)
+        self.assertEqual((2, 2), counter.count(2))    # skipped
+        self.assertEqual((1, 4), counter.count(4))    # 1 skipped, 3 counted
+        self.assertFalse(counter.wait(timeout=0.01))  # window not complete
+
+        counter.arm(5)
+        self.assertEqual((0, 3), counter.count(3))
+        self.assertEqual((0, 2), counter.count(4))
+        self.assertEqual((0, 0), counter.count(4))
+        self.assertTrue(counter.wait(timeout=0.01))
+
 
 if __name__ == '__main__':
     unittest.main()